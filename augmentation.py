@@ -0,0 +1,122 @@
+"""
+V-Sign AI - Batch Augmentation
+Vectorised landmark augmentation applied per batch inside the tf.data pipeline
+"""
+
+import math
+
+import tensorflow as tf
+
+# ===== CONFIGURATION =====
+NUM_LANDMARKS = 42
+HAND_LANDMARKS = 21
+COORDINATES = 3
+
+ROTATION_DEG = 15.0          # max in-plane rotation around the image centre
+SCALE_RANGE = (0.9, 1.1)
+NOISE_STD = 0.01
+TIME_WARP = 0.2              # max +/- playback speed change
+MIRROR_PROB = 0.5
+
+
+def hand_mask(points):
+    """(B, T, 42, 3) -> (B, T, 42, 1) float mask, 0 where a hand slot is zero-padded."""
+    hands = tf.reshape(points, (tf.shape(points)[0], tf.shape(points)[1], 2, HAND_LANDMARKS * COORDINATES))
+    present = tf.cast(tf.reduce_any(tf.not_equal(hands, 0.0), axis=-1), points.dtype)  # (B, T, 2)
+    present = tf.repeat(present, HAND_LANDMARKS, axis=2)                               # (B, T, 42)
+    return present[..., tf.newaxis]
+
+
+def rotate_and_scale(points, rotation_deg=ROTATION_DEG, scale_range=SCALE_RANGE):
+    """Rotate x/y around (0.5, 0.5) and scale all coordinates, one draw per sequence."""
+    batch = tf.shape(points)[0]
+    angle = tf.random.uniform((batch,), -rotation_deg, rotation_deg) * (math.pi / 180.0)
+    scale = tf.random.uniform((batch,), scale_range[0], scale_range[1])
+    cos, sin = tf.cos(angle) * scale, tf.sin(angle) * scale
+    zeros = tf.zeros_like(cos)
+
+    # (B, 3, 3) rotation-scale matrices, z only scaled
+    matrix = tf.stack([
+        tf.stack([cos, -sin, zeros], axis=-1),
+        tf.stack([sin, cos, zeros], axis=-1),
+        tf.stack([zeros, zeros, scale], axis=-1),
+    ], axis=1)
+    centre = tf.constant([0.5, 0.5, 0.0], dtype=points.dtype)
+    return tf.einsum('btlc,bdc->btld', points - centre, matrix) + centre
+
+
+def time_warp(points, max_warp=TIME_WARP, lengths=None):
+    """
+    Resample every sequence at a random playback speed around its centre frame.
+    lengths: (B,) valid frames of zero-padded variable-length sequences; the
+    warp then stays inside each sequence and the padding stays zero.
+    """
+    batch, steps = tf.shape(points)[0], tf.shape(points)[1]
+    if lengths is None:
+        last = tf.fill((batch, 1), tf.cast(steps - 1, tf.float32))
+    else:
+        last = tf.cast(tf.reshape(lengths, (batch, 1)) - 1, tf.float32)
+    speed = tf.random.uniform((batch, 1), 1.0 - max_warp, 1.0 + max_warp)
+    t = tf.range(steps, dtype=tf.float32)[tf.newaxis, :]
+    pos = tf.clip_by_value(last / 2.0 + (t - last / 2.0) * speed, 0.0, last)  # (B, T)
+
+    lo = tf.cast(tf.floor(pos), tf.int32)
+    hi = tf.minimum(lo + 1, steps - 1)
+    frac = (pos - tf.cast(lo, tf.float32))[:, :, tf.newaxis, tf.newaxis]
+    p_lo = tf.gather(points, lo, batch_dims=1)
+    p_hi = tf.gather(points, hi, batch_dims=1)
+
+    # Interpolate only where both neighbours have the hand, else take the nearest frame
+    both = hand_mask(p_lo) * hand_mask(p_hi)
+    nearest = tf.where(frac < 0.5, p_lo, p_hi)
+    warped = both * (p_lo + (p_hi - p_lo) * frac) + (1.0 - both) * nearest
+    if lengths is not None:
+        valid = tf.cast(t <= last, warped.dtype)[:, :, tf.newaxis, tf.newaxis]
+        warped = warped * valid
+    return warped
+
+
+def mirror_hands(points, prob=MIRROR_PROB):
+    """
+    Horizontally flip a random subset of sequences (x -> 1 - x).
+    Hand slots are swapped only when both hands are present, so the first
+    slot stays filled first, matching the collector and the web app.
+    """
+    batch = tf.shape(points)[0]
+    flip = tf.random.uniform((batch, 1, 1, 1)) < prob
+    mask = hand_mask(points)
+
+    flipped = points * tf.constant([-1.0, 1.0, 1.0]) + tf.constant([1.0, 0.0, 0.0])
+    flipped = flipped * mask
+
+    swapped = tf.concat([flipped[:, :, HAND_LANDMARKS:], flipped[:, :, :HAND_LANDMARKS]], axis=2)
+    both_present = tf.reduce_min(tf.reshape(mask, (batch, -1, 2, HAND_LANDMARKS)), axis=-1)
+    both_present = tf.reduce_min(both_present, axis=-1)[:, :, tf.newaxis, tf.newaxis] > 0
+    flipped = tf.where(both_present, swapped, flipped)
+
+    return tf.where(flip, flipped, points)
+
+
+def augment_batch(x, y, rotation_deg=ROTATION_DEG, scale_range=SCALE_RANGE,
+                  noise_std=NOISE_STD, max_warp=TIME_WARP, mirror_prob=MIRROR_PROB, lengths=None):
+    """
+    Augment one batch of flattened sequences.
+    x: (B, T, 126) float32, y: labels (passed through).
+    lengths: (B,) valid frames when x holds zero-padded variable-length sequences.
+    Missing (zero-padded) hands and padded frames stay exactly zero.
+    """
+    shape = tf.shape(x)
+    points = tf.reshape(x, (shape[0], shape[1], NUM_LANDMARKS, COORDINATES))
+
+    if max_warp > 0:
+        points = time_warp(points, max_warp, lengths)
+    mask = hand_mask(points)
+    points = rotate_and_scale(points, rotation_deg, scale_range)
+    if noise_std > 0:
+        points = points + tf.random.normal(tf.shape(points), stddev=noise_std)
+    points = points * mask
+    if mirror_prob > 0:
+        points = mirror_hands(points, mirror_prob)
+
+    return tf.reshape(points, shape), y
+
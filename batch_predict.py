@@ -0,0 +1,353 @@
+"""
+V-Sign AI - Batch Prediction
+Score an archive of sequence files (.json / .vsq) offline: a pool of reader
+threads parses the files ahead of the model, sequences are classified in
+large batches and the predictions written to CSV or Parquet, with a
+checkpoint so an interrupted multi-hour run resumes where it stopped
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from dataset_cache import FRAME_FEATURES, parse_sequence_file
+from inference_engine import compile_forward, load_keras_model, load_labels
+from parallel_ingest import json_loads
+from sequence_format import EXTENSION as BINARY_EXTENSION
+
+# ===== CONFIGURATION =====
+BATCH_SIZE = 1024           # sequences per predict call
+READERS = 4                 # file reader threads
+MAX_PENDING_FILES = 64      # parsed files buffered ahead of the model
+CHECKPOINT_SECONDS = 30     # checkpoint at most this often (and at the end)
+CHECKPOINT_VERSION = 1
+SKIP_FILES = {'manifest.json', 'training_info.json', 'data_collection_template.json'}
+
+
+# ===== INPUT =====
+def find_sequence_files(input_dir):
+    """Every .json / .vsq file under `input_dir` (relative paths, sorted), cache folders skipped."""
+    found = []
+    for root, dirs, files in os.walk(input_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        for name in sorted(files):
+            if name.endswith(('.json', BINARY_EXTENSION)) and name not in SKIP_FILES:
+                found.append(os.path.relpath(os.path.join(root, name), input_dir))
+    return found
+
+
+def read_files(input_dir, rel_paths, sequence_length, readers=READERS, max_pending=MAX_PENDING_FILES):
+    """
+    Parse files in a thread pool, at most `max_pending` ahead of the
+    consumer, and yield (rel_path, sequences, person_id, rejected, error)
+    in input order. A file that cannot be parsed yields its error instead.
+    """
+    def read(rel_path):
+        try:
+            sequences, person_id, rejected, _ = parse_sequence_file(
+                os.path.join(input_dir, rel_path), sequence_length, loads=json_loads)
+            return rel_path, sequences, person_id, rejected, None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            return rel_path, [], '', 0, f'{type(e).__name__}: {e}'
+
+    with ThreadPoolExecutor(max_workers=readers) as pool:
+        paths = iter(rel_paths)
+        pending = deque(pool.submit(read, p) for _, p in zip(range(max_pending), paths))
+        while pending:
+            result = pending.popleft().result()
+            for rel_path in paths:
+                pending.append(pool.submit(read, rel_path))
+                break
+            yield result
+
+
+# ===== MODEL =====
+def load_predictor(model_path, threads=None):
+    """
+    Returns (predict(X) -> probabilities, sequence_length) for a Keras
+    .h5 / SavedModel or an exported .tflite file. sequence_length is None
+    for variable-length models (sequences are then scored at their own length).
+    """
+    if model_path.endswith('.tflite'):
+        from export_tflite import TFLiteModel
+        model = TFLiteModel(model_path=model_path, num_threads=threads or os.cpu_count())
+        return model.predict, int(model.input['shape'][1])
+
+    if threads:
+        import tensorflow as tf
+        tf.config.threading.set_intra_op_parallelism_threads(threads)
+    model = load_keras_model(model_path)
+    forward = compile_forward(model)
+    return (lambda X: forward(X).numpy()), model.input_shape[1]
+
+
+def pad_batch(sequences):
+    """Stack equal-length sequences, or zero-pad variable-length ones to the longest (masked by the model)."""
+    if isinstance(sequences, np.ndarray):
+        return sequences
+    batch = np.zeros((len(sequences), max(len(s) for s in sequences), FRAME_FEATURES), dtype=np.float32)
+    for row, sequence in enumerate(sequences):
+        batch[row, :len(sequence)] = sequence
+    return batch
+
+
+# ===== OUTPUT =====
+class CsvOutput:
+    """Appends rows to a CSV file; the checkpoint records the byte size of committed rows."""
+
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.file = None
+
+    def open(self, state=None):
+        if state is None and os.path.exists(self.path):
+            os.remove(self.path)
+        self.file = open(self.path, 'a', encoding='utf-8', newline='')
+        if state is not None:
+            # Drop rows written after the last checkpoint, they are scored again
+            self.file.truncate(state['bytes'])
+        self.writer = csv.writer(self.file)
+        if self.file.tell() == 0:
+            self.writer.writerow(self.columns)
+
+    def write(self, rows):
+        self.writer.writerows(rows)
+
+    def commit(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        return {'bytes': self.file.tell()}
+
+    def close(self):
+        if self.file:
+            self.file.close()
+
+
+class ParquetOutput:
+    """
+    Writes a directory of Parquet part files (one per checkpoint), readable
+    as a single table by pandas/pyarrow. Needs pyarrow.
+    """
+
+    def __init__(self, path, columns):
+        if importlib.util.find_spec('pyarrow') is None:  # fail before any work is done
+            raise ImportError("Parquet output needs pyarrow (pip install pyarrow)")
+        self.path = path
+        self.columns = columns
+        self.rows = []
+        self.parts = []
+
+    def open(self, state=None):
+        os.makedirs(self.path, exist_ok=True)
+        self.parts = list(state['parts']) if state else []
+        for name in os.listdir(self.path):
+            if name.endswith('.parquet') and name not in self.parts:
+                os.remove(os.path.join(self.path, name))  # written after the last checkpoint
+
+    def write(self, rows):
+        self.rows.extend(rows)
+
+    def commit(self):
+        if self.rows:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            name = f'part-{len(self.parts):05d}.parquet'
+            table = pa.Table.from_pydict({c: [r[i] for r in self.rows] for i, c in enumerate(self.columns)})
+            pq.write_table(table, os.path.join(self.path, name))
+            self.parts.append(name)
+            self.rows = []
+        return {'parts': list(self.parts)}
+
+    def close(self):
+        pass
+
+
+# ===== CHECKPOINT =====
+def checkpoint_path(output_path):
+    return output_path.rstrip('/\\') + '.checkpoint.json'
+
+
+def load_checkpoint(path, model_path):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        checkpoint = json.load(f)
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        return None
+    if checkpoint['model'] != os.path.abspath(model_path) or checkpoint['model_mtime_ns'] != os.stat(model_path).st_mtime_ns:
+        raise ValueError(f"'{path}' belongs to another model, use --restart to score from scratch")
+    return checkpoint
+
+
+def save_checkpoint(path, checkpoint):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+# ===== SCORING =====
+def batch_predict(input_dir, model_path='best_model.h5', output_path='predictions.csv', labels=None,
+                  batch_size=BATCH_SIZE, readers=READERS, probabilities=False, restart=False,
+                  threads=None):
+    """
+    Score every sequence of every file under `input_dir` and write one row
+    per sequence: path, sequence index, person_id, frames, predicted
+    gesture, its index and confidence (plus one probability column per
+    gesture with probabilities=True). A file counts as done once all its
+    rows are committed; a resumed run skips done files and drops rows of
+    unfinished ones. Returns the summary dict.
+    """
+    labels = labels or load_labels()
+    predict, sequence_length = load_predictor(model_path, threads)
+    columns = ['path', 'sequence', 'person_id', 'frames', 'gesture', 'label', 'confidence']
+    if probabilities:
+        columns += [f'p_{gesture}' for gesture in labels]
+    output = (ParquetOutput if output_path.endswith('.parquet') else CsvOutput)(output_path, columns)
+
+    ckpt_path = checkpoint_path(output_path)
+    checkpoint = None if restart else load_checkpoint(ckpt_path, model_path)
+    if checkpoint is None:
+        checkpoint = {'version': CHECKPOINT_VERSION, 'model': os.path.abspath(model_path),
+                      'model_mtime_ns': os.stat(model_path).st_mtime_ns, 'input_dir': os.path.abspath(input_dir),
+                      'done': [], 'failed': {}, 'sequences': 0, 'rejected': 0, 'output': None}
+    output.open(checkpoint['output'])
+
+    done = set(checkpoint['done'])
+    files = find_sequence_files(input_dir)
+    todo = [f for f in files if f not in done]
+    print(f"\n{len(files)} files, {len(files) - len(todo)} already scored, {len(todo)} to score "
+          f"({readers} reader threads, batch {batch_size})")
+
+    batch, meta = [], []           # sequences waiting for the model and their row fields
+    open_files = deque()           # (rel_path, sequences queued up to and including this file)
+    counts = {'queued': 0, 'scored': 0, 'sequences': 0, 'rejected': 0, 'files': 0}
+    finished = []                  # files whose rows are written but not yet committed
+    timing = {'predict': 0.0, 'wait': 0.0}
+
+    def run_batch():
+        if not batch:
+            return
+        start = time.perf_counter()
+        probs = np.asarray(predict(pad_batch(batch if sequence_length is None else np.stack(batch))))
+        timing['predict'] += time.perf_counter() - start
+        best = np.argmax(probs, axis=1)
+        rows = []
+        for (rel_path, index, person_id, frames), p, label in zip(meta, probs, best):
+            row = [rel_path, index, person_id, frames, labels[label] if label < len(labels) else str(label),
+                   int(label), round(float(p[label]), 6)]
+            if probabilities:
+                row += [round(float(v), 6) for v in p]
+            rows.append(row)
+        output.write(rows)
+        counts['scored'] += len(batch)
+        batch.clear()
+        meta.clear()
+        while open_files and open_files[0][1] <= counts['scored']:
+            finished.append(open_files.popleft()[0])
+
+    def commit():
+        checkpoint['output'] = output.commit()
+        checkpoint['done'].extend(finished)
+        checkpoint['sequences'] += counts['sequences']
+        checkpoint['rejected'] += counts['rejected']
+        counts['files'] += len(finished)
+        counts['sequences'] = counts['rejected'] = 0
+        finished.clear()
+        save_checkpoint(ckpt_path, checkpoint)
+
+    start = last_commit = time.perf_counter()
+    reader = read_files(input_dir, todo, sequence_length, readers)
+    try:
+        while True:
+            wait_start = time.perf_counter()
+            item = next(reader, None)
+            timing['wait'] += time.perf_counter() - wait_start
+            if item is None:
+                break
+            rel_path, sequences, person_id, rejected, error = item
+            if error:
+                checkpoint['failed'][rel_path] = error
+                print(f"  ✗ {rel_path}: {error}")
+                continue
+            checkpoint['failed'].pop(rel_path, None)
+            for index, sequence in enumerate(sequences):
+                batch.append(sequence)
+                meta.append((rel_path, index, person_id, len(sequence)))
+            counts['queued'] += len(sequences)
+            counts['sequences'] += len(sequences)
+            counts['rejected'] += rejected
+            open_files.append((rel_path, counts['queued']))
+
+            if len(batch) >= batch_size:
+                run_batch()
+            if time.perf_counter() - last_commit >= CHECKPOINT_SECONDS:
+                commit()
+                last_commit = time.perf_counter()
+                elapsed = last_commit - start
+                print(f"  {len(checkpoint['done'])}/{len(files)} files, "
+                      f"{counts['scored'] / elapsed:.0f} sequences/s")
+        run_batch()
+    finally:
+        # Interrupted or not, keep everything that was scored completely
+        commit()
+        output.close()
+        reader.close()
+
+    wall = time.perf_counter() - start
+    summary = {
+        'files_scored': counts['files'],
+        'files_total': len(files),
+        'files_failed': len(checkpoint['failed']),
+        'sequences_scored': counts['scored'],
+        'sequences_total': checkpoint['sequences'],
+        'sequences_rejected': checkpoint['rejected'],
+        'wall_seconds': wall,
+        'sequences_per_s': counts['scored'] / wall if wall else None,
+        'predict_seconds': timing['predict'],
+        'reader_wait_seconds': timing['wait'],
+    }
+    print(f"\nScored {summary['sequences_scored']} sequences from {summary['files_scored']} files "
+          f"in {wall:.1f}s ({summary['sequences_per_s'] or 0:.0f} sequences/s)")
+    print(f"  Model {timing['predict']:.1f}s, waiting for readers {timing['wait']:.1f}s")
+    if checkpoint['failed']:
+        print(f"  {len(checkpoint['failed'])} files failed (retried on the next run)")
+    print(f"✓ Predictions saved to '{output_path}' (checkpoint '{ckpt_path}')")
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score a directory of sequence files with the trained model')
+    parser.add_argument('input_dir', help='folder of .json / .vsq sequence files (searched recursively)')
+    parser.add_argument('--model', default='best_model.h5', help='.h5, SavedModel directory or .tflite file')
+    parser.add_argument('--output', default='predictions.csv', help='.csv file or .parquet directory')
+    parser.add_argument('--training-info', default='training_info.json', help='gesture names of the model')
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--readers', type=int, default=READERS, help='file reader threads')
+    parser.add_argument('--threads', type=int, help='model threads (default: TensorFlow decides)')
+    parser.add_argument('--probabilities', action='store_true', help='add one probability column per gesture')
+    parser.add_argument('--restart', action='store_true', help='ignore the checkpoint and score everything again')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(" " * 15 + "V-SIGN AI - BATCH PREDICTION")
+    print("=" * 60)
+
+    if not os.path.exists(args.model):
+        print(f"\nERROR: File '{args.model}' không tồn tại!")
+        print("Vui lòng chạy train_model.py trước.")
+        raise SystemExit(1)
+    if args.output.endswith('.parquet') and importlib.util.find_spec('pyarrow') is None:
+        print("\nERROR: Parquet output needs pyarrow. Cài đặt: pip install pyarrow")
+        raise SystemExit(1)
+
+    batch_predict(args.input_dir, args.model, args.output, load_labels(args.training_info), args.batch_size,
+                  args.readers, args.probabilities, args.restart, args.threads)
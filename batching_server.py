@@ -0,0 +1,241 @@
+"""
+V-Sign AI - Micro-Batching Inference Server
+Collect pending windows from many camera sessions into dynamic batches and
+run one forward pass per batch instead of one per session
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from inference_engine import (CONFIDENCE_THRESHOLD, DEFAULT_STRIDE,
+                              InferenceEngine, frame_from_payload)
+
+# ===== CONFIGURATION =====
+MAX_BATCH_SIZE = 64
+MAX_WAIT_MS = 5.0
+
+
+class MicroBatcher:
+    """
+    Queue windows from concurrent callers and run them through `predict_fn`
+    in batches of up to `max_batch_size`, waiting at most `max_wait_ms`
+    after the first pending window before dispatching a partial batch.
+    """
+
+    def __init__(self, predict_fn, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = None
+        self.batch_sizes = []
+        self._task = None
+        # One thread: the model runs one batch at a time, the event loop stays free
+        self._executor = ThreadPoolExecutor(max_workers=1)
+
+    async def start(self):
+        self.queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._executor.shutdown(wait=False)
+
+    async def submit(self, window):
+        """Queue one (window, 126) array and wait for its probabilities."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((window, future))
+        return await future
+
+    async def _collect(self):
+        batch = [await self.queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            windows = np.stack([window for window, _ in batch])
+            self.batch_sizes.append(len(batch))
+            try:
+                probs = await loop.run_in_executor(self._executor, self.predict_fn, windows)
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), row in zip(batch, probs):
+                if not future.done():
+                    future.set_result(row)
+
+
+class BatchedInferenceService:
+    """Session handling from InferenceEngine with model calls going through a MicroBatcher."""
+
+    def __init__(self, engine, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.engine = engine
+        self.batcher = MicroBatcher(engine.predict_windows, max_batch_size, max_wait_ms)
+
+    async def start(self):
+        await self.batcher.start()
+
+    async def stop(self):
+        await self.batcher.stop()
+
+    async def push_frame(self, session_id, vector):
+        due = self.engine.next_window(session_id, vector)
+        if due is None:
+            return None
+        window, frame_index = due
+        probs = await self.batcher.submit(window)
+        return self.engine.format_prediction(probs, frame_index)
+
+
+# ===== TCP SERVER =====
+async def handle_client(service, reader, writer):
+    """
+    Newline-delimited JSON over TCP, one request per line:
+        {"session": "kiosk-1", "landmarks": [...]}  or  {"session": ..., "vector": [...]}
+        {"session": "kiosk-1", "reset": true}
+    Each request gets one JSON line back.
+    """
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+        try:
+            request = json.loads(line)
+            session_id = str(request['session'])
+            if request.get('reset'):
+                service.engine.reset(session_id)
+                response = {'session': session_id, 'reset': True}
+            else:
+                vector = frame_from_payload(request)
+                prediction = await service.push_frame(session_id, vector)
+                response = {'session': session_id, 'hand_detected': vector is not None,
+                            'prediction': prediction}
+        except (ValueError, KeyError, TypeError) as e:
+            response = {'error': f'invalid request: {e}'}
+        except Exception as e:  # a failed batch must not drop the connection without a reply
+            response = {'error': f'inference failed: {type(e).__name__}: {e}'}
+        writer.write(json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n')
+        await writer.drain()
+    writer.close()
+
+
+async def serve(service, host='0.0.0.0', port=8001):
+    await service.start()
+    server = await asyncio.start_server(lambda r, w: handle_client(service, r, w), host, port)
+    print(f"✓ Micro-batching server listening on {host}:{port} "
+          f"(max_batch={service.batcher.max_batch_size}, max_wait={service.batcher.max_wait * 1000:.1f}ms)")
+    async with server:
+        await server.serve_forever()
+
+
+# ===== LOAD GENERATOR =====
+async def _camera_session(service, session_id, frames, fps, latencies, rng):
+    interval = 1.0 / fps
+    features = service.engine.model.input_shape[-1]
+    await asyncio.sleep(rng.uniform(0, interval))  # cameras are not frame-aligned
+    for _ in range(frames):
+        start = time.perf_counter()
+        vector = rng.random(features, dtype=np.float32)
+        prediction = await service.push_frame(session_id, vector)
+        if prediction is not None:
+            latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - start)))
+
+
+async def run_load_test(engine, sessions=32, frames=150, fps=30.0,
+                        max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS, seed=0):
+    """
+    Simulate `sessions` cameras sending `frames` frames each at `fps`.
+    Returns latency percentiles (ms) for frames that triggered a prediction,
+    prediction throughput and the mean dispatched batch size.
+    """
+    service = BatchedInferenceService(engine, max_batch_size, max_wait_ms)
+    await service.start()
+    latencies = []
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        _camera_session(service, f'load-{i}', frames, fps, latencies, rng)
+        for i in range(sessions)
+    ])
+    elapsed = time.perf_counter() - start
+    await service.stop()
+    for i in range(sessions):
+        engine.reset(f'load-{i}')
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'sessions': sessions,
+        'max_batch_size': max_batch_size,
+        'max_wait_ms': max_wait_ms,
+        'predictions': len(latencies),
+        'throughput_per_s': len(latencies) / elapsed,
+        'p50_ms': float(np.percentile(latencies_ms, 50)) if len(latencies) else None,
+        'p99_ms': float(np.percentile(latencies_ms, 99)) if len(latencies) else None,
+        'mean_batch_size': float(np.mean(service.batcher.batch_sizes)) if service.batcher.batch_sizes else 0.0,
+    }
+
+
+def print_load_results(results):
+    print(f"{'sessions':>8} {'max_batch':>9} {'wait_ms':>7} {'pred/s':>8} "
+          f"{'p50_ms':>7} {'p99_ms':>7} {'avg_batch':>9}")
+    def ms(value):
+        return f"{value:>7.2f}" if value is not None else f"{'-':>7}"  # no window completed
+
+    for r in results:
+        print(f"{r['sessions']:>8} {r['max_batch_size']:>9} {r['max_wait_ms']:>7.1f} "
+              f"{r['throughput_per_s']:>8.1f} {ms(r['p50_ms'])} {ms(r['p99_ms'])} "
+              f"{r['mean_batch_size']:>9.1f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='V-Sign AI micro-batching inference server')
+    parser.add_argument('mode', choices=['serve', 'loadtest'])
+    parser.add_argument('--model', default='vsign_model_final.h5')
+    parser.add_argument('--stride', type=int, default=DEFAULT_STRIDE)
+    parser.add_argument('--threshold', type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument('--max-batch-size', type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument('--max-wait-ms', type=float, default=MAX_WAIT_MS)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--sessions', type=int, default=32, help='loadtest: simulated cameras')
+    parser.add_argument('--frames', type=int, default=150, help='loadtest: frames per camera')
+    parser.add_argument('--fps', type=float, default=30.0, help='loadtest: frames/sec per camera')
+    args = parser.parse_args()
+
+    engine = InferenceEngine.from_path(args.model, stride=args.stride, threshold=args.threshold)
+    engine.predict_windows(np.zeros((1, engine.window, engine.model.input_shape[-1]), dtype=np.float32))
+
+    if args.mode == 'serve':
+        asyncio.run(serve(BatchedInferenceService(engine, args.max_batch_size, args.max_wait_ms),
+                          args.host, args.port))
+    else:
+        # Compare against no batching (one forward pass per window)
+        results = [
+            asyncio.run(run_load_test(engine, args.sessions, args.frames, args.fps,
+                                      max_batch_size=batch, max_wait_ms=wait))
+            for batch, wait in [(1, 0.0), (args.max_batch_size, args.max_wait_ms)]
+        ]
+        print_load_results(results)
@@ -0,0 +1,196 @@
+"""
+V-Sign AI - Inference Benchmark
+Load the trained model in every available format, sweep batch sizes and
+thread counts, and write latency percentiles, throughput and peak RSS to JSON
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from multiprocessing import get_context
+
+import numpy as np
+
+from inference_engine import SEQUENCE_LENGTH  # window fed to variable-length models
+from resource_usage import peak_rss_mb
+
+# ===== CONFIGURATION =====
+BATCH_SIZES = [1, 8, 32, 128]
+THREADS = [1, 2, 4]
+RUNS = 100
+WARMUP = 10
+SEED = 0
+
+
+def discover_formats(model_path, saved_model_dir, tflite_dir):
+    """(format name, path) for every exported model found on disk."""
+    formats = []
+    if os.path.exists(model_path):
+        formats.append(('keras_h5', model_path))
+    if os.path.isdir(saved_model_dir):
+        formats.append(('saved_model', saved_model_dir))
+    for path in sorted(glob.glob(os.path.join(tflite_dir, '*.tflite'))):
+        name = os.path.splitext(os.path.basename(path))[0].replace('vsign_', '')
+        formats.append((f'tflite_{name}', path))
+    return formats
+
+
+def _load_predict(fmt, path, threads):
+    """
+    Return (predict(X) -> probs, input shape without batch, batch mode) for
+    one format; batch mode is 'batched' or 'sequential' (one invoke per window).
+    """
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+    if fmt.startswith('tflite'):
+        from export_tflite import TFLiteModel
+        model = TFLiteModel(model_path=path, num_threads=threads)
+        # Exported with a fixed batch of 1: a batch is run as consecutive invokes
+        return model.predict, tuple(model.input['shape'][1:]), 'sequential'
+
+    from inference_engine import load_keras_model
+    model = load_keras_model(path)
+    shape = tuple(model.input_shape[1:])
+    forward = tf.function(lambda x: model(x, training=False),
+                          input_signature=[tf.TensorSpec((None,) + shape, tf.float32)])
+    return (lambda X: forward(X).numpy()), (shape[0] or SEQUENCE_LENGTH,) + shape[1:], 'batched'
+
+
+def _bench_worker(fmt, path, threads, batch_sizes, runs):
+    """Runs in a fresh process so thread settings and peak RSS are per configuration."""
+    start = time.perf_counter()
+    predict, shape, batch_mode = _load_predict(fmt, path, threads)
+    load_seconds = time.perf_counter() - start
+
+    rng = np.random.default_rng(SEED)
+    results = []
+    for batch_size in batch_sizes:
+        X = rng.random((batch_size,) + shape, dtype=np.float32)
+        for _ in range(WARMUP):
+            predict(X)
+        times = []
+        for _ in range(runs):
+            t0 = time.perf_counter()
+            predict(X)
+            times.append(time.perf_counter() - t0)
+        times_ms = np.array(times) * 1000
+        results.append({
+            'format': fmt,
+            'threads': threads,
+            'batch_size': batch_size,
+            'batch_mode': batch_mode,
+            'latency_ms_p50': float(np.percentile(times_ms, 50)),
+            'latency_ms_p90': float(np.percentile(times_ms, 90)),
+            'latency_ms_p99': float(np.percentile(times_ms, 99)),
+            'latency_ms_mean': float(times_ms.mean()),
+            'throughput_windows_per_s': float(batch_size / (times_ms.mean() / 1000)),
+        })
+    rss = peak_rss_mb()
+    for r in results:
+        r.update(load_seconds=load_seconds, peak_rss_mb=rss)
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(formats, batch_sizes=BATCH_SIZES, threads=THREADS, runs=RUNS):
+    results = []
+    spawn = get_context('spawn')
+    for fmt, path in formats:
+        for n_threads in threads:
+            print(f"  {fmt:<16} threads={n_threads} ...", flush=True)
+            with ProcessPoolExecutor(max_workers=1, mp_context=spawn) as pool:
+                results.extend(pool.submit(_bench_worker, fmt, path, n_threads, batch_sizes, runs).result())
+
+    import tensorflow as tf
+    return {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_revision': git_revision(),
+            'tensorflow': tf.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'processor': platform.processor(),
+            'cpu_count': os.cpu_count(),
+            'runs': runs,
+            'formats': {fmt: path for fmt, path in formats},
+        },
+        'results': results,
+    }
+
+
+def _key(r):
+    return (r['format'], r['threads'], r['batch_size'])
+
+
+def print_results(report, baseline=None):
+    base = {_key(r): r for r in baseline['results']} if baseline else {}
+    print(f"\n{'format':<16} {'thr':>3} {'batch':>5} {'p50 ms':>8} {'p99 ms':>8} "
+          f"{'win/s':>9} {'RSS MB':>7}" + ('  vs baseline' if base else ''))
+    for r in report['results']:
+        rss = f"{r['peak_rss_mb']:.0f}" if r['peak_rss_mb'] is not None else '-'
+        batch = f"{r['batch_size']}x1" if r.get('batch_mode') == 'sequential' else str(r['batch_size'])
+        line = (f"{r['format']:<16} {r['threads']:>3} {batch:>5} "
+                f"{r['latency_ms_p50']:>8.3f} {r['latency_ms_p99']:>8.3f} "
+                f"{r['throughput_windows_per_s']:>9.0f} {rss:>7}")
+        old = base.get(_key(r))
+        if old:
+            change = (r['throughput_windows_per_s'] / old['throughput_windows_per_s'] - 1) * 100
+            line += f"  {change:+.1f}% throughput"
+        print(line)
+    if any(r.get('batch_mode') == 'sequential' for r in report['results']):
+        print("\nNx1 = N sequential batch-1 invokes (TFLite models are exported with a fixed batch of 1)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark inference across model formats')
+    parser.add_argument('--model', default='vsign_model_final.h5')
+    parser.add_argument('--saved-model-dir', default='vsign_saved_model')
+    parser.add_argument('--tflite-dir', default='tflite_model')
+    parser.add_argument('--export-saved-model', action='store_true',
+                        help='write --saved-model-dir from --model first')
+    parser.add_argument('--batch-sizes', type=int, nargs='+', default=BATCH_SIZES)
+    parser.add_argument('--threads', type=int, nargs='+', default=THREADS)
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--output', default='benchmark_report.json')
+    parser.add_argument('--baseline', help='earlier report to compare throughput against')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(" " * 15 + "V-SIGN AI - INFERENCE BENCHMARK")
+    print("=" * 60)
+
+    if args.export_saved_model:
+        from inference_engine import load_keras_model
+        load_keras_model(args.model).save(args.saved_model_dir, save_format='tf')
+        print(f"✓ SavedModel written to '{args.saved_model_dir}'")
+
+    formats = discover_formats(args.model, args.saved_model_dir, args.tflite_dir)
+    if not formats:
+        print(f"\nERROR: No model found ('{args.model}', '{args.saved_model_dir}', '{args.tflite_dir}/*.tflite')")
+        raise SystemExit(1)
+
+    report = run_benchmark(formats, args.batch_sizes, args.threads, args.runs)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_results(report, baseline)
+    print(f"\n✓ Benchmark report saved to '{args.output}'")
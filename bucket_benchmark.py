@@ -0,0 +1,123 @@
+"""
+V-Sign AI - Length Bucketing Benchmark
+Measure how much of each training epoch is spent on padding when
+variable-length sequences are padded to the longest sequence, batched at
+random, or batched by length bucket, and the training step time of each
+"""
+
+import argparse
+import json
+
+import numpy as np
+from tensorflow import keras
+
+from data_pipeline import (BUCKET_BOUNDARIES, bucket_batches, make_ragged_dataset, padding_stats,
+                           plain_batches)
+from dataset_manifest import get_labels
+from train_model import create_model, load_variable_length_dataset, split_dataset, use_labels
+from training_profiler import TrainingProfiler
+
+# ===== CONFIGURATION =====
+BATCH_SIZE = 32
+EPOCHS = 2        # the first epoch traces the graph and is not timed
+SEED = 42
+# strategy -> batching options (pad_to_max: pad every batch to the longest training sequence)
+STRATEGIES = {
+    'pad_to_max': dict(bucketed=False, pad_to_max=True),
+    'random_batches': dict(bucketed=False, pad_to_max=False),
+    'length_buckets': dict(bucketed=True, pad_to_max=False),
+}
+
+
+def time_epoch(model, dataset, batch_size, num_samples):
+    """Mean training step time (ms) and wall time of the last of EPOCHS epochs."""
+    profiler = TrainingProfiler(batch_size, num_samples=num_samples)
+    model.fit(profiler.wrap(dataset), epochs=EPOCHS, verbose=0, callbacks=[profiler])
+    summary = profiler.summary()
+    return summary['mean_step_ms'], summary['per_epoch_wall_s'][-1]
+
+
+def benchmark_buckets(data_dir='dataset', architecture='lstm', units=(64, 32), batch_size=BATCH_SIZE,
+                      boundaries=BUCKET_BOUNDARIES):
+    """
+    Compare the batching strategies on the training split of `data_dir`:
+        pad_to_max:     random batches, all padded to the longest sequence
+                        (what a fixed-length input of that size would cost)
+        random_batches: random batches, each padded to its longest sequence
+        length_buckets: batches drawn from one length bucket (training default)
+    Returns the report dict.
+    """
+    use_labels(get_labels(data_dir))
+    dataset = load_variable_length_dataset(data_dir)
+    idx_train, _, _, _, _, _ = split_dataset(np.arange(len(dataset.y)), dataset.y)
+    lengths = dataset.lengths[idx_train]
+    longest = int(lengths.max())
+    print(f"\n{len(idx_train)} training sequences, {lengths.min()}-{longest} frames "
+          f"(mean {lengths.mean():.1f})")
+
+    report = {
+        'data_dir': data_dir,
+        'architecture': architecture,
+        'units': list(units),
+        'batch_size': batch_size,
+        'bucket_boundaries': list(boundaries),
+        'train_sequences': int(len(idx_train)),
+        'frames_min': int(lengths.min()),
+        'frames_max': longest,
+        'frames_mean': float(lengths.mean()),
+        'strategies': {},
+    }
+
+    for name, options in STRATEGIES.items():
+        # The same batches are counted and timed; pad_to_max and random_batches share them
+        rng = np.random.default_rng(SEED)
+        batches = (bucket_batches(lengths, batch_size, boundaries, rng) if options['bucketed']
+                   else plain_batches(lengths, batch_size, rng))
+        pad_to = longest if options['pad_to_max'] else None
+        entry = padding_stats(lengths, batches, pad_to)
+
+        keras.backend.clear_session()
+        keras.utils.set_random_seed(SEED)
+        model = create_model(architecture=architecture, units=units, variable_length=True)
+        ds = make_ragged_dataset(dataset.frames, dataset.offsets, dataset.y, idx_train, batch_size,
+                                 training=True, pad_to=pad_to, batches=batches)
+        entry['mean_step_ms'], entry['epoch_seconds'] = time_epoch(model, ds, batch_size, len(idx_train))
+        report['strategies'][name] = entry
+        print(f"  {name:<15} padding {entry['padding_waste']:6.1%}  "
+              f"step {entry['mean_step_ms']:7.1f} ms  epoch {entry['epoch_seconds']:.2f}s")
+
+    base = report['strategies']['random_batches']
+    buckets = report['strategies']['length_buckets']
+    report['step_time_saving_vs_random'] = 1.0 - buckets['epoch_seconds'] / base['epoch_seconds']
+    report['step_time_saving_vs_pad_to_max'] = (
+        1.0 - buckets['epoch_seconds'] / report['strategies']['pad_to_max']['epoch_seconds'])
+    return report
+
+
+def print_report(report):
+    print(f"\n{'strategy':<16} {'batches':>7} {'padded':>9} {'waste':>7} {'step ms':>8} {'epoch s':>8}")
+    for name, s in report['strategies'].items():
+        print(f"{name:<16} {s['batches']:>7} {s['padded_frames']:>9} {s['padding_waste']:>7.1%} "
+              f"{s['mean_step_ms']:>8.1f} {s['epoch_seconds']:>8.2f}")
+    print(f"\nLength buckets save {report['step_time_saving_vs_random']:.1%} of the epoch time vs "
+          f"random batches, {report['step_time_saving_vs_pad_to_max']:.1%} vs padding to the longest sequence")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare padding waste and step time of batching strategies')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--architecture', choices=['lstm_relu', 'lstm', 'gru'], default='lstm')
+    parser.add_argument('--units', type=int, nargs=2, default=[64, 32])
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--output', default='bucket_report.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(" " * 10 + "V-SIGN AI - LENGTH BUCKETING BENCHMARK")
+    print("=" * 60)
+
+    report = benchmark_buckets(args.data_dir, args.architecture, tuple(args.units), args.batch_size)
+    print_report(report)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n✓ Report saved to '{args.output}'")
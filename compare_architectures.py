@@ -0,0 +1,108 @@
+"""
+V-Sign AI - Architecture Comparison
+Train every model variant on the same split and compare training step time,
+single-window inference latency and test accuracy
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from dataset_manifest import get_labels
+from export_tflite import measure_latency
+from train_model import ARCHITECTURES, create_model, load_dataset, split_dataset, use_labels
+from training_profiler import TrainingProfiler
+
+# ===== CONFIGURATION =====
+EPOCHS = 30
+BATCH_SIZE = 32
+SEED = 42
+
+
+def compare_architectures(X_train, y_train, X_val, y_val, X_test, y_test,
+                          architectures=ARCHITECTURES, epochs=EPOCHS, batch_size=BATCH_SIZE, features=False):
+    results = []
+    for architecture in architectures:
+        print(f"\n--- {architecture} ---")
+        keras.backend.clear_session()
+        keras.utils.set_random_seed(SEED)
+        model = create_model(architecture=architecture, features=features)
+
+        profiler = TrainingProfiler(batch_size, num_samples=len(X_train))
+        start = time.perf_counter()
+        history = model.fit(
+            X_train, y_train, validation_data=(X_val, y_val),
+            batch_size=batch_size, epochs=epochs, verbose=0,
+            callbacks=[profiler, keras.callbacks.EarlyStopping(
+                monitor='val_loss', patience=10, restore_best_weights=True)]
+        )
+        train_seconds = time.perf_counter() - start
+        profile = profiler.summary()
+
+        forward = tf.function(lambda x: model(x, training=False),
+                              input_signature=[tf.TensorSpec((None,) + model.input_shape[1:], tf.float32)])
+        p50, p95 = measure_latency(lambda w: forward(w[np.newaxis]).numpy(), X_test[0])
+        y_pred = np.argmax(forward(X_test).numpy(), axis=1)
+
+        results.append({
+            'architecture': architecture,
+            'params': model.count_params(),
+            'epochs': len(history.history['loss']),
+            'train_seconds': round(train_seconds, 2),
+            'mean_step_ms': profile['mean_step_ms'],
+            'samples_per_s': profile['samples_per_s'],
+            'latency_ms_p50': p50,
+            'latency_ms_p95': p95,
+            'test_accuracy': float(np.mean(y_pred == y_test)),
+        })
+        print(f"✓ {architecture}: step {profile['mean_step_ms']:.2f} ms, "
+              f"latency {p50:.3f} ms, accuracy {results[-1]['test_accuracy']:.4f}")
+    return results
+
+
+def print_comparison(results):
+    base = next((r for r in results if r['architecture'] == 'lstm_relu'), results[0])
+    print(f"\n{'architecture':<12} {'params':>8} {'step ms':>8} {'speedup':>8} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'accuracy':>9}")
+    for r in results:
+        print(f"{r['architecture']:<12} {r['params']:>8} {r['mean_step_ms']:>8.2f} "
+              f"{base['mean_step_ms'] / r['mean_step_ms']:>7.2f}x "
+              f"{r['latency_ms_p50']:>8.3f} {r['latency_ms_p95']:>8.3f} {r['test_accuracy']:>9.4f}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare model architectures on the same split')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--architectures', nargs='+', choices=ARCHITECTURES, default=ARCHITECTURES)
+    parser.add_argument('--epochs', type=int, default=EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--features', action='store_true', help='with the LandmarkFeatures layer (as train_model --features)')
+    parser.add_argument('--output', default='architecture_report.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(" " * 12 + "V-SIGN AI - ARCHITECTURE COMPARISON")
+    print("=" * 60)
+
+    use_labels(get_labels(args.data_dir))
+    X, y = load_dataset(args.data_dir)
+    if len(X) == 0:
+        print("\nERROR: No data found! Run generate_sample_data.py or collect data first.")
+        raise SystemExit(1)
+
+    X_train, X_val, X_test, y_train, y_val, y_test = split_dataset(X, y)
+    X_train, X_val, X_test = (np.asarray(a, dtype=np.float32) for a in (X_train, X_val, X_test))
+    results = compare_architectures(X_train, y_train, X_val, y_val, X_test, y_test,
+                                    args.architectures, args.epochs, args.batch_size, args.features)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump({'epochs': args.epochs, 'batch_size': args.batch_size,
+                   'input_features': 'landmark_features' if args.features else 'raw',
+                   'train_samples': len(X_train), 'test_samples': len(X_test),
+                   'results': results}, f, indent=2)
+    print_comparison(results)
+    print(f"\n✓ Report saved to '{args.output}'")
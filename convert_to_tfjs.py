@@ -21,10 +21,10 @@ from tensorflow import keras
 import json
 import os
 
-# ... (Giữ nguyên phần còn lại của fil  e convert_to_tfjs.py) ...
+from inference_engine import load_labels
+from preprocessing import find_feature_layer  # also registers the LandmarkFeatures layer
 
-# Gesture labels
-GESTURES = ['Đau', 'Bác_sĩ', 'Cần_giúp', 'Thuốc', 'Cảm_ơn']
+# ... (Giữ nguyên phần còn lại của fil  e convert_to_tfjs.py) ...
 
 def convert_to_tfjs(model_path='vsign_model_final.h5', output_dir='tfjs_model'):
     """
@@ -33,6 +33,9 @@ def convert_to_tfjs(model_path='vsign_model_final.h5', output_dir='tfjs_model'):
     Args:
         model_path: Path to the trained Keras model (.h5 file)
         output_dir: Directory to save the converted model
+
+    Returns:
+        True if the model was converted, False if it was not (error printed)
     """
     print("="*60)
     print(" " * 15 + "V-SIGN AI - MODEL CONVERTER")
@@ -42,7 +45,7 @@ def convert_to_tfjs(model_path='vsign_model_final.h5', output_dir='tfjs_model'):
     if not os.path.exists(model_path):
         print(f"\nERROR: File '{model_path}' không tồn tại!")
         print("Vui lòng chạy train_model.py trước.")
-        return
+        return False
     
     # Load model
     print(f"\nĐang tải model từ '{model_path}'...")
@@ -51,6 +54,14 @@ def convert_to_tfjs(model_path='vsign_model_final.h5', output_dir='tfjs_model'):
     input_shape = model.input_shape # (None, 30, 126)
     print(f"✓ Model loaded. Input shape: {input_shape}")
     
+    # Labels the model was trained with (training_info.json), not the current
+    # manifest, so a newly added class cannot shift the deployed mapping
+    gestures = load_labels()
+    if len(gestures) != model.output_shape[-1]:
+        print(f"\nERROR: Model có {model.output_shape[-1]} lớp nhưng training_info.json có {len(gestures)} nhãn!")
+        print("Vui lòng train lại hoặc chạy finetune_gestures.py.")
+        return False
+    
     # Display model summary
     print("\nModel Summary:")
     model.summary()
@@ -86,7 +97,7 @@ def convert_to_tfjs(model_path='vsign_model_final.h5', output_dir='tfjs_model'):
         print(f"  - {filename} ({size_str})")
     
     # Create label mapping
-    label_map = {str(i): gesture for i, gesture in enumerate(GESTURES)}
+    label_map = {str(i): gesture for i, gesture in enumerate(gestures)}
     labels_path = os.path.join(output_dir, 'labels.json')
     with open(labels_path, 'w', encoding='utf-8') as f:
         json.dump(label_map, f, ensure_ascii=False, indent=2)
@@ -97,11 +108,15 @@ def convert_to_tfjs(model_path='vsign_model_final.h5', output_dir='tfjs_model'):
     metadata = {
         'model_name': 'V-Sign AI (2-Hands Support)',
         'version': '1.1.0',
-        'gestures': GESTURES,
-        'num_classes': len(GESTURES),
+        'gestures': gestures,
+        'num_classes': len(gestures),
         'sequence_length': 30,
         'num_landmarks': 42,      # 21 * 2
         'input_shape': [30, 126], # 42 * 3
+        # Variable-length models also accept any number of frames (padding masked)
+        'variable_length': input_shape[1] is None,
+        # The web app registers this layer in src/landmarkFeatures.js
+        'preprocessing': 'LandmarkFeatures' if find_feature_layer(model) else None,
         'format': 'layers_model',
         'quantized': True
     }
@@ -120,6 +135,7 @@ def convert_to_tfjs(model_path='vsign_model_final.h5', output_dir='tfjs_model'):
     print("\n3. Make predictions:")
     print("   const predictions = model.predict(inputTensor);")
     print("\n" + "="*60)
+    return True
 
 def convert_without_quantization(model_path='best_model.h5', output_dir='tfjs_model_full'):
     """
@@ -137,7 +153,8 @@ def convert_without_quantization(model_path='best_model.h5', output_dir='tfjs_mo
 
 if __name__ == '__main__':
     # Convert with quantization (recommended for web deployment)
-    convert_to_tfjs('best_model.h5', 'tfjs_model')
+    if not convert_to_tfjs('best_model.h5', 'tfjs_model'):
+        raise SystemExit(1)
     
     # Optionally convert without quantization
     # Uncomment the line below if you need full precision
@@ -0,0 +1,210 @@
+"""
+V-Sign AI - Per-Person Cross-Validation
+Grouped k-fold keyed on person_id (no signer appears in both train and test),
+folds trained concurrently on one dataset shared through shared memory
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context, shared_memory
+
+import numpy as np
+from sklearn.metrics import confusion_matrix
+from sklearn.model_selection import GroupKFold, train_test_split
+
+# ===== CONFIGURATION =====
+NUM_FOLDS = 5
+EPOCHS = 100
+BATCH_SIZE = 32
+VAL_FRACTION = 0.15  # of each training fold, for early stopping
+SEED = 42
+
+
+def _init_worker(threads):
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _run_fold(fold, shm_name, shape, y, train_idx, test_idx, num_classes,
+              epochs, batch_size, architecture, features, units, augment):
+    """Train and evaluate one fold; X is read from the parent's shared memory block."""
+    from tensorflow import keras
+    from data_pipeline import make_array_dataset
+    from train_model import create_model
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        X = np.ndarray(shape, dtype=np.float32, buffer=shm.buf)
+        fit_idx, val_idx = train_test_split(train_idx, test_size=VAL_FRACTION, random_state=SEED,
+                                            stratify=y[train_idx])
+
+        keras.backend.clear_session()
+        keras.utils.set_random_seed(SEED + fold)
+        model = create_model(architecture=architecture, units=units, num_classes=num_classes,
+                             features=features)
+        if augment:
+            train_data = {'x': make_array_dataset(X[fit_idx], y[fit_idx], batch_size, training=True,
+                                                  augment=True)}
+        else:
+            train_data = {'x': X[fit_idx], 'y': y[fit_idx], 'batch_size': batch_size}
+        history = model.fit(
+            **train_data, validation_data=(X[val_idx], y[val_idx]), epochs=epochs, verbose=0,
+            callbacks=[keras.callbacks.EarlyStopping(
+                monitor='val_loss', patience=20, restore_best_weights=True)]
+        )
+        y_pred = np.argmax(model.predict(X[test_idx], batch_size=256, verbose=0), axis=1)
+    finally:
+        del X
+        shm.close()
+
+    y_true = y[test_idx]
+    return {
+        'fold': fold,
+        'train_samples': int(len(train_idx)),
+        'test_samples': int(len(test_idx)),
+        'epochs': len(history.history['loss']),
+        'accuracy': float(np.mean(y_pred == y_true)),
+        'confusion_matrix': confusion_matrix(y_true, y_pred, labels=range(num_classes)).tolist(),
+    }
+
+
+def cross_validate(X, y, persons, gestures, n_splits=NUM_FOLDS, epochs=EPOCHS,
+                   batch_size=BATCH_SIZE, architecture='lstm_relu', workers=None, features=False,
+                   units=(128, 64), augment=False):
+    """
+    GroupKFold over person_id. X is copied once into a shared memory block
+    that every fold process maps, instead of pickling it per fold.
+    features, units and augment configure the model and its training as
+    the train_model options of the same name do.
+    """
+    groups = np.asarray(persons)
+    n_persons = len(np.unique(groups))
+    if n_persons < n_splits:
+        print(f"⚠️  Only {n_persons} distinct person_id values: using {n_persons} folds")
+        n_splits = n_persons
+    if n_splits < 2:
+        raise ValueError("Cross-validation needs data from at least 2 different person_id values")
+
+    folds = list(GroupKFold(n_splits=n_splits).split(X, y, groups))
+    workers = workers or max(1, min(n_splits, os.cpu_count() or 1))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"\nRunning {n_splits} person-grouped folds on {workers} worker(s)...")
+
+    shm = shared_memory.SharedMemory(create=True, size=max(1, X.size * 4))
+    try:
+        shared_X = np.ndarray(X.shape, dtype=np.float32, buffer=shm.buf)
+        shared_X[:] = X
+        del shared_X
+
+        y = np.asarray(y)
+        spawn = get_context('spawn')
+        with ProcessPoolExecutor(max_workers=workers, mp_context=spawn,
+                                 initializer=_init_worker, initargs=(threads,)) as pool:
+            futures = [pool.submit(_run_fold, i, shm.name, X.shape, y, train_idx, test_idx,
+                                   len(gestures), epochs, batch_size, architecture, features,
+                                   tuple(units), augment)
+                       for i, (train_idx, test_idx) in enumerate(folds)]
+            results = [f.result() for f in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    for r, (_, test_idx) in zip(results, folds):
+        r['test_persons'] = sorted(set(groups[test_idx].tolist()))
+        print(f"  fold {r['fold']}: accuracy {r['accuracy']:.4f} "
+              f"({r['test_samples']} sequences, persons {', '.join(r['test_persons'])})")
+    report = summarize_folds(results, gestures, architecture)
+    report.update(input_features='landmark_features' if features else 'raw', units=list(units), augment=augment)
+    return report
+
+
+def summarize_folds(results, gestures, architecture):
+    """Mean/std accuracy and the confusion matrix summed over all folds."""
+    accuracies = np.array([r['accuracy'] for r in results])
+    cm = np.sum([r['confusion_matrix'] for r in results], axis=0)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    per_class = {
+        gesture: {
+            'recall': float(cm[i, i] / support[i]) if support[i] else None,
+            'precision': float(cm[i, i] / predicted[i]) if predicted[i] else None,
+            'support': int(support[i]),
+        }
+        for i, gesture in enumerate(gestures)
+    }
+    return {
+        'architecture': architecture,
+        'num_folds': len(results),
+        'accuracy_mean': float(accuracies.mean()),
+        'accuracy_std': float(accuracies.std()),
+        'pooled_accuracy': float(np.trace(cm) / cm.sum()) if cm.sum() else None,
+        'per_class': per_class,
+        'confusion_matrix': cm.tolist(),
+        'folds': results,
+    }
+
+
+def print_cv_report(report, gestures):
+    print("\n" + "=" * 50)
+    print("Per-Person Cross-Validation")
+    print("=" * 50)
+    print(f"Accuracy: {report['accuracy_mean']:.4f} ± {report['accuracy_std']:.4f} "
+          f"over {report['num_folds']} folds")
+    print(f"\n{'gesture':<12} {'precision':>9} {'recall':>7} {'support':>8}")
+    for gesture in gestures:
+        c = report['per_class'][gesture]
+        precision = f"{c['precision']:.3f}" if c['precision'] is not None else '-'
+        recall = f"{c['recall']:.3f}" if c['recall'] is not None else '-'
+        print(f"{gesture:<12} {precision:>9} {recall:>7} {c['support']:>8}")
+    print("\nConfusion Matrix (summed over folds):")
+    print(np.array(report['confusion_matrix']))
+
+
+def run_cross_validation(data_dir='dataset', n_splits=NUM_FOLDS, epochs=EPOCHS, batch_size=BATCH_SIZE,
+                         architecture='lstm_relu', workers=None, output='cv_report.json', features=False,
+                         units=(128, 64), augment=False, resample=False):
+    from dataset_manifest import get_labels
+    from train_model import load_dataset, print_missing_dataset, use_labels
+
+    gestures = get_labels(data_dir)
+    use_labels(gestures)
+    X, y, persons = load_dataset(data_dir, with_persons=True, resample=resample)
+    if len(X) == 0:
+        print_missing_dataset()
+        return None
+
+    report = cross_validate(np.asarray(X, dtype=np.float32), y, persons, gestures,
+                            n_splits, epochs, batch_size, architecture, workers, features, units, augment)
+    report['resample'] = resample
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_cv_report(report, gestures)
+    print(f"\n✓ Cross-validation report saved to '{output}'")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Grouped k-fold cross-validation by person_id')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--folds', type=int, default=NUM_FOLDS)
+    parser.add_argument('--epochs', type=int, default=EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--architecture', default='lstm_relu')
+    parser.add_argument('--features', action='store_true', help='with the LandmarkFeatures layer (as train_model --features)')
+    parser.add_argument('--units', type=int, nargs=2, default=[128, 64])
+    parser.add_argument('--augment', action='store_true', help='augment training batches on the fly')
+    parser.add_argument('--resample', action='store_true',
+                        help='resample sequences of another length instead of skipping them')
+    parser.add_argument('--workers', type=int, help='concurrent folds (default: one per core)')
+    parser.add_argument('--output', default='cv_report.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(" " * 11 + "V-SIGN AI - PER-PERSON CROSS-VALIDATION")
+    print("=" * 60)
+    run_cross_validation(args.data_dir, args.folds, args.epochs, args.batch_size,
+                         args.architecture, args.workers, args.output, args.features, tuple(args.units),
+                         args.augment, args.resample)
@@ -0,0 +1,238 @@
+"""
+V-Sign AI - Streaming Input Pipeline
+Read dataset files lazily with tf.data instead of loading everything into RAM
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import tensorflow as tf
+
+from augmentation import augment_batch
+from dataset_cache import FRAME_FEATURES, list_source_files, parse_sequence_file
+
+# ===== CONFIGURATION =====
+SHUFFLE_BUFFER = 2048   # sequences held in memory for shuffling
+CYCLE_LENGTH = 8        # files read concurrently
+# Variable-length sequences are batched with others of similar length:
+# bucket i holds BUCKET_BOUNDARIES[i-1] < frames <= BUCKET_BOUNDARIES[i]
+BUCKET_BOUNDARIES = (20, 30, 40, 50, 65, 80, 100)
+
+
+def _path_bucket(path):
+    return int(hashlib.md5(path.encode('utf-8')).hexdigest()[:8], 16) / 0xFFFFFFFF
+
+
+def split_files(files, val_fraction=0.15, test_fraction=0.15):
+    """
+    Assign every (path, label) file to 'train', 'val' or 'test' from a hash
+    of its path, per class. The split is stable across runs and does not
+    move existing files when new ones are added to the dataset. Every class
+    with at least 3 files is stratified into all three splits: when the
+    hashes leave its val or test split empty, the training file with the
+    lowest hash moves there.
+    """
+    splits = {'train': [], 'val': [], 'test': []}
+    by_label = {}
+    for item in files:
+        by_label.setdefault(item[1], []).append(item)
+
+    for items in by_label.values():
+        assigned = {'train': [], 'val': [], 'test': []}
+        for item in sorted(items, key=lambda it: _path_bucket(it[0])):
+            bucket = _path_bucket(item[0])
+            if bucket < test_fraction:
+                assigned['test'].append(item)
+            elif bucket < test_fraction + val_fraction:
+                assigned['val'].append(item)
+            else:
+                assigned['train'].append(item)
+        if len(items) >= 3:
+            for name in ('test', 'val'):
+                if not assigned[name] and len(assigned['train']) > 1:
+                    assigned[name].append(assigned['train'].pop(0))
+        for name in splits:
+            splits[name].extend(assigned[name])
+    return splits
+
+
+def _read_file(path, label, sequence_length, resample):
+    sequences, _, _, _ = parse_sequence_file(path.decode('utf-8'), int(sequence_length),
+                                             resample=bool(resample))
+    for sequence in sequences:
+        yield sequence, label
+
+
+def _finish(ds, augment):
+    if augment:
+        # Fresh random augmentation every epoch, nothing is stored
+        ds = ds.map(augment_batch, num_parallel_calls=tf.data.AUTOTUNE)
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def make_array_dataset(X, y, batch_size=32, training=False, augment=False):
+    """
+    Batch an in-memory (or memory-mapped) array without copying it into
+    the graph: batches are gathered by index on the fly.
+    """
+    X_shape = X.shape[1:]
+
+    def gather(idx):
+        idx = np.sort(idx)
+        return np.asarray(X[idx], dtype=np.float32), np.asarray(y[idx], dtype=np.int64)
+
+    ds = tf.data.Dataset.range(len(X))
+    if training:
+        ds = ds.shuffle(len(X), reshuffle_each_iteration=True)
+    ds = ds.batch(batch_size).map(
+        lambda idx: tf.numpy_function(gather, [idx], (tf.float32, tf.int64)),
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not training,
+    )
+    ds = ds.map(lambda x, labels: (tf.ensure_shape(x, (None,) + X_shape),
+                                   tf.ensure_shape(labels, (None,))))
+    return _finish(ds, augment)
+
+
+# ===== VARIABLE-LENGTH SEQUENCES =====
+def bucket_batches(lengths, batch_size=32, boundaries=BUCKET_BOUNDARIES, rng=None):
+    """
+    Group positions 0..len(lengths)-1 into batches of sequences of similar
+    length, so little of each padded batch is padding. With `rng` the
+    buckets and the batch order are shuffled (training), otherwise every
+    bucket is sorted by length. Returns a list of index arrays.
+    """
+    lengths = np.asarray(lengths)
+    bucket_ids = np.searchsorted(boundaries, lengths, side='left')
+    batches = []
+    for bucket in np.unique(bucket_ids):
+        idx = np.flatnonzero(bucket_ids == bucket)
+        idx = rng.permutation(idx) if rng is not None else idx[np.argsort(lengths[idx], kind='stable')]
+        batches.extend(idx[i:i + batch_size] for i in range(0, len(idx), batch_size))
+    if rng is not None:
+        batches = [batches[i] for i in rng.permutation(len(batches))]
+    return batches
+
+
+def plain_batches(lengths, batch_size=32, rng=None):
+    """Consecutive (or, with `rng`, randomly drawn) batches regardless of length."""
+    idx = rng.permutation(len(lengths)) if rng is not None else np.arange(len(lengths))
+    return [idx[i:i + batch_size] for i in range(0, len(idx), batch_size)]
+
+
+def padding_stats(lengths, batches, pad_to=None):
+    """
+    Frames the model steps through for `batches` padded to their longest
+    sequence (or all to `pad_to`), and the fraction of them that is padding.
+    """
+    lengths = np.asarray(lengths)
+    frames = int(sum(lengths[b].sum() for b in batches))
+    padded = int(sum(len(b) * (pad_to or lengths[b].max()) for b in batches))
+    return {'batches': len(batches), 'frames': frames, 'padded_frames': padded,
+            'padding_waste': 1.0 - frames / padded if padded else 0.0}
+
+
+def make_ragged_dataset(frames, offsets, y, indices=None, batch_size=32, training=False,
+                        augment=False, bucketed=True, boundaries=BUCKET_BOUNDARIES, pad_to=None, seed=None,
+                        batches=None):
+    """
+    Batch variable-length sequences stored as one (total frames, 126) array
+    (dataset_cache: sequence i is frames[offsets[i]:offsets[i + 1]]).
+    `indices` selects the sequences of a split (default: all).
+
+    Each batch is zero-padded at the end to its longest sequence, and the
+    model masks the padded steps (create_model(variable_length=True)).
+    bucketed=True draws batches from length buckets (bucket_batches),
+    False from the whole split (plain_batches, for comparison); `pad_to`
+    pads every batch to that many frames instead. `batches` (a list of
+    position arrays into `indices`) fixes the batches of every epoch.
+    """
+    indices = np.arange(len(offsets) - 1) if indices is None else np.asarray(indices)
+    starts = np.asarray(offsets[:-1])[indices]
+    lengths = (np.asarray(offsets[1:])[indices] - starts).astype(np.int64)
+    labels = np.asarray(y)[indices]
+    rng = np.random.default_rng(seed) if training else None
+
+    def generate():
+        # Called once per epoch: a training run reshuffles buckets and batches
+        epoch_batches = batches
+        if epoch_batches is None:
+            epoch_batches = (bucket_batches(lengths, batch_size, boundaries, rng) if bucketed
+                             else plain_batches(lengths, batch_size, rng))
+        for batch in epoch_batches:
+            x = np.zeros((len(batch), pad_to or lengths[batch].max(), FRAME_FEATURES), dtype=np.float32)
+            for row, i in enumerate(batch):
+                x[row, :lengths[i]] = frames[starts[i]:starts[i] + lengths[i]]
+            yield x, labels[batch], lengths[batch]
+
+    signature = (
+        tf.TensorSpec(shape=(None, None, FRAME_FEATURES), dtype=tf.float32),
+        tf.TensorSpec(shape=(None,), dtype=tf.int64),
+        tf.TensorSpec(shape=(None,), dtype=tf.int64),
+    )
+    ds = tf.data.Dataset.from_generator(generate, output_signature=signature)
+    if augment:
+        ds = ds.map(lambda x, labels, batch_lengths: augment_batch(x, labels, lengths=batch_lengths),
+                    num_parallel_calls=tf.data.AUTOTUNE)
+    else:
+        ds = ds.map(lambda x, labels, batch_lengths: (x, labels))
+    return ds.prefetch(tf.data.AUTOTUNE)
+
+
+def make_file_dataset(files, sequence_length=30, batch_size=32, training=False,
+                      shuffle_buffer=SHUFFLE_BUFFER, cycle_length=CYCLE_LENGTH,
+                      augment=False, resample=False):
+    """
+    Build a tf.data pipeline over (path, label) pairs.
+
+    Files are opened lazily and interleaved, sequences are shuffled through
+    a bounded buffer when training, then batched and prefetched. Only
+    `shuffle_buffer` sequences plus a few batches are resident at a time.
+    augment=True applies augmentation.augment_batch to each batch.
+    Sequences of another length than `sequence_length` are skipped, or
+    resampled to it with resample=True.
+    """
+    paths = [path for path, _ in files]
+    labels = np.array([label for _, label in files], dtype=np.int64)
+
+    signature = (
+        tf.TensorSpec(shape=(sequence_length, FRAME_FEATURES), dtype=tf.float32),
+        tf.TensorSpec(shape=(), dtype=tf.int64),
+    )
+    ds = tf.data.Dataset.from_tensor_slices((paths, labels))
+    if training:
+        ds = ds.shuffle(len(paths), reshuffle_each_iteration=True)
+    ds = ds.interleave(
+        lambda path, label: tf.data.Dataset.from_generator(
+            _read_file, args=(path, label, sequence_length, resample), output_signature=signature),
+        cycle_length=cycle_length,
+        num_parallel_calls=tf.data.AUTOTUNE,
+        deterministic=not training,
+    )
+    if training:
+        ds = ds.shuffle(shuffle_buffer, reshuffle_each_iteration=True)
+    return _finish(ds.batch(batch_size), augment)
+
+
+def make_streaming_splits(data_dir, gestures, sequence_length=30, batch_size=32,
+                          augment=False, resample=False):
+    """
+    Return (train_ds, val_ds, test_ds, file_counts) streaming from `data_dir`.
+    Only the training split is augmented.
+    """
+    label_of = {g: i for i, g in enumerate(gestures)}
+    files = [(rel_path, label_of[gesture])
+             for rel_path, gesture in list_source_files(data_dir, gestures)]
+    splits = split_files(files)
+    splits = {name: [(os.path.join(data_dir, path), label) for path, label in items]
+              for name, items in splits.items()}
+
+    datasets = tuple(
+        make_file_dataset(splits[name], sequence_length, batch_size,
+                          training=(name == 'train'), augment=augment and name == 'train',
+                          resample=resample)
+        for name in ('train', 'val', 'test')
+    )
+    file_counts = {name: len(items) for name, items in splits.items()}
+    return datasets + (file_counts,)
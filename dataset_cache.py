@@ -0,0 +1,351 @@
+"""
+V-Sign AI - Dataset Cache
+Compile dataset/<gesture>/*.json|*.vsq into a memory-mapped float32 cache:
+every sequence at its recorded length, plus a view resampled to the model's
+fixed sequence length
+"""
+
+import hashlib
+import json
+import os
+from typing import NamedTuple
+
+import numpy as np
+
+from dataset_manifest import label_folder, record_files
+from sequence_format import EXTENSION as BINARY_EXTENSION, parse_binary_file
+
+# ===== CONFIGURATION =====
+CACHE_DIRNAME = '.cache'
+CACHE_VERSION = 3
+FRAME_FEATURES = 126  # 42 landmarks * 3 coordinates
+HAND_FEATURES = 63    # 21 landmarks * 3 coordinates
+MIN_FRAMES = 8        # shorter recordings are rejected (not a whole sign)
+MAX_FRAMES = 150      # longer ones too (5 s at 30 fps, the collector was left running)
+
+SEQUENCES_FILE = 'sequences.npy'  # (N, sequence_length, 126) resampled view
+FRAMES_FILE = 'frames.npy'        # (total frames, 126) every sequence at its own length
+LENGTHS_FILE = 'lengths.npy'      # (N,) int32 frames per sequence
+INDEX_FILE = 'index.json'
+
+
+class CachedDataset(NamedTuple):
+    X: np.ndarray         # (N, SEQUENCE_LENGTH, 126) float32, memory-mapped
+    y: np.ndarray         # (N,) int label index into `gestures`
+    persons: np.ndarray   # (N,) person_id of the file each sequence came from
+    file_ids: np.ndarray  # (N,) index into `files`
+    files: list           # one index entry per source file
+    frames: np.ndarray    # (total frames, 126) float32, memory-mapped
+    offsets: np.ndarray   # (N + 1,) sequence i is frames[offsets[i]:offsets[i + 1]]
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    def sequence(self, i):
+        """Sequence i at its recorded length, (frames, 126)."""
+        return self.frames[self.offsets[i]:self.offsets[i + 1]]
+
+
+# ===== PARSING =====
+def frame_to_vector(landmarks):
+    """
+    Flatten one frame of {x, y, z} landmarks into 126 float32 values.
+    One-hand frames (21 landmarks) are zero-padded, extra landmarks are
+    truncated. Returns None for empty frames.
+    """
+    values = [v for lm in landmarks for v in (lm['x'], lm['y'], lm['z'])]
+    if not values:
+        return None
+    vector = np.zeros(FRAME_FEATURES, dtype=np.float32)
+    values = values[:FRAME_FEATURES]
+    vector[:len(values)] = values
+    return vector
+
+
+def sequence_to_array(sequence):
+    """
+    One JSON sequence as a (frames, 126) float32 array. Frames without a
+    hand are kept as zeros, so a recording keeps its length (and timing).
+    """
+    frames = np.zeros((len(sequence['frames']), FRAME_FEATURES), dtype=np.float32)
+    for i, frame in enumerate(sequence['frames']):
+        vector = frame_to_vector(frame['landmarks'])
+        if vector is not None:
+            frames[i] = vector
+    return frames
+
+
+def resample_sequence(frames, length):
+    """
+    Linearly resample (frames, 126) to `length` frames over the same time span.
+    A hand slot is interpolated only where both neighbouring frames have it,
+    otherwise the nearest frame is taken, so an absent hand stays exactly zero.
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    if len(frames) == length:
+        return frames
+    pos = np.linspace(0, len(frames) - 1, length, dtype=np.float32)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.minimum(lo + 1, len(frames) - 1)
+    frac = (pos - lo)[:, None, None]
+
+    hands_lo = frames[lo].reshape(length, 2, HAND_FEATURES)
+    hands_hi = frames[hi].reshape(length, 2, HAND_FEATURES)
+    both = (hands_lo.any(axis=-1) & hands_hi.any(axis=-1))[..., None]
+    nearest = np.where(frac < 0.5, hands_lo, hands_hi)
+    out = np.where(both, hands_lo + (hands_hi - hands_lo) * frac, nearest)
+    return out.reshape(length, FRAME_FEATURES).astype(np.float32)
+
+
+def fit_sequences(sequences, sequence_length=30, resample=True):
+    """
+    Apply the dataset length policy to a list of (frames, 126) arrays.
+    Sequences outside MIN_FRAMES..MAX_FRAMES are rejected; the rest are
+    resampled to `sequence_length`, or kept at their own length when
+    sequence_length is None. resample=False keeps only the sequences of
+    exactly `sequence_length` frames (the fixed-length policy).
+
+    Returns:
+        sequences: (n, sequence_length, 126) float32, or a list of
+            (frames, 126) arrays when sequence_length is None
+        rejected: number of sequences dropped
+    """
+    if resample or sequence_length is None:
+        kept = [s for s in sequences if MIN_FRAMES <= len(s) <= MAX_FRAMES]
+    else:
+        kept = [s for s in sequences if len(s) == sequence_length]
+    rejected = len(sequences) - len(kept)
+    if sequence_length is None:
+        return kept, rejected
+    if kept:
+        return np.stack([resample_sequence(s, sequence_length) for s in kept]), rejected
+    return np.zeros((0, sequence_length, FRAME_FEATURES), dtype=np.float32), rejected
+
+
+def parse_sequences(data, sequence_length=30, resample=True):
+    """
+    Convert a decoded collector export into float32 arrays (see fit_sequences).
+
+    Returns:
+        sequences: (n, sequence_length, 126) float32, or a list of
+            (frames, 126) arrays when sequence_length is None
+        rejected: number of sequences dropped for being too short or too long
+    """
+    return fit_sequences([sequence_to_array(s) for s in data.get('sequences', [])], sequence_length, resample)
+
+
+def parse_sequence_file(path, sequence_length=30, loads=json.loads, resample=True):
+    """
+    Read and parse one dataset file (.json or binary .vsq).
+
+    Returns:
+        sequences, person_id, rejected, sha1 of the raw file bytes
+    """
+    if path.endswith(BINARY_EXTENSION):
+        sequences, person_id = parse_binary_file(path)
+        sequences, rejected = fit_sequences(sequences, sequence_length, resample)
+        return sequences, person_id, rejected, file_sha1(path)
+
+    with open(path, 'rb') as f:
+        raw = f.read()
+    data = loads(raw)
+    sequences, rejected = parse_sequences(data, sequence_length, resample)
+    return sequences, str(data.get('person_id', '')), rejected, hashlib.sha1(raw).hexdigest()
+
+
+def file_sha1(path):
+    sha1 = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+# ===== CACHE =====
+def list_source_files(data_dir, gestures):
+    """
+    Return (relative_path, gesture) for every dataset file, in a stable order.
+    When both name.json and name.vsq exist, only the binary file is used.
+    """
+    sources = []
+    for gesture in gestures:
+        gesture_folder = label_folder(gesture)
+        gesture_path = os.path.join(data_dir, gesture_folder)
+        if not os.path.isdir(gesture_path):
+            continue
+        filenames = os.listdir(gesture_path)
+        binary_stems = {os.path.splitext(f)[0] for f in filenames if f.endswith(BINARY_EXTENSION)}
+        for filename in sorted(filenames):
+            stem, ext = os.path.splitext(filename)
+            if ext == BINARY_EXTENSION or (ext == '.json' and stem not in binary_stems):
+                sources.append((os.path.join(gesture_folder, filename), gesture))
+    return sources
+
+
+def _read_index(cache_dir, sequence_length):
+    index_path = os.path.join(cache_dir, INDEX_FILE)
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != CACHE_VERSION or index.get('sequence_length') != sequence_length:
+        return None
+    if not all(os.path.exists(os.path.join(cache_dir, name))
+               for name in (SEQUENCES_FILE, FRAMES_FILE, LENGTHS_FILE)):
+        return None
+    return index
+
+
+def _write_index(cache_dir, index):
+    tmp_path = os.path.join(cache_dir, INDEX_FILE + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, os.path.join(cache_dir, INDEX_FILE))
+
+
+def _open_arrays(cache_dir):
+    """(sequences, frames, lengths) memory maps of the cache."""
+    return tuple(np.load(os.path.join(cache_dir, name), mmap_mode='r')
+                 for name in (SEQUENCES_FILE, FRAMES_FILE, LENGTHS_FILE))
+
+
+def build_cache(data_dir, gestures, sequence_length=30, rebuild=False,
+                parse_files=None, verbose=True):
+    """
+    Bring the cache for `data_dir` up to date and return its file index.
+
+    Files whose size and mtime are unchanged are reused as-is; files whose
+    mtime changed are re-hashed and only re-parsed if the content differs.
+    The file table of dataset/manifest.json is updated from the result.
+    Sequences are stored at their recorded length (frames.npy + lengths.npy)
+    and resampled to `sequence_length` (sequences.npy).
+
+    Args:
+        parse_files: optional callable(list_of_paths, sequence_length) that
+            yields (path, sequences, person_id, rejected, sha1) for each path,
+            used to plug in a parallel parser. Defaults to serial parsing.
+            It is called with sequence_length=None (sequences as lists).
+    """
+    cache_dir = os.path.join(data_dir, CACHE_DIRNAME)
+    old_index = None if rebuild else _read_index(cache_dir, sequence_length)
+    old_entries = {e['path']: e for e in old_index['files']} if old_index else {}
+
+    entries, reused, stale = [], 0, []
+    for rel_path, gesture in list_source_files(data_dir, gestures):
+        st = os.stat(os.path.join(data_dir, rel_path))
+        old = old_entries.get(rel_path)
+        entry = {'path': rel_path, 'gesture': gesture,
+                 'mtime_ns': st.st_mtime_ns, 'size': st.st_size}
+        if old is not None and old['gesture'] == gesture and old['size'] == st.st_size:
+            if old['mtime_ns'] == st.st_mtime_ns or old['sha1'] == file_sha1(os.path.join(data_dir, rel_path)):
+                entry.update({k: old[k] for k in ('sha1', 'person_id', 'start', 'count',
+                                                  'frame_start', 'frame_count', 'rejected')})
+                entries.append(entry)
+                reused += 1
+                continue
+        stale.append(len(entries))
+        entries.append(entry)
+
+    if (old_index is not None and not stale
+            and [e['path'] for e in entries] == [e['path'] for e in old_index['files']]):
+        # Same files in the same order: the sequence array is still valid
+        if entries != old_index['files']:
+            old_index['files'] = entries  # only mtimes moved (touched, same content)
+            _write_index(cache_dir, old_index)
+        record_files(data_dir, entries)
+        if verbose:
+            print(f"Dataset cache up to date ({len(entries)} files)")
+        return old_index
+
+    if verbose:
+        print(f"Updating dataset cache: {reused} files reused, {len(stale)} to parse...")
+
+    if parse_files is None:
+        parse_files = _parse_files_serial
+    stale_entries = {os.path.join(data_dir, entries[i]['path']): entries[i] for i in stale}
+    parsed = {}
+    for path, sequences, person_id, rejected, sha1 in parse_files(list(stale_entries), None):
+        parsed[path] = sequences
+        stale_entries[path].update({'sha1': sha1, 'person_id': person_id,
+                      'count': len(sequences), 'frame_count': int(sum(len(s) for s in sequences)),
+                      'rejected': int(rejected)})
+
+    total = sum(e['count'] for e in entries)
+    total_frames = sum(e['frame_count'] for e in entries)
+    os.makedirs(cache_dir, exist_ok=True)
+    shapes = {SEQUENCES_FILE: (np.float32, (total, sequence_length, FRAME_FEATURES)),
+              FRAMES_FILE: (np.float32, (total_frames, FRAME_FEATURES)),
+              LENGTHS_FILE: (np.int32, (total,))}
+    tmp_paths = {name: os.path.join(cache_dir, name.replace('.npy', '.tmp.npy')) for name in shapes}
+    out, out_frames, out_lengths = (
+        np.lib.format.open_memmap(tmp_paths[name], mode='w+', dtype=dtype, shape=shape)
+        for name, (dtype, shape) in shapes.items())
+
+    old = _open_arrays(cache_dir) if old_index is not None and reused else None
+    cursor = frame_cursor = 0
+    for entry in entries:
+        count, frame_count = entry['count'], entry['frame_count']
+        path = os.path.join(data_dir, entry['path'])
+        if path in parsed and count:
+            sequences = parsed[path]
+            out[cursor:cursor + count] = [resample_sequence(s, sequence_length) for s in sequences]
+            out_frames[frame_cursor:frame_cursor + frame_count] = np.concatenate(sequences)
+            out_lengths[cursor:cursor + count] = [len(s) for s in sequences]
+        elif count:
+            start, frame_start = entry['start'], entry['frame_start']
+            out[cursor:cursor + count] = old[0][start:start + count]
+            out_frames[frame_cursor:frame_cursor + frame_count] = old[1][frame_start:frame_start + frame_count]
+            out_lengths[cursor:cursor + count] = old[2][start:start + count]
+        entry['start'], entry['frame_start'] = cursor, frame_cursor
+        cursor += count
+        frame_cursor += frame_count
+
+    for array in (out, out_frames, out_lengths):
+        array.flush()
+    del out, out_frames, out_lengths, old, array  # release the mappings before replacing the files
+    for name, tmp_path in tmp_paths.items():
+        os.replace(tmp_path, os.path.join(cache_dir, name))
+
+    index = {
+        'version': CACHE_VERSION,
+        'sequence_length': sequence_length,
+        'num_sequences': total,
+        'files': entries,
+    }
+    _write_index(cache_dir, index)
+    record_files(data_dir, entries)
+
+    if verbose:
+        print(f"✓ Dataset cache written: {total} sequences from {len(entries)} files")
+    return index
+
+
+def _parse_files_serial(paths, sequence_length):
+    for path in paths:
+        sequences, person_id, rejected, sha1 = parse_sequence_file(path, sequence_length)
+        yield path, sequences, person_id, rejected, sha1
+
+
+def load_cached_dataset(data_dir, gestures, sequence_length=30, rebuild=False,
+                        parse_files=None, verbose=True):
+    """
+    Load the dataset through the cache, building or refreshing it first.
+    X (resampled to `sequence_length`) and the variable-length frames are
+    returned as read-only memory maps, so no copy is made.
+    """
+    index = build_cache(data_dir, gestures, sequence_length, rebuild=rebuild,
+                        parse_files=parse_files, verbose=verbose)
+    files = index['files']
+    label_of = {g: i for i, g in enumerate(gestures)}
+
+    X, frames, lengths = _open_arrays(os.path.join(data_dir, CACHE_DIRNAME))
+    offsets = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+    counts = np.array([e['count'] for e in files], dtype=np.int64)
+    file_ids = np.repeat(np.arange(len(files)), counts)
+    y = np.array([label_of[e['gesture']] for e in files], dtype=np.int64)[file_ids]
+    persons = np.array([e['person_id'] for e in files], dtype=object)[file_ids]
+    return CachedDataset(X, y, persons, file_ids, files, frames, offsets)
@@ -0,0 +1,107 @@
+"""
+V-Sign AI - Dataset Manifest
+Single label registry for every script: dataset/manifest.json holds the
+ordered class list, per-class counts and file checksums (a label's folder
+is always label_folder(name))
+"""
+
+import json
+import os
+
+# ===== CONFIGURATION =====
+MANIFEST_FILE = 'manifest.json'
+MANIFEST_VERSION = 1
+# Used to bootstrap a manifest for datasets created before it existed
+DEFAULT_LABELS = ['Đau', 'Bác_sĩ', 'Cần_giúp', 'Thuốc', 'Cảm_ơn']
+
+FILE_FIELDS = ('gesture', 'sha1', 'size', 'mtime_ns', 'person_id', 'count', 'rejected')
+
+
+def label_folder(name):
+    """Dataset folder of a label (spaces are not used in folder names)."""
+    return name.replace(' ', '_')
+
+
+def manifest_path(data_dir='dataset'):
+    return os.path.join(data_dir, MANIFEST_FILE)
+
+
+def load_manifest(data_dir='dataset'):
+    """Read dataset/manifest.json, or a fresh one with DEFAULT_LABELS if it does not exist yet."""
+    path = manifest_path(data_dir)
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('version', 0) > MANIFEST_VERSION:
+            raise ValueError(f"{path}: manifest version {manifest['version']} is newer than supported")
+        return manifest
+    return {
+        'version': MANIFEST_VERSION,
+        'labels': [{'name': name} for name in DEFAULT_LABELS],
+        'counts': {},
+        'files': {},
+    }
+
+
+def save_manifest(manifest, data_dir='dataset'):
+    """Recompute per-class counts and write the manifest atomically."""
+    for label in manifest['labels']:
+        label.pop('folder', None)  # written by older versions, the folder is derived from the name
+    counts = {label['name']: {'files': 0, 'sequences': 0} for label in manifest['labels']}
+    for entry in manifest['files'].values():
+        if entry['gesture'] in counts:
+            counts[entry['gesture']]['files'] += 1
+            counts[entry['gesture']]['sequences'] += entry.get('count', 0)
+    manifest['counts'] = counts
+
+    os.makedirs(data_dir, exist_ok=True)
+    path = manifest_path(data_dir)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def get_labels(data_dir='dataset'):
+    """Ordered class names; the list index is the model's class index."""
+    return [label['name'] for label in load_manifest(data_dir)['labels']]
+
+
+def add_label(name, data_dir='dataset'):
+    """
+    Append a new class (existing class indices never change) and create its
+    folder. Returns the updated label list.
+    """
+    manifest = load_manifest(data_dir)
+    if name in [label['name'] for label in manifest['labels']]:
+        raise ValueError(f"Label '{name}' already exists")
+    manifest['labels'].append({'name': name})
+    os.makedirs(os.path.join(data_dir, label_folder(name)), exist_ok=True)
+    save_manifest(manifest, data_dir)
+    return [label['name'] for label in manifest['labels']]
+
+
+def record_files(data_dir, entries):
+    """
+    Update the file table from ingested file entries (dataset cache index
+    entries: path, gesture, sha1, size, mtime_ns, person_id, count,
+    rejected). Files of the ingested labels that are no longer listed are
+    dropped, as are files of other labels that no longer exist on disk (a
+    label whose files were all deleted counts 0). Only writes when something changed.
+    """
+    manifest = load_manifest(data_dir)
+    gestures = {entry['gesture'] for entry in entries}
+    files = {path: entry for path, entry in manifest['files'].items()
+             if entry['gesture'] not in gestures and os.path.exists(os.path.join(data_dir, path))}
+    for entry in entries:
+        files[entry['path']] = {k: entry[k] for k in FILE_FIELDS if k in entry}
+
+    if files != manifest['files'] or not os.path.exists(manifest_path(data_dir)):
+        manifest['files'] = files
+        save_manifest(manifest, data_dir)
+    return manifest
+
+
+def class_counts(data_dir='dataset'):
+    """{label: {'files': n, 'sequences': n}} as of the last ingestion, without scanning folders."""
+    return load_manifest(data_dir).get('counts', {})
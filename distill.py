@@ -0,0 +1,273 @@
+"""
+V-Sign AI - Knowledge Distillation
+Train a small student model (one GRU or a short temporal conv stack) on the
+trained model's softened outputs for low-end devices, export it through
+convert_to_tfjs and compare size, latency and accuracy with the teacher
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras.layers import GRU, Conv1D, Dense, Dropout, GlobalAveragePooling1D
+
+from export_tflite import measure_latency
+from inference_engine import load_keras_model, load_labels
+from preprocessing import LandmarkFeatures
+
+# ===== CONFIGURATION =====
+STUDENTS = ['gru', 'conv1d']
+STUDENT_UNITS = 32
+TEMPERATURE = 4.0
+HARD_LABEL_WEIGHT = 0.1    # alpha: weight of the ground-truth loss, 1 - alpha on the teacher
+EPOCHS = 60
+BATCH_SIZE = 32
+LEARNING_RATE = 3e-3
+SEED = 42
+
+
+# ===== STUDENT =====
+def student_body(architecture='gru', units=STUDENT_UNITS, features=False):
+    """Feature layers of the student, everything up to the classifier head."""
+    layers = [LandmarkFeatures()] if features else []
+    if architecture == 'gru':
+        layers += [GRU(units)]
+    elif architecture == 'conv1d':
+        # Receptive field of 13 frames, averaged over the window
+        layers += [
+            Conv1D(units, 5, padding='same', activation='relu'),
+            Conv1D(units, 5, padding='same', dilation_rate=2, activation='relu'),
+            GlobalAveragePooling1D(),
+        ]
+    else:
+        raise ValueError(f"Unknown student '{architecture}' (choose from {STUDENTS})")
+    return layers + [Dropout(0.2)]
+
+
+def build_student(input_shape, num_classes, architecture='gru', units=STUDENT_UNITS, features=False):
+    """
+    Returns (trainer, student, logits, head). Both models share the body
+    layers: the trainer ends in the `logits` layer for the distillation
+    loss, the student in the usual float32 softmax `head` (loaded with the
+    logits weights after training), so every inference/export path treats
+    it like a create_model() model.
+    """
+    body = student_body(architecture, units, features)
+    logits = Dense(num_classes, name='logits')
+    trainer = keras.Sequential([keras.Input(shape=input_shape)] + body + [logits])
+
+    head = Dense(num_classes, activation='softmax', dtype='float32', name='probabilities')
+    student = keras.Sequential([keras.Input(shape=input_shape)] + body + [head])
+    return trainer, student, logits, head
+
+
+# ===== LOSS =====
+def soften(probabilities, temperature=TEMPERATURE):
+    """Teacher softmax outputs -> softmax(logits / T); log p equals the logits up to a constant."""
+    log_p = np.log(np.clip(probabilities, 1e-12, 1.0)) / temperature
+    log_p -= log_p.max(axis=1, keepdims=True)
+    soft = np.exp(log_p)
+    return (soft / soft.sum(axis=1, keepdims=True)).astype(np.float32)
+
+
+def distillation_targets(y, soft_targets):
+    """Pack one-hot labels and teacher soft targets into one (N, 2C) target array."""
+    num_classes = soft_targets.shape[1]
+    return np.concatenate([np.eye(num_classes, dtype=np.float32)[y], soft_targets], axis=1)
+
+
+def distillation_loss(temperature=TEMPERATURE, alpha=HARD_LABEL_WEIGHT):
+    """
+    alpha * CE(labels, softmax(z)) + (1 - alpha) * T^2 * CE(teacher_T, softmax(z / T))
+    (cross-entropy to the teacher differs from the KL divergence by a constant).
+    """
+    def loss(targets, logits):
+        num_classes = tf.shape(logits)[-1]
+        hard, soft = targets[:, :num_classes], targets[:, num_classes:]
+        hard_loss = keras.losses.categorical_crossentropy(hard, logits, from_logits=True)
+        soft_loss = keras.losses.categorical_crossentropy(soft, logits / temperature, from_logits=True)
+        return alpha * hard_loss + (1 - alpha) * temperature ** 2 * soft_loss
+    return loss
+
+
+def label_accuracy(targets, logits):
+    num_classes = tf.shape(logits)[-1]
+    return tf.cast(tf.equal(tf.argmax(targets[:, :num_classes], axis=-1), tf.argmax(logits, axis=-1)),
+                   tf.float32)
+
+
+# ===== TRAINING =====
+def train_student(teacher, X_train, y_train, X_val, y_val, architecture='gru', units=STUDENT_UNITS,
+                  temperature=TEMPERATURE, alpha=HARD_LABEL_WEIGHT, epochs=EPOCHS,
+                  batch_size=BATCH_SIZE, features=False):
+    """
+    Fit a student on the teacher's softened outputs (alpha=1.0 trains on
+    the labels only, i.e. the same network without distillation).
+    Returns (student, epochs_run, seconds).
+    """
+    keras.utils.set_random_seed(SEED)
+    num_classes = teacher.output_shape[-1]
+    trainer, student, logits, head = build_student(teacher.input_shape[1:], num_classes,
+                                                   architecture, units, features)
+
+    # Teacher outputs are computed once, not per epoch
+    def targets(X, y):
+        return distillation_targets(y, soften(teacher.predict(X, batch_size=256, verbose=0), temperature))
+
+    trainer.compile(optimizer=keras.optimizers.Adam(learning_rate=LEARNING_RATE),
+                    loss=distillation_loss(temperature, alpha), metrics=[label_accuracy])
+    start = time.perf_counter()
+    history = trainer.fit(
+        X_train, targets(X_train, y_train), validation_data=(X_val, targets(X_val, y_val)),
+        batch_size=batch_size, epochs=epochs, verbose=2,
+        callbacks=[keras.callbacks.EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
+                   keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5)]
+    )
+    seconds = time.perf_counter() - start
+
+    head.set_weights(logits.get_weights())
+    student.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return student, len(history.history['loss']), seconds
+
+
+# ===== REPORT =====
+def profile_model(model, path, X_test, y_test, reference=None):
+    """Size, single-window latency and test accuracy of a saved model (plus agreement with `reference`)."""
+    forward = tf.function(lambda x: model(x, training=False),
+                          input_signature=[tf.TensorSpec((None,) + model.input_shape[1:], tf.float32)])
+    p50, p95 = measure_latency(lambda w: forward(w[np.newaxis]).numpy(), X_test[0])
+    predictions = np.argmax(forward(X_test).numpy(), axis=1)
+    entry = {
+        'path': path,
+        'params': model.count_params(),
+        'size_bytes': os.path.getsize(path),
+        'latency_ms_p50': p50,
+        'latency_ms_p95': p95,
+        'accuracy': float(np.mean(predictions == y_test)),
+    }
+    if reference is not None:
+        entry['teacher_agreement'] = float(np.mean(predictions == reference))
+    return entry, predictions
+
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def print_distillation_report(report):
+    print(f"\n{'model':<18} {'params':>8} {'size KB':>9} {'tfjs KB':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'accuracy':>9} {'agree':>7}")
+    for name, r in report['models'].items():
+        tfjs = f"{r['tfjs_size_bytes'] / 1024:.1f}" if r.get('tfjs_size_bytes') else '-'
+        agree = f"{r['teacher_agreement']:.3f}" if 'teacher_agreement' in r else '-'
+        print(f"{name:<18} {r['params']:>8} {r['size_bytes'] / 1024:>9.1f} {tfjs:>8} "
+              f"{r['latency_ms_p50']:>8.3f} {r['latency_ms_p95']:>8.3f} {r['accuracy']:>9.4f} {agree:>7}")
+    teacher, student = report['models']['teacher'], report['models']['student']
+    print(f"\nStudent: {teacher['params'] / student['params']:.1f}x fewer parameters, "
+          f"{teacher['latency_ms_p50'] / student['latency_ms_p50']:.1f}x faster, "
+          f"accuracy {student['accuracy'] - teacher['accuracy']:+.4f}")
+
+
+def distill(teacher_path='vsign_model_final.h5', data_dir='dataset', architecture='gru',
+            units=STUDENT_UNITS, temperature=TEMPERATURE, alpha=HARD_LABEL_WEIGHT, epochs=EPOCHS,
+            batch_size=BATCH_SIZE, output_path='vsign_model_student.h5', tfjs_dir='tfjs_model_student',
+            compare_scratch=False, report_path='distillation_report.json', features=False):
+    from train_model import load_dataset, split_dataset, use_labels
+
+    print("=" * 60)
+    print(" " * 13 + "V-SIGN AI - KNOWLEDGE DISTILLATION")
+    print("=" * 60)
+
+    if not os.path.exists(teacher_path):
+        print(f"\nERROR: File '{teacher_path}' không tồn tại!")
+        print("Vui lòng chạy train_model.py trước.")
+        return None
+
+    teacher = load_keras_model(teacher_path)
+    labels = load_labels()
+    if len(labels) != teacher.output_shape[-1]:
+        print(f"\nERROR: Model có {teacher.output_shape[-1]} lớp nhưng training_info.json có {len(labels)} nhãn!")
+        return None
+
+    # Same classes and the same held-out split as the teacher's training run
+    use_labels(labels)
+    X, y = load_dataset(data_dir)
+    if len(X) == 0:
+        print("\nERROR: No data found! Run generate_sample_data.py or collect data first.")
+        return None
+    X_train, X_val, X_test, y_train, y_val, y_test = split_dataset(X, y)
+    X_train, X_val, X_test = (np.asarray(a, dtype=np.float32) for a in (X_train, X_val, X_test))
+
+    print(f"\nTeacher: {teacher.count_params()} parameters. Student: {architecture} ({units} units), "
+          f"T={temperature}, alpha={alpha}")
+    student, epochs_run, seconds = train_student(teacher, X_train, y_train, X_val, y_val, architecture,
+                                                 units, temperature, alpha, epochs, batch_size, features)
+    student.save(output_path)
+    print(f"\n✓ Student saved as '{output_path}' ({epochs_run} epochs, {seconds:.1f}s)")
+
+    teacher_entry, teacher_pred = profile_model(teacher, teacher_path, X_test, y_test)
+    student_entry, _ = profile_model(student, output_path, X_test, y_test, reference=teacher_pred)
+    student_entry.update(architecture=architecture, units=units, epochs=epochs_run,
+                         train_seconds=round(seconds, 2))
+    report = {
+        'temperature': temperature,
+        'hard_label_weight': alpha,
+        'test_samples': int(len(y_test)),
+        'models': {'teacher': teacher_entry, 'student': student_entry},
+    }
+
+    if compare_scratch:
+        # Same student trained on the labels only: what the teacher adds
+        scratch, scratch_epochs, _ = train_student(teacher, X_train, y_train, X_val, y_val, architecture,
+                                                   units, temperature, 1.0, epochs, batch_size, features)
+        scratch_path = os.path.splitext(output_path)[0] + '_scratch.h5'
+        scratch.save(scratch_path)
+        report['models']['student_scratch'], _ = profile_model(scratch, scratch_path, X_test, y_test,
+                                                               reference=teacher_pred)
+        report['models']['student_scratch']['epochs'] = scratch_epochs
+
+    if tfjs_dir:
+        try:
+            from convert_to_tfjs import convert_to_tfjs
+        except ImportError as e:
+            print(f"\n⚠️  TF.js export skipped ({e}); run convert_to_tfjs.py on '{output_path}' later")
+        else:
+            if convert_to_tfjs(output_path, tfjs_dir):
+                student_entry.update(tfjs_dir=tfjs_dir, tfjs_size_bytes=_dir_size(tfjs_dir))
+            else:
+                print(f"\n⚠️  TF.js export failed; '{output_path}' was not converted")
+
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print_distillation_report(report)
+    print(f"\n✓ Report saved to '{report_path}'")
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Distill the trained model into a small student')
+    parser.add_argument('--teacher', default='vsign_model_final.h5')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--architecture', choices=STUDENTS, default='gru')
+    parser.add_argument('--units', type=int, default=STUDENT_UNITS)
+    parser.add_argument('--temperature', type=float, default=TEMPERATURE)
+    parser.add_argument('--alpha', type=float, default=HARD_LABEL_WEIGHT,
+                        help='weight of the ground-truth loss (the rest goes to the teacher)')
+    parser.add_argument('--epochs', type=int, default=EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--output', default='vsign_model_student.h5')
+    parser.add_argument('--tfjs-dir', default='tfjs_model_student', help="'' skips the TF.js export")
+    parser.add_argument('--compare-scratch', action='store_true',
+                        help='also train the student without the teacher for comparison')
+    parser.add_argument('--features', action='store_true',
+                        help='student with the LandmarkFeatures preprocessing layer (as train_model --features)')
+    parser.add_argument('--report', default='distillation_report.json')
+    args = parser.parse_args()
+
+    distill(args.teacher, args.data_dir, args.architecture, args.units, args.temperature, args.alpha,
+            args.epochs, args.batch_size, args.output, args.tfjs_dir, args.compare_scratch, args.report,
+            args.features)
@@ -0,0 +1,210 @@
+"""
+V-Sign AI - TFLite Exporter
+Export the trained Keras model to TFLite float16 and full-int8 for CPU-only
+Python inference hosts, and report size, latency and accuracy vs the .h5 model
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from inference_engine import SEQUENCE_LENGTH, load_keras_model, load_labels
+
+# ===== CONFIGURATION =====
+VARIANTS = ['float32', 'float16', 'int8']
+REPRESENTATIVE_SAMPLES = 200
+LATENCY_RUNS = 200
+
+
+def unrolled_for_export(model, batch_size=1):
+    """
+    Clone `model` with a fixed batch size and unrolled recurrent layers.
+    The converter cannot lower the LSTM while-loop with a dynamic batch
+    dimension, and int8 calibration of the loop crashes; the unrolled
+    graph converts to plain fully-connected/elementwise TFLite ops.
+    A variable-length model is exported for SEQUENCE_LENGTH-frame windows.
+    """
+    def clone_layer(layer):
+        config = layer.get_config()
+        if isinstance(layer, keras.layers.RNN):
+            config['unroll'] = True
+        return layer.__class__.from_config(config)
+
+    time_steps = model.input_shape[1] or SEQUENCE_LENGTH
+    inputs = keras.Input(batch_shape=(batch_size, time_steps) + tuple(model.input_shape[2:]))
+    clone = keras.models.clone_model(model, input_tensors=inputs, clone_function=clone_layer)
+    clone.set_weights(model.get_weights())
+    return clone
+
+
+def convert(model, variant, representative_X=None):
+    """
+    Convert a Keras model to TFLite bytes.
+        float32: no quantization
+        float16: float16 weights, float32 compute on CPU
+        int8:    full integer model with int8 input/output, calibrated on
+                 `representative_X`
+    """
+    converter = tf.lite.TFLiteConverter.from_keras_model(unrolled_for_export(model))
+    if variant == 'float16':
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.target_spec.supported_types = [tf.float16]
+    elif variant == 'int8':
+        if representative_X is None or len(representative_X) == 0:
+            raise ValueError("int8 export needs representative data (run train_model.py's dataset first)")
+
+        def representative_dataset():
+            for sequence in representative_X:
+                yield [np.asarray(sequence, dtype=np.float32)[np.newaxis]]
+
+        converter.optimizations = [tf.lite.Optimize.DEFAULT]
+        converter.representative_dataset = representative_dataset
+        converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+        converter.inference_input_type = tf.int8
+        converter.inference_output_type = tf.int8
+    elif variant != 'float32':
+        raise ValueError(f"Unknown TFLite variant '{variant}'")
+    return converter.convert()
+
+
+class TFLiteModel:
+    """Batch-1 TFLite interpreter with (de)quantization of int8 inputs/outputs."""
+
+    def __init__(self, model_path=None, model_content=None, num_threads=1):
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, model_content=model_content,
+                                               num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self.input = self.interpreter.get_input_details()[0]
+        self.output = self.interpreter.get_output_details()[0]
+
+    def predict_one(self, window):
+        x = np.asarray(window, dtype=np.float32)[np.newaxis]
+        if self.input['dtype'] == np.int8:
+            scale, zero_point = self.input['quantization']
+            x = np.clip(np.round(x / scale + zero_point), -128, 127).astype(np.int8)
+        self.interpreter.set_tensor(self.input['index'], x)
+        self.interpreter.invoke()
+        y = self.interpreter.get_tensor(self.output['index'])[0]
+        if self.output['dtype'] == np.int8:
+            scale, zero_point = self.output['quantization']
+            y = (y.astype(np.float32) - zero_point) * scale
+        return y
+
+    def predict(self, X):
+        return np.stack([self.predict_one(x) for x in X]) if len(X) else np.zeros((0, 0))
+
+
+def measure_latency(predict_one, window, runs=LATENCY_RUNS):
+    """Median and p95 single-window latency in ms."""
+    predict_one(window)
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        predict_one(window)
+        times.append((time.perf_counter() - start) * 1000)
+    return float(np.median(times)), float(np.percentile(times, 95))
+
+
+def export_tflite(model_path='vsign_model_final.h5', output_dir='tflite_model',
+                  data_dir='dataset', variants=VARIANTS, num_threads=1):
+    """
+    Export every variant to `output_dir` and write tflite_report.json with
+    size, per-window CPU latency and test accuracy delta vs the Keras model.
+    """
+    from train_model import load_dataset, split_dataset
+
+    print("=" * 60)
+    print(" " * 15 + "V-SIGN AI - TFLITE EXPORTER")
+    print("=" * 60)
+
+    if not os.path.exists(model_path):
+        print(f"\nERROR: File '{model_path}' không tồn tại!")
+        print("Vui lòng chạy train_model.py trước.")
+        return None
+
+    model = load_keras_model(model_path)
+    X, y = load_dataset(data_dir)
+    if len(X):
+        X_train, _, X_test, _, _, y_test = split_dataset(X, y)
+        rng = np.random.default_rng(0)
+        rep_idx = rng.choice(len(X_train), min(REPRESENTATIVE_SAMPLES, len(X_train)), replace=False)
+        representative_X = np.asarray(X_train[np.sort(rep_idx)], dtype=np.float32)
+        X_test = np.asarray(X_test, dtype=np.float32)
+    else:
+        print("\n⚠️  No dataset found: int8 is skipped and accuracy is not reported")
+        representative_X, X_test, y_test = None, None, None
+        variants = [v for v in variants if v != 'int8']
+
+    os.makedirs(output_dir, exist_ok=True)
+    sample = X_test[0] if X_test is not None else np.zeros((SEQUENCE_LENGTH,) + model.input_shape[2:],
+                                                           dtype=np.float32)
+
+    forward = tf.function(lambda x: model(x, training=False))
+    keras_latency = measure_latency(lambda w: forward(w[np.newaxis]).numpy(), sample)
+    report = {
+        'source_model': model_path,
+        'num_threads': num_threads,
+        'test_samples': int(len(X_test)) if X_test is not None else 0,
+        'variants': {
+            'keras_h5': {
+                'size_bytes': os.path.getsize(model_path),
+                'latency_ms_p50': keras_latency[0],
+                'latency_ms_p95': keras_latency[1],
+            }
+        },
+    }
+    if X_test is not None:
+        keras_acc = float(np.mean(np.argmax(model.predict(X_test, verbose=0), axis=1) == y_test))
+        report['variants']['keras_h5']['accuracy'] = keras_acc
+
+    for variant in variants:
+        print(f"\nĐang chuyển đổi sang TFLite ({variant})...")
+        content = convert(model, variant, representative_X)
+        path = os.path.join(output_dir, f'vsign_{variant}.tflite')
+        with open(path, 'wb') as f:
+            f.write(content)
+
+        tflite_model = TFLiteModel(model_content=content, num_threads=num_threads)
+        p50, p95 = measure_latency(tflite_model.predict_one, sample)
+        entry = {'path': path, 'size_bytes': len(content), 'latency_ms_p50': p50, 'latency_ms_p95': p95}
+        if X_test is not None:
+            acc = float(np.mean(np.argmax(tflite_model.predict(X_test), axis=1) == y_test))
+            entry.update(accuracy=acc, accuracy_delta=acc - keras_acc)
+        report['variants'][variant] = entry
+        print(f"✓ {path} ({len(content) / 1024:.1f} KB)")
+
+    label_map = {str(i): gesture for i, gesture in enumerate(load_labels())}
+    with open(os.path.join(output_dir, 'labels.json'), 'w', encoding='utf-8') as f:
+        json.dump(label_map, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(output_dir, 'tflite_report.json'), 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_report(report)
+    print(f"\n✓ Report saved to '{os.path.join(output_dir, 'tflite_report.json')}'")
+    return report
+
+
+def print_report(report):
+    print(f"\n{'variant':<10} {'size KB':>9} {'p50 ms':>8} {'p95 ms':>8} {'accuracy':>9} {'delta':>8}")
+    for name, v in report['variants'].items():
+        acc = f"{v['accuracy']:.4f}" if 'accuracy' in v else '-'
+        delta = f"{v['accuracy_delta']:+.4f}" if 'accuracy_delta' in v else '-'
+        print(f"{name:<10} {v['size_bytes'] / 1024:>9.1f} {v['latency_ms_p50']:>8.3f} "
+              f"{v['latency_ms_p95']:>8.3f} {acc:>9} {delta:>8}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export the Keras model to TFLite float16/int8')
+    parser.add_argument('--model', default='vsign_model_final.h5')
+    parser.add_argument('--output-dir', default='tflite_model')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--variants', nargs='+', default=VARIANTS, choices=VARIANTS)
+    parser.add_argument('--threads', type=int, default=1, help='interpreter threads for the latency test')
+    args = parser.parse_args()
+
+    export_tflite(args.model, args.output_dir, args.data_dir, args.variants, args.threads)
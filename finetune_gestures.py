@@ -0,0 +1,228 @@
+"""
+V-Sign AI - Incremental Gesture Fine-Tuning
+Add new signs to a trained model without retraining from scratch: extend the
+classifier head, rehearse old classes from a sampled replay buffer and report
+accuracy on old and new classes
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+from sklearn.model_selection import train_test_split
+from tensorflow import keras
+
+from inference_engine import load_keras_model, load_labels
+from dataset_manifest import get_labels
+from train_model import load_dataset, use_labels
+
+# ===== CONFIGURATION =====
+REPLAY_PER_CLASS = 50      # old-class sequences rehearsed per class
+HEAD_EPOCHS = 15           # phase 1: only the new head trains
+FINETUNE_EPOCHS = 15       # phase 2: all non-BatchNorm layers at a low learning rate
+HEAD_LR = 1e-3
+FINETUNE_LR = 1e-4
+BATCH_SIZE = 32
+SEED = 42
+
+
+def extend_head(model, num_new):
+    """
+    Replace the softmax layer with one that has `num_new` extra outputs.
+    Old class columns keep their trained weights (and indices); the new
+    columns start from the initializer.
+    """
+    old_head = model.layers[-1]
+    kernel, bias = old_head.get_weights()
+    num_old = kernel.shape[1]
+
+    features = model.layers[-2].output
+    head = keras.layers.Dense(num_old + num_new, activation='softmax', dtype='float32', name='head_extended')
+    extended = keras.Model(model.inputs, head(features))
+
+    new_kernel, new_bias = head.get_weights()
+    new_kernel[:, :num_old] = kernel
+    new_bias[:num_old] = bias
+    # Start new logits at the mean old bias so they are not drowned out at first
+    new_bias[num_old:] = bias.mean()
+    head.set_weights([new_kernel, new_bias])
+    return extended
+
+
+def _set_trainable(model, head_only):
+    for layer in model.layers:
+        if isinstance(layer, keras.layers.BatchNormalization):
+            layer.trainable = False  # keep running statistics of the original data
+        else:
+            layer.trainable = (layer is model.layers[-1]) or not head_only
+
+
+def build_finetune_split(X, y, num_old, replay_per_class=REPLAY_PER_CLASS, seed=SEED):
+    """
+    Old classes: a held-out test slice plus a replay buffer of at most
+    `replay_per_class` sequences per class from the rest.
+    New classes: a 70/15/15 split. Returns index arrays (train, val, old_test, new_test).
+    """
+    rng = np.random.default_rng(seed)
+    idx = np.arange(len(y))
+    old_idx, new_idx = idx[y < num_old], idx[y >= num_old]
+
+    old_pool, old_test = train_test_split(old_idx, test_size=0.15, random_state=seed, stratify=y[old_idx])
+    replay = np.concatenate([
+        rng.choice(c_idx, min(replay_per_class, len(c_idx)), replace=False)
+        for c_idx in (old_pool[y[old_pool] == c] for c in range(num_old)) if len(c_idx)
+    ])
+    new_train, new_rest = train_test_split(new_idx, test_size=0.3, random_state=seed, stratify=y[new_idx])
+    new_val, new_test = train_test_split(new_rest, test_size=0.5, random_state=seed, stratify=y[new_rest])
+
+    replay_train, replay_val = train_test_split(replay, test_size=0.15, random_state=seed, stratify=y[replay])
+    train = rng.permutation(np.concatenate([replay_train, new_train]))
+    val = np.concatenate([replay_val, new_val])
+    return train, val, old_test, new_test
+
+
+def _accuracy(model, X, y):
+    if len(y) == 0:
+        return None
+    return float(np.mean(np.argmax(model.predict(X, batch_size=256, verbose=0), axis=1) == y))
+
+
+def _training_info(info_path):
+    if not os.path.exists(info_path):
+        return {}
+    with open(info_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def finetune(model_path='vsign_model_final.h5', data_dir='dataset', new_gestures=None,
+             output_path='vsign_model_final.h5', info_path='training_info.json',
+             replay_per_class=REPLAY_PER_CLASS, head_epochs=HEAD_EPOCHS,
+             finetune_epochs=FINETUNE_EPOCHS, batch_size=BATCH_SIZE, resample=None):
+    """
+    Extend the model at `model_path` with `new_gestures` (default: manifest
+    labels it does not know). Sequences of another length than the window
+    are skipped or resampled as for the base model (train_model --resample,
+    recorded in training_info.json; every length for a variable-length model)
+    unless `resample` says otherwise.
+    """
+    print("=" * 60)
+    print(" " * 12 + "V-SIGN AI - INCREMENTAL GESTURE TRAINING")
+    print("=" * 60)
+
+    if not os.path.exists(model_path):
+        print(f"\nERROR: File '{model_path}' không tồn tại!")
+        print("Vui lòng chạy train_model.py trước.")
+        return None
+
+    old_labels = load_labels(info_path)
+    if new_gestures is None:
+        new_gestures = [g for g in get_labels(data_dir) if g not in old_labels]
+    new_gestures = [g for g in new_gestures if g not in old_labels]
+    if not new_gestures:
+        print("\nKhông có ký hiệu mới: tất cả nhãn trong manifest đã có trong model.")
+        return None
+
+    # Old classes keep their indices, new ones are appended
+    labels = old_labels + new_gestures
+    num_old = len(old_labels)
+    print(f"\nModel classes: {', '.join(old_labels)}")
+    print(f"Adding:        {', '.join(new_gestures)}")
+
+    if resample is None:
+        # A variable-length base model has seen every recorded length
+        info = _training_info(info_path)
+        resample = bool(info.get('resample') or info.get('variable_length'))
+    use_labels(labels)
+    X, y = load_dataset(data_dir, resample=resample)
+    missing = [g for i, g in enumerate(labels) if not np.any(y == i)]
+    if missing:
+        print(f"\nERROR: Không có dữ liệu cho: {', '.join(missing)}")
+        return None
+
+    train_idx, val_idx, old_test, new_test = build_finetune_split(X, y, num_old, replay_per_class)
+    X_train, y_train = np.asarray(X[np.sort(train_idx)], dtype=np.float32), y[np.sort(train_idx)]
+    X_val, y_val = np.asarray(X[val_idx], dtype=np.float32), y[val_idx]
+    X_old, y_old = np.asarray(X[old_test], dtype=np.float32), y[old_test]
+    X_new, y_new = np.asarray(X[new_test], dtype=np.float32), y[new_test]
+    print(f"\nFine-tuning on {len(X_train)} sequences "
+          f"({int(np.sum(y_train < num_old))} replayed old, {int(np.sum(y_train >= num_old))} new)")
+
+    base = load_keras_model(model_path)
+    old_accuracy_before = _accuracy(base, X_old, y_old)
+
+    keras.utils.set_random_seed(SEED)
+    model = extend_head(base, len(new_gestures))
+    # The replay buffer usually outnumbers the new samples: balance the classes
+    counts = np.bincount(y_train, minlength=len(labels))
+    class_weight = {i: len(y_train) / (len(labels) * c) for i, c in enumerate(counts) if c}
+    early_stopping = keras.callbacks.EarlyStopping(monitor='val_loss', patience=5, restore_best_weights=True)
+    start = time.perf_counter()
+    for head_only, epochs, lr in ((True, head_epochs, HEAD_LR), (False, finetune_epochs, FINETUNE_LR)):
+        _set_trainable(model, head_only)
+        model.compile(optimizer=keras.optimizers.Adam(learning_rate=lr),
+                      loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+        print(f"\n{'Phase 1: head only' if head_only else 'Phase 2: fine-tune all layers'} "
+              f"({epochs} epochs, lr {lr:g})")
+        model.fit(X_train, y_train, validation_data=(X_val, y_val), batch_size=batch_size,
+                  epochs=epochs, shuffle=True, class_weight=class_weight,
+                  callbacks=[early_stopping], verbose=2)
+    seconds = time.perf_counter() - start
+
+    for layer in model.layers:
+        layer.trainable = True
+    model.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    model.save(output_path)
+
+    info = _training_info(info_path)
+    full_training_s = (info.get('training_profile') or {}).get('total_wall_s')
+    result = {
+        'new_gestures': new_gestures,
+        'replay_per_class': replay_per_class,
+        'resample': bool(resample),
+        'train_samples': int(len(X_train)),
+        'seconds': round(seconds, 2),
+        'fraction_of_full_training': round(seconds / full_training_s, 3) if full_training_s else None,
+        'old_class_accuracy_before': old_accuracy_before,
+        'old_class_accuracy_after': _accuracy(model, X_old, y_old),
+        'new_class_accuracy': _accuracy(model, X_new, y_new),
+        'old_test_samples': int(len(y_old)),
+        'new_test_samples': int(len(y_new)),
+    }
+    info.update(gestures=labels, num_classes=len(labels))
+    info.setdefault('finetune_history', []).append(result)
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+
+    print("\n" + "=" * 50)
+    print(f"Fine-tuning finished in {seconds:.1f}s"
+          + (f" ({result['fraction_of_full_training'] * 100:.0f}% of the last full training)"
+             if full_training_s else ""))
+    print(f"Old classes accuracy: {old_accuracy_before:.4f} -> {result['old_class_accuracy_after']:.4f} "
+          f"({len(y_old)} held-out sequences)")
+    print(f"New classes accuracy: {result['new_class_accuracy']:.4f} ({len(y_new)} held-out sequences)")
+    print(f"\n✓ Model saved as '{output_path}', labels updated in '{info_path}'")
+    print("Chạy convert_to_tfjs.py để cập nhật model cho web app.")
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Add new gestures to a trained model by fine-tuning')
+    parser.add_argument('--model', default='vsign_model_final.h5')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--new-gestures', nargs='+',
+                        help='default: manifest labels that the model does not know')
+    parser.add_argument('--output', default='vsign_model_final.h5')
+    parser.add_argument('--replay-per-class', type=int, default=REPLAY_PER_CLASS)
+    parser.add_argument('--head-epochs', type=int, default=HEAD_EPOCHS)
+    parser.add_argument('--finetune-epochs', type=int, default=FINETUNE_EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--resample', action='store_true', default=None,
+                        help='resample sequences of another length instead of skipping them '
+                             '(default: as the base model was trained)')
+    args = parser.parse_args()
+
+    finetune(args.model, args.data_dir, args.new_gestures, args.output,
+             replay_per_class=args.replay_per_class, head_epochs=args.head_epochs,
+             finetune_epochs=args.finetune_epochs, batch_size=args.batch_size, resample=args.resample)
@@ -5,158 +5,226 @@ This is for demonstration only - replace with real data collection
 """
 
 import numpy as np
+import argparse
 import json
 import os
+import time
+import zlib
 from pathlib import Path
 
+from dataset_manifest import get_labels, label_folder, load_manifest, manifest_path, save_manifest
+from sequence_format import write_sequences
+
 # Gesture configurations
-GESTURES = ['Đau', 'Bác_sĩ', 'Cần_giúp', 'Thuốc', 'Cảm_ơn']
 SEQUENCE_LENGTH = 30
 NUM_LANDMARKS = 42
+HAND_LANDMARKS = 21
 SAMPLES_PER_GESTURE = 50  # Generate 50 samples per gesture
+SAMPLES_PER_PERSON = 10
+NOISE_STD = 0.005
+CHUNK_SIZE = 10000        # sequences generated per NumPy pass (bounds memory)
+
+# Cấu trúc ngón tay giả lập đơn giản (Wrist là 0, các ngón tay từ 1-20)
+HAND_TEMPLATE = np.stack([
+    (np.arange(HAND_LANDMARKS) % 4) * 0.01,
+    -(np.arange(HAND_LANDMARKS) // 4) * 0.02,
+    np.zeros(HAND_LANDMARKS),
+], axis=-1).astype(np.float32)  # (21, 3)
+
+# ===== TRAJECTORIES =====
+# progress: (n, T) in [0, 1). Each function returns the (n, T, 3) base
+# position of hand 1 (landmarks 0-20) and hand 2 (21-41), None = hand unused.
+def _point(progress, x, y, z):
+    return np.stack(np.broadcast_arrays(x, y, z, progress)[:3], axis=-1)
+
+def _dau(p):
+    # 1 Tay: Di chuyển tay 1 về phía cơ thể, chuyển động cong
+    return _point(p, 0.3 + p * 0.2, 0.5 + np.sin(p * np.pi) * 0.1, 0.0), None
+
+def _bac_si(p):
+    # 2 Tay: Tay 1 chạm vào cổ tay 2
+    return _point(p, 0.5 + (1 - p) * 0.2, 0.6, 0.0), _point(p, 0.5, 0.7, 0.0)
+
+def _can_giup(p):
+    # 2 Tay: Cùng đưa lên cao
+    wobble = np.sin(p * 2 * np.pi) * 0.05
+    return _point(p, 0.3 + wobble, 0.5 - p * 0.3, 0.0), _point(p, 0.7 - wobble, 0.5 - p * 0.3, 0.0)
+
+def _thuoc(p):
+    # 1 Tay: Đưa tay lên miệng
+    return _point(p, 0.5, 0.5 - p * 0.3, 0.0), None
+
+def _cam_on(p):
+    # 1 Tay: Đưa tay từ cằm ra phía trước (trục Z, về phía camera)
+    return _point(p, 0.3, 0.5 + p * 0.1, -p * 0.4), None
+
+TRAJECTORIES = {
+    'Đau': _dau,
+    'Bác_sĩ': _bac_si,
+    'Cần_giúp': _can_giup,
+    'Thuốc': _thuoc,
+    'Cảm_ơn': _cam_on,
+}
 
-def generate_gesture_pattern(gesture_name, sample_idx):
+def default_trajectory(gesture_name):
     """
-    Sinh dữ liệu giả lập cho ký hiệu 1 tay và 2 tay (42 landmarks total).
-    Hand 1: landmarks 0-20
-    Hand 2: landmarks 21-41
+    Deterministic trajectory for labels without a hand-written one (e.g.
+    added through the manifest): a curved path between two points derived
+    from the label name, with one hand or two mirrored hands.
     """
-    frames = []
-    
-    for frame_idx in range(SEQUENCE_LENGTH):
-        landmarks = []
-        progress = frame_idx / SEQUENCE_LENGTH
-        
-        # --- Khởi tạo vị trí gốc cho 2 tay ---
-        # Tay 1 (thường nằm bên trái khung hình)
-        h1_base = [0.3, 0.5, 0.0] 
-        # Tay 2 (thường nằm bên phải khung hình)
-        h2_base = [0.7, 0.5, 0.0]
-        
-        # --- Định nghĩa quỹ đạo di chuyển (Trajectory) ---
-        if gesture_name == 'Đau':
-            # 1 Tay: Di chuyển tay 1 về phía cơ thể, Tay 2 triệt tiêu
-            h1_base[0] += progress * 0.2  # Di chuyển x
-            h1_base[1] += np.sin(progress * np.pi) * 0.1 # Chuyển động cong
-            h2_base = [0.0, 0.0, 0.0] # Không sử dụng tay 2
-
-        elif gesture_name == 'Bác_sĩ':
-            # 2 Tay: Tay 1 chạm vào cổ tay 2
-            h1_base = [0.5 + (1-progress)*0.2, 0.6, 0.0]
-            h2_base = [0.5, 0.7, 0.0]
-
-        elif gesture_name == 'Cần_giúp':
-            # 2 Tay: Cùng đưa lên cao
-            h1_base[1] -= progress * 0.3
-            h2_base[1] -= progress * 0.3
-            h1_base[0] += np.sin(progress * 2 * np.pi) * 0.05
-            h2_base[0] -= np.sin(progress * 2 * np.pi) * 0.05
-
-        elif gesture_name == 'Thuốc':
-            # 1 Tay: Đưa tay lên miệng
-            h1_base[1] -= progress * 0.3
-            h1_base[0] = 0.5 
-            h2_base = [0.0, 0.0, 0.0]
-
-        elif gesture_name == 'Cảm_ơn':
-            # 1 Tay: Đưa tay từ cằm ra phía trước
-            h1_base[2] -= progress * 0.4 # Di chuyển trục Z (về phía camera)
-            h1_base[1] += progress * 0.1
-            h2_base = [0.0, 0.0, 0.0]
-
-        # --- Sinh chi tiết 42 landmarks dựa trên vị trí gốc ---
-        for hand_idx in range(2):
-            current_base = h1_base if hand_idx == 0 else h2_base
-            
-            # Nếu tay đó không hoạt động (tọa độ 0), điền 21 landmark 0
-            if current_base == [0.0, 0.0, 0.0]:
-                for _ in range(21):
-                    landmarks.append({'x': 0.0, 'y': 0.0, 'z': 0.0})
-                continue
-
-            # Nếu tay có hoạt động, sinh cấu trúc bàn tay cơ bản
-            for lm_idx in range(21):
-                # Thêm nhiễu nhẹ để model học tốt hơn
-                noise = np.random.normal(0, 0.005, 3)
-                
-                # Cấu trúc ngón tay giả lập đơn giản dựa trên lm_idx
-                # (Wrist là 0, các ngón tay từ 1-20)
-                offset_y = (lm_idx // 4) * 0.02 
-                offset_x = (lm_idx % 4) * 0.01
-                
-                landmarks.append({
-                    'x': float(current_base[0] + offset_x + noise[0]),
-                    'y': float(current_base[1] - offset_y + noise[1]),
-                    'z': float(current_base[2] + noise[2])
-                })
-        
-        frames.append({'landmarks': landmarks})
-        
-    return frames
-
-def generate_dataset(output_dir='dataset'):
+    rng = np.random.default_rng(zlib.crc32(gesture_name.encode('utf-8')))
+    start, end = rng.uniform(0.25, 0.75, (2, 3)) * [1, 1, 0]
+    bend = rng.uniform(-0.1, 0.1)
+    two_hands = rng.random() < 0.5
+
+    def trajectory(p):
+        h1 = start + (end - start) * p[..., None]
+        h1[..., 1] += np.sin(p * np.pi) * bend
+        h2 = h1 * [-1, 1, 1] + [1, 0, 0] if two_hands else None
+        return h1, h2
+    return trajectory
+
+# ===== VECTORISED GENERATION =====
+def signer_profiles(person_ids, seed=0):
+    """
+    Per-signer variation, stable for a person across gestures and runs with
+    the same seed: position offset (x, y) and hand size.
+    """
+    offsets = np.empty((len(person_ids), 3), dtype=np.float32)
+    scales = np.empty(len(person_ids), dtype=np.float32)
+    for person in np.unique(person_ids):
+        rng = np.random.default_rng([seed, int(person)])
+        rows = person_ids == person
+        offsets[rows] = [*rng.normal(0, 0.03, 2), 0.0]
+        scales[rows] = rng.uniform(0.85, 1.15)
+    return offsets, scales
+
+def generate_batch(gesture_name, person_ids, rng, noise=NOISE_STD, seed=0, lengths=None):
+    """
+    Generate len(person_ids) sequences of `gesture_name` in one NumPy pass.
+    Returns float32 (n, SEQUENCE_LENGTH, 42, 3); an unused hand is all
+    zeros, as in the collector export.
+    lengths: optional (n,) frames per sequence (signs performed at different
+    speeds); X is then (n, max(lengths), 42, 3), zero after each length.
+    """
+    person_ids = np.asarray(person_ids)
+    n = len(person_ids)
+    trajectory = TRAJECTORIES.get(gesture_name) or default_trajectory(gesture_name)
+    if lengths is None:
+        lengths = np.full(n, SEQUENCE_LENGTH)
+    steps = int(np.max(lengths))
+
+    # Per-sample speed variation: warp progress with a random exponent
+    progress = np.arange(steps, dtype=np.float32)[None, :] / np.asarray(lengths, dtype=np.float32)[:, None]
+    progress = np.minimum(progress, 1.0) ** rng.uniform(0.8, 1.25, (n, 1)).astype(np.float32)
+
+    offsets, scales = signer_profiles(person_ids, seed)
+    jitter = rng.normal(0, 0.01, (n, 1, 3)).astype(np.float32) * np.float32([1, 1, 0])
+    hand = HAND_TEMPLATE[None, None] * scales[:, None, None, None]  # (n, 1, 21, 3)
+
+    X = np.zeros((n, steps, NUM_LANDMARKS, 3), dtype=np.float32)
+    active = np.zeros((1, 1, NUM_LANDMARKS, 1), dtype=np.float32)
+    for slot, base in enumerate(trajectory(progress)):
+        if base is None:
+            continue
+        hand_slice = slice(slot * HAND_LANDMARKS, (slot + 1) * HAND_LANDMARKS)
+        base = base + offsets[:, None] + jitter  # (n, T, 3)
+        X[:, :, hand_slice] = base[:, :, None, :] + hand
+        active[:, :, hand_slice] = 1
+    # Thêm nhiễu nhẹ để model học tốt hơn (chỉ trên tay đang hoạt động)
+    X += rng.standard_normal(X.shape, dtype=np.float32) * (noise * active)
+    X *= (np.arange(steps)[None, :] < np.asarray(lengths)[:, None])[:, :, None, None]
+    return X
+
+def _frames_to_json(sequence):
+    """(T, 42, 3) array -> collector-style frames (an unused hand stays 21 zero landmarks)."""
+    return [{'landmarks': [{'x': float(x), 'y': float(y), 'z': float(z)} for x, y, z in frame]}
+            for frame in sequence.tolist()]
+
+def generate_dataset(output_dir='dataset', file_format='json', samples_per_gesture=SAMPLES_PER_GESTURE,
+                     samples_per_person=SAMPLES_PER_PERSON, noise=NOISE_STD, seed=None,
+                     dtype='float16', chunk_size=CHUNK_SIZE, frames_range=None):
     """
     Generate sample dataset for all gestures
+    file_format: 'json' (collector export layout, one sequence per file) or
+        'vsq' (binary, one file per signer, see sequence_format.py)
+    Sequences are generated `chunk_size` at a time in one NumPy pass each,
+    so memory stays bounded for million-sequence stress datasets.
+    frames_range=(min, max) draws every sequence's length uniformly from that
+    range (signs at 30 fps of varying speed) instead of SEQUENCE_LENGTH.
+    Classes come from <output_dir>/manifest.json, which is created if missing.
     """
+    gestures = get_labels(output_dir)
+    rng = np.random.default_rng(seed)
     print("="*60)
     print(" "*15 + "V-SIGN AI - DATA GENERATOR")
     print("="*60)
-    print(f"\nGenerating {SAMPLES_PER_GESTURE} samples per gesture...")
-    print(f"Total samples: {SAMPLES_PER_GESTURE * len(GESTURES)}")
-    
+    print(f"\nGenerating {samples_per_gesture} samples per gesture...")
+    print(f"Total samples: {samples_per_gesture * len(gestures)}")
+
     # Create output directory
     Path(output_dir).mkdir(parents=True, exist_ok=True)
-    
-    for gesture in GESTURES:
+    if not os.path.exists(manifest_path(output_dir)):
+        save_manifest(load_manifest(output_dir), output_dir)
+
+    # Chunks hold whole signers so each .vsq file is written exactly once
+    chunk_size = max(samples_per_person, chunk_size - chunk_size % samples_per_person)
+    start = time.perf_counter()
+    for gesture in gestures:
         print(f"\nGenerating '{gesture}'...")
-        
+
         # Create gesture directory
-        gesture_dir = os.path.join(output_dir, gesture)
+        gesture_dir = os.path.join(output_dir, label_folder(gesture))
         Path(gesture_dir).mkdir(parents=True, exist_ok=True)
-        
-        # Generate samples
-        for sample_idx in range(SAMPLES_PER_GESTURE):
-            # Generate person ID and sequence ID
-            person_id = (sample_idx // 10) + 1  # 10 samples per person
-            seq_id = (sample_idx % 10) + 1
-            
-            # Generate gesture data
-            frames = generate_gesture_pattern(gesture, sample_idx)
-            
-            # Create data structure
-            data = {
-                'gesture': gesture,
-                'person_id': f'person{person_id}',
-                'sequences': [
-                    {
-                        'frames': frames,
-                        'duration_ms': 1000
+
+        for chunk_start in range(0, samples_per_gesture, chunk_size):
+            sample_idx = np.arange(chunk_start, min(chunk_start + chunk_size, samples_per_gesture))
+            person_ids = sample_idx // samples_per_person + 1
+            lengths = (rng.integers(frames_range[0], frames_range[1] + 1, len(person_ids))
+                       if frames_range else np.full(len(person_ids), SEQUENCE_LENGTH))
+            X = generate_batch(gesture, person_ids, rng, noise, seed or 0, lengths)
+            durations = np.round(lengths * 1000 / 30).astype(int).tolist()
+
+            for person in np.unique(person_ids):
+                rows = np.flatnonzero(person_ids == person)
+                if file_format == 'vsq':
+                    filepath = os.path.join(gesture_dir, f'person{person}.vsq')
+                    write_sequences(filepath, [X[row, :lengths[row]] for row in rows], gesture,
+                                    f'person{person}', [durations[row] for row in rows], dtype)
+                    continue
+                for row in rows:
+                    seq_id = sample_idx[row] % samples_per_person + 1
+                    data = {
+                        'gesture': gesture,
+                        'person_id': f'person{person}',
+                        'sequences': [{'frames': _frames_to_json(X[row, :lengths[row]]),
+                                       'duration_ms': durations[row]}]
                     }
-                ]
-            }
-            
-            # Save to file
-            filename = f'person{person_id}_seq{seq_id:03d}.json'
-            filepath = os.path.join(gesture_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            if (sample_idx + 1) % 10 == 0:
-                print(f"  ✓ {sample_idx + 1}/{SAMPLES_PER_GESTURE} samples generated")
-    
+                    filepath = os.path.join(gesture_dir, f'person{person}_seq{seq_id:03d}.json')
+                    with open(filepath, 'w', encoding='utf-8') as f:
+                        json.dump(data, f, ensure_ascii=False, indent=2)
+
+            print(f"  ✓ {sample_idx[-1] + 1}/{samples_per_gesture} samples generated")
+
+    elapsed = time.perf_counter() - start
+    total = samples_per_gesture * len(gestures)
     print("\n" + "="*60)
     print("Dataset generation completed!")
     print("="*60)
-    print(f"\nDataset saved to: {output_dir}/")
+    print(f"\n{total} sequences in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} sequences/s)")
+    print(f"Dataset saved to: {output_dir}/")
     print("\nDirectory structure:")
     print(f"{output_dir}/")
-    for gesture in GESTURES:
-        print(f"├── {gesture}/")
-        print(f"│   ├── person1_seq001.json")
-        print(f"│   ├── person1_seq002.json")
-        print(f"│   └── ... ({SAMPLES_PER_GESTURE} files)")
-    
+    for gesture in gestures:
+        print(f"├── {label_folder(gesture)}/")
+        if file_format == 'vsq':
+            print(f"│   ├── person1.vsq  ({samples_per_person} sequences)")
+            print(f"│   └── ... ({-(-samples_per_gesture // samples_per_person)} files)")
+        else:
+            print("│   ├── person1_seq001.json")
+            print("│   ├── person1_seq002.json")
+            print(f"│   └── ... ({samples_per_gesture} files)")
+
     print("\n⚠️  NOTE: This is SYNTHETIC data for testing only!")
     print("For production, collect real data using MediaPipe Hands")
     print("="*60)
@@ -183,15 +251,37 @@ def generate_data_collection_template():
             }
         ]
     }
-    
+
     with open('data_collection_template.json', 'w', encoding='utf-8') as f:
         json.dump(template, f, ensure_ascii=False, indent=2)
-    
+
     print("\n✓ Data collection template saved to 'data_collection_template.json'")
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Generate a synthetic sample dataset')
+    parser.add_argument('--output-dir', default='dataset')
+    parser.add_argument('--format', choices=['json', 'vsq'], default='json')
+    parser.add_argument('--samples-per-gesture', type=int, default=SAMPLES_PER_GESTURE)
+    parser.add_argument('--samples-per-person', type=int, default=SAMPLES_PER_PERSON,
+                        help='sequences per synthetic signer (one .vsq file each)')
+    parser.add_argument('--noise', type=float, default=NOISE_STD, help='landmark noise std')
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--dtype', choices=['float16', 'float32'], default='float16',
+                        help='.vsq frame dtype')
+    parser.add_argument('--frames', type=int, nargs=2, metavar=('MIN', 'MAX'),
+                        help=f'random sequence length in this range (default: always {SEQUENCE_LENGTH} frames)')
+    parser.add_argument('--build-cache', action='store_true',
+                        help='compile the training cache (<output-dir>/.cache) after generating')
+    args = parser.parse_args()
+
     # Generate sample dataset
-    generate_dataset('dataset')
-    
+    generate_dataset(args.output_dir, args.format, args.samples_per_gesture, args.samples_per_person,
+                     args.noise, args.seed, args.dtype, frames_range=args.frames)
+
+    if args.build_cache:
+        from train_model import load_dataset, use_labels
+        use_labels(get_labels(args.output_dir))
+        load_dataset(args.output_dir)
+
     # Generate template for real data collection
     generate_data_collection_template()
@@ -0,0 +1,254 @@
+"""
+V-Sign AI - Hyperparameter Search
+Random search over architecture, widths, dropout, sequence length, batch size
+and learning rate, with trials running in a process pool, median pruning of
+weak trials and a Pareto table of accuracy vs. latency vs. model size
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+
+# ===== CONFIGURATION =====
+SEARCH_SPACE = {
+    'architecture': ['lstm_relu', 'lstm', 'gru'],
+    'units': [(64, 32), (128, 64), (192, 96)],
+    'dropout': [0.2, 0.3, 0.4],
+    'sequence_length': [15, 20, 30],
+    'batch_size': [16, 32, 64],
+    'learning_rate': (3e-4, 3e-3),  # log-uniform
+}
+NUM_TRIALS = 20
+EPOCHS = 40
+PRUNE_WARMUP_EPOCHS = 5   # never prune before this many epochs
+PRUNE_MIN_TRIALS = 3      # need this many other trials at the same epoch
+SEED = 42
+
+
+def sample_params(rng, space=SEARCH_SPACE):
+    params = {}
+    for name, choices in space.items():
+        if isinstance(choices, tuple):
+            low, high = choices
+            params[name] = float(math.exp(rng.uniform(math.log(low), math.log(high))))
+        else:
+            params[name] = choices[rng.integers(len(choices))]
+    params['units'] = list(params['units'])
+    return params
+
+
+def resample_sequences(dataset, indices, sequence_length):
+    """
+    (len(indices), sequence_length, 126) from the recorded frames, resampled
+    with dataset_cache.resample_sequence like the training pipeline does.
+    """
+    from dataset_cache import resample_sequence
+    if sequence_length == dataset.X.shape[1]:
+        return np.asarray(dataset.X[indices], dtype=np.float32)
+    return np.stack([resample_sequence(dataset.sequence(i), sequence_length) for i in indices])
+
+
+# ===== PRUNING =====
+def _median_pruner(trial_id, scores):
+    """
+    Keras callback that stops a trial whose val_accuracy is below the median
+    of the other trials at the same epoch. `scores` is a Manager dict shared
+    by all workers, keyed 'trial:epoch'.
+    """
+    from tensorflow import keras
+
+    class MedianPruner(keras.callbacks.Callback):
+        pruned_at = None
+
+        def on_epoch_end(self, epoch, logs=None):
+            acc = float((logs or {}).get('val_accuracy', 0.0))
+            scores[f'{trial_id}:{epoch}'] = acc
+            if epoch + 1 < PRUNE_WARMUP_EPOCHS:
+                return
+            others = [v for k, v in scores.items()
+                      if k.endswith(f':{epoch}') and not k.startswith(f'{trial_id}:')]
+            if len(others) >= PRUNE_MIN_TRIALS and acc < np.median(others):
+                self.pruned_at = epoch + 1
+                self.model.stop_training = True
+
+    return MedianPruner()
+
+
+# ===== TRIALS =====
+_DATA = None
+
+
+def _init_worker(threads):
+    import tensorflow as tf
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+
+
+def _load_split(data_dir, resample=False):
+    """
+    Open the dataset cache (memory-mapped) once per worker process.
+    Like train_model.load_dataset, only sequences recorded at SEQUENCE_LENGTH
+    frames are used unless `resample`.
+    Returns (num_classes, dataset, (idx_train, idx_val, idx_test, y_train, y_val, y_test)).
+    """
+    global _DATA
+    if _DATA is None:
+        from dataset_cache import load_cached_dataset
+        from dataset_manifest import get_labels
+        from train_model import SEQUENCE_LENGTH, split_dataset
+        gestures = get_labels(data_dir)
+        dataset = load_cached_dataset(data_dir, gestures, SEQUENCE_LENGTH, verbose=False)
+        indices = np.arange(len(dataset.y))
+        if not resample:
+            indices = indices[dataset.lengths == SEQUENCE_LENGTH]
+        _DATA = len(gestures), dataset, split_dataset(indices, dataset.y[indices])
+    return _DATA
+
+
+def run_trial(trial_id, params, data_dir, epochs, scores, features=False, resample=False):
+    """Train one configuration; returns its metrics (runs in a worker process)."""
+    import tensorflow as tf
+    from tensorflow import keras
+    from export_tflite import measure_latency
+    from train_model import INPUT_FEATURES, create_model
+
+    num_classes, dataset, (idx_train, idx_val, idx_test, y_train, y_val, y_test) = _load_split(data_dir, resample)
+    length = params['sequence_length']
+    X_train, X_val, X_test = (resample_sequences(dataset, idx, length) for idx in (idx_train, idx_val, idx_test))
+
+    keras.backend.clear_session()
+    keras.utils.set_random_seed(SEED + trial_id)
+    model = create_model(input_shape=(length, INPUT_FEATURES), learning_rate=params['learning_rate'],
+                         architecture=params['architecture'], units=params['units'],
+                         dropout=params['dropout'], num_classes=num_classes, features=features)
+    pruner = _median_pruner(trial_id, scores)
+    start = time.perf_counter()
+    history = model.fit(
+        X_train, y_train, validation_data=(X_val, y_val),
+        batch_size=params['batch_size'], epochs=epochs, verbose=0,
+        callbacks=[pruner, keras.callbacks.EarlyStopping(
+            monitor='val_loss', patience=10, restore_best_weights=True)]
+    )
+
+    forward = tf.function(lambda x: model(x, training=False),
+                          input_signature=[tf.TensorSpec((None, length, INPUT_FEATURES), tf.float32)])
+    latency_p50, _ = measure_latency(lambda w: forward(w[np.newaxis]).numpy(), X_test[0], runs=50)
+
+    def accuracy(X, y):
+        return float(np.mean(np.argmax(forward(X).numpy(), axis=1) == y))
+
+    return {
+        'trial': trial_id,
+        'params': params,
+        'status': 'pruned' if pruner.pruned_at else 'complete',
+        'epochs': len(history.history['loss']),
+        'train_seconds': round(time.perf_counter() - start, 2),
+        # Of the weights EarlyStopping restored (best val_loss), not the best epoch's val_accuracy
+        'val_accuracy': accuracy(X_val, y_val),
+        'test_accuracy': accuracy(X_test, y_test),
+        'latency_ms_p50': latency_p50,
+        'params_count': model.count_params(),
+        'size_kb': round(model.count_params() * 4 / 1024, 1),
+    }
+
+
+def pareto_front(trials):
+    """Completed trials not dominated on (val_accuracy up, latency down, size down)."""
+    done = [t for t in trials if t['status'] == 'complete']
+
+    def dominates(a, b):
+        better_or_equal = (a['val_accuracy'] >= b['val_accuracy'] and
+                           a['latency_ms_p50'] <= b['latency_ms_p50'] and a['size_kb'] <= b['size_kb'])
+        strictly = (a['val_accuracy'] > b['val_accuracy'] or
+                    a['latency_ms_p50'] < b['latency_ms_p50'] or a['size_kb'] < b['size_kb'])
+        return better_or_equal and strictly
+
+    return [t for t in done if not any(dominates(o, t) for o in done if o is not t)]
+
+
+def run_search(data_dir='dataset', num_trials=NUM_TRIALS, epochs=EPOCHS, workers=None, seed=SEED,
+               features=False, resample=False):
+    from dataset_manifest import get_labels
+    from train_model import load_dataset, use_labels
+
+    # Build/refresh the cache once; every trial then memory-maps it
+    use_labels(get_labels(data_dir))
+    X, _ = load_dataset(data_dir, resample=resample)
+    if len(X) == 0:
+        return None
+    del X
+
+    workers = workers or max(1, min(num_trials, os.cpu_count() or 1))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    rng = np.random.default_rng(seed)
+    trials = [sample_params(rng) for _ in range(num_trials)]
+    print(f"\nRunning {num_trials} trials on {workers} worker(s), {threads} thread(s) each...")
+
+    spawn = get_context('spawn')
+    results = []
+    with spawn.Manager() as manager:
+        scores = manager.dict()
+        with ProcessPoolExecutor(max_workers=workers, mp_context=spawn,
+                                 initializer=_init_worker, initargs=(threads,)) as pool:
+            futures = [pool.submit(run_trial, i, params, data_dir, epochs, scores, features, resample)
+                       for i, params in enumerate(trials)]
+            for future in as_completed(futures):
+                r = future.result()
+                results.append(r)
+                print(f"  trial {r['trial']:>3} {r['status']:<8} val_acc {r['val_accuracy']:.4f} "
+                      f"latency {r['latency_ms_p50']:.2f} ms  {r['params']}")
+
+    results.sort(key=lambda r: r['trial'])
+    front = {t['trial'] for t in pareto_front(results)}
+    for r in results:
+        r['pareto'] = r['trial'] in front
+    return {'num_trials': num_trials, 'epochs': epochs, 'workers': workers,
+            'input_features': 'landmark_features' if features else 'raw', 'resample': resample,
+            'search_space': {k: list(v) for k, v in SEARCH_SPACE.items()}, 'trials': results}
+
+
+def print_pareto_table(report):
+    print(f"\n{'trial':>5} {'arch':<10} {'units':<10} {'drop':>5} {'len':>4} {'batch':>5} {'lr':>9} "
+          f"{'val_acc':>8} {'test_acc':>8} {'p50 ms':>7} {'KB':>7}  status")
+    ranked = sorted(report['trials'], key=lambda r: (not r['pareto'], -r['val_accuracy']))
+    for r in ranked:
+        p = r['params']
+        print(f"{r['trial']:>5} {p['architecture']:<10} {str(tuple(p['units'])):<10} {p['dropout']:>5} "
+              f"{p['sequence_length']:>4} {p['batch_size']:>5} {p['learning_rate']:>9.2e} "
+              f"{r['val_accuracy']:>8.4f} {r['test_accuracy']:>8.4f} {r['latency_ms_p50']:>7.2f} "
+              f"{r['size_kb']:>7.1f}  {r['status']}{' *pareto' if r['pareto'] else ''}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Parallel hyperparameter search')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--trials', type=int, default=NUM_TRIALS)
+    parser.add_argument('--epochs', type=int, default=EPOCHS)
+    parser.add_argument('--workers', type=int, help='parallel trials (default: one per core)')
+    parser.add_argument('--seed', type=int, default=SEED)
+    parser.add_argument('--features', action='store_true', help='with the LandmarkFeatures layer (as train_model --features)')
+    parser.add_argument('--resample', action='store_true',
+                        help='also use sequences of another length than 30 frames (as train_model --resample)')
+    parser.add_argument('--output', default='search_results.json')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(" " * 13 + "V-SIGN AI - HYPERPARAMETER SEARCH")
+    print("=" * 60)
+
+    report = run_search(args.data_dir, args.trials, args.epochs, args.workers, args.seed, args.features,
+                        args.resample)
+    if report is None:
+        print("\nERROR: No data found! Run generate_sample_data.py or collect data first.")
+        raise SystemExit(1)
+
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print_pareto_table(report)
+    print(f"\n✓ Results saved to '{args.output}' (* = Pareto-optimal: accuracy vs latency vs size)")
@@ -0,0 +1,296 @@
+"""
+V-Sign AI - Streaming Inference Engine
+Server-side recognition for kiosks: frames arrive one at a time per session,
+each session keeps a ring buffer of the last 30 frames and predicts every N frames
+"""
+
+import argparse
+import json
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from dataset_cache import FRAME_FEATURES, MAX_FRAMES, frame_to_vector, resample_sequence
+from dataset_manifest import get_labels
+
+# ===== CONFIGURATION =====
+SEQUENCE_LENGTH = 30
+DEFAULT_STRIDE = 5             # predict every 5 new frames once the window is full
+CONFIDENCE_THRESHOLD = 0.7     # same threshold as the web app
+SESSION_TIMEOUT = 300          # seconds without frames before a session is dropped
+
+
+def load_labels(info_path='training_info.json'):
+    """
+    Gesture names in model output order, as recorded at training time
+    (falls back to the dataset manifest when there is no training info).
+    """
+    if os.path.exists(info_path):
+        with open(info_path, 'r', encoding='utf-8') as f:
+            return json.load(f)['gestures']
+    return get_labels()
+
+
+def load_keras_model(model_path):
+    """Load a Keras .h5 file or a SavedModel directory for inference only."""
+    from tensorflow import keras
+    from preprocessing import LandmarkFeatures
+    return keras.models.load_model(model_path, compile=False,
+                                   custom_objects={'LandmarkFeatures': LandmarkFeatures})
+
+
+def compile_forward(model):
+    """
+    Wrap the model call in a tf.function with a batch-agnostic signature:
+    eager calls run the LSTM loop op by op and are ~30x slower, and a fixed
+    signature avoids retracing for every new batch size.
+    """
+    import tensorflow as tf
+    spec = tf.TensorSpec((None,) + tuple(model.input_shape[1:]), tf.float32)
+    return tf.function(lambda x: model(x, training=False), input_signature=[spec])
+
+
+def frame_from_payload(payload):
+    """
+    Convert one incoming frame to a 126-value vector, or None if no hand.
+    Accepts {"vector": [126 floats]} or {"landmarks": [{x, y, z}, ...]}
+    (21 or 42 landmarks, the dataset frame format).
+    """
+    if payload.get('vector') is not None:
+        vector = np.zeros(FRAME_FEATURES, dtype=np.float32)
+        values = np.asarray(payload['vector'], dtype=np.float32)[:FRAME_FEATURES]
+        vector[:len(values)] = values
+        return vector if values.any() else None
+    return frame_to_vector(payload.get('landmarks') or [])
+
+
+class SlidingWindow:
+    """Fixed-size ring buffer of the most recent frames of one stream."""
+
+    def __init__(self, window=SEQUENCE_LENGTH, features=FRAME_FEATURES):
+        self.buffer = np.zeros((window, features), dtype=np.float32)
+        self.window = window
+        self.pos = 0            # next slot to write
+        self.count = 0          # frames pushed since reset
+        self.since_predict = 0
+        self.last_seen = time.monotonic()
+
+    def push(self, vector):
+        self.buffer[self.pos] = vector
+        self.pos = (self.pos + 1) % self.window
+        self.count += 1
+        self.since_predict += 1
+        self.last_seen = time.monotonic()
+
+    @property
+    def full(self):
+        return self.count >= self.window
+
+    def ordered(self):
+        """Window contents oldest-first, shape (window, features)."""
+        if self.pos == 0:
+            return self.buffer.copy()
+        return np.concatenate([self.buffer[self.pos:], self.buffer[:self.pos]])
+
+
+class InferenceEngine:
+    """
+    Per-session sliding-window recognizer around one Keras model.
+
+    Frames without a detected hand are ignored (the window is kept), the
+    same way the web app keeps its buffer while the hand is out of view.
+    """
+
+    def __init__(self, model, labels, stride=DEFAULT_STRIDE, window=None,
+                 threshold=CONFIDENCE_THRESHOLD, session_timeout=SESSION_TIMEOUT):
+        self.model = model
+        self.labels = labels
+        self.stride = max(1, stride)
+        # The model's own window (e.g. 15/20 frames from hparam_search), 30 for variable-length models
+        self.window = window or model.input_shape[1] or SEQUENCE_LENGTH
+        self.threshold = threshold
+        self.session_timeout = session_timeout
+        self.sessions = {}
+        self._sessions_lock = threading.Lock()
+        self._model_lock = threading.Lock()
+        self._forward = compile_forward(model)
+
+    @classmethod
+    def from_path(cls, model_path='vsign_model_final.h5', labels=None, **kwargs):
+        return cls(load_keras_model(model_path), labels or load_labels(), **kwargs)
+
+    def _session(self, session_id):
+        with self._sessions_lock:
+            session = self.sessions.get(session_id)
+            if session is None:
+                session = self.sessions[session_id] = SlidingWindow(self.window)
+            return session
+
+    def reset(self, session_id):
+        with self._sessions_lock:
+            self.sessions.pop(session_id, None)
+
+    def evict_idle(self):
+        cutoff = time.monotonic() - self.session_timeout
+        with self._sessions_lock:
+            for session_id in [s for s, w in self.sessions.items() if w.last_seen < cutoff]:
+                del self.sessions[session_id]
+
+    def predict_windows(self, windows):
+        """Run the model on a (B, window, 126) batch, returns (B, num_classes) probabilities."""
+        with self._model_lock:
+            return self._forward(np.asarray(windows, dtype=np.float32)).numpy()
+
+    def predict_sequence(self, vectors):
+        """
+        Classify one whole sign of any length (frames without a hand left
+        out), for clients that segment signs themselves. It is resampled to
+        the model's input length; a variable-length model takes it as
+        recorded, resampled down only beyond MAX_FRAMES.
+        """
+        frames = np.asarray(vectors, dtype=np.float32).reshape(-1, FRAME_FEATURES)
+        if len(frames) == 0:
+            raise ValueError('no frame with a detected hand')
+        length = self.model.input_shape[1] or min(len(frames), MAX_FRAMES)
+        probs = self.predict_windows(resample_sequence(frames, length)[np.newaxis])[0]
+        return self.format_prediction(probs, len(frames) - 1)
+
+    def format_prediction(self, probs, frame_index):
+        idx = int(np.argmax(probs))
+        confidence = float(probs[idx])
+        return {
+            'gesture': self.labels[idx] if idx < len(self.labels) else str(idx),
+            'confidence': confidence,
+            'accepted': confidence >= self.threshold,
+            'probabilities': [float(p) for p in probs],
+            'frame_index': frame_index,
+        }
+
+    def next_window(self, session_id, vector):
+        """
+        Add one frame (126 floats, or None when no hand was detected).
+        Returns (window, frame_index) when a prediction is due, else None.
+        """
+        if vector is None:
+            return None
+        session = self._session(session_id)
+        session.push(vector)
+        # First prediction as soon as the window fills, then every `stride` frames
+        if not session.full:
+            return None
+        if session.count > self.window and session.since_predict < self.stride:
+            return None
+        session.since_predict = 0
+        return session.ordered(), session.count - 1
+
+    def push_frame(self, session_id, vector):
+        """Add one frame; returns a prediction dict when it triggers one, else None."""
+        due = self.next_window(session_id, vector)
+        if due is None:
+            return None
+        window, frame_index = due
+        probs = self.predict_windows(window[np.newaxis])[0]
+        return self.format_prediction(probs, frame_index)
+
+
+# ===== HTTP SERVER =====
+def make_handler(engine):
+    """
+    Minimal JSON API:
+        POST   /sessions/<id>/frames   body: {"landmarks": [...]} or {"vector": [...]}
+        POST   /sequences              body: {"frames": [frame, ...]}, one whole sign
+        DELETE /sessions/<id>
+        GET    /health
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def _reply(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _session_id(self):
+            parts = self.path.strip('/').split('/')
+            return parts[1] if len(parts) >= 2 and parts[0] == 'sessions' else None
+
+        def do_GET(self):
+            if self.path == '/health':
+                self._reply(200, {'status': 'ok', 'sessions': len(engine.sessions)})
+            else:
+                self._reply(404, {'error': 'not found'})
+
+        def do_POST(self):
+            if self.path == '/sequences':
+                self._predict_sequence()
+                return
+            session_id = self._session_id()
+            if session_id is None or not self.path.endswith('/frames'):
+                self._reply(404, {'error': 'not found'})
+                return
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                vector = frame_from_payload(payload)
+            except (ValueError, KeyError, TypeError) as e:
+                self._reply(400, {'error': f'invalid frame: {e}'})
+                return
+            prediction = engine.push_frame(session_id, vector)
+            self._reply(200, {'hand_detected': vector is not None, 'prediction': prediction})
+
+        def _predict_sequence(self):
+            try:
+                length = int(self.headers.get('Content-Length', 0))
+                payload = json.loads(self.rfile.read(length) or b'{}')
+                vectors = [v for v in map(frame_from_payload, payload['frames']) if v is not None]
+                prediction = engine.predict_sequence(vectors)
+            except (ValueError, KeyError, TypeError) as e:
+                self._reply(400, {'error': f'invalid sequence: {e}'})
+                return
+            self._reply(200, {'frames': len(vectors), 'prediction': prediction})
+
+        def do_DELETE(self):
+            session_id = self._session_id()
+            if session_id is None:
+                self._reply(404, {'error': 'not found'})
+                return
+            engine.reset(session_id)
+            self._reply(200, {'reset': session_id})
+
+        def log_message(self, format, *args):
+            pass  # one line per frame would flood the console
+
+    return Handler
+
+
+def serve(engine, host='0.0.0.0', port=8000):
+    server = ThreadingHTTPServer((host, port), make_handler(engine))
+
+    def evict_loop():
+        while True:
+            time.sleep(60)
+            engine.evict_idle()
+
+    threading.Thread(target=evict_loop, daemon=True).start()
+    print(f"✓ Inference server listening on http://{host}:{port} (stride={engine.stride})")
+    server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='V-Sign AI streaming inference server')
+    parser.add_argument('--model', default='vsign_model_final.h5', help='.h5 file or SavedModel directory')
+    parser.add_argument('--stride', type=int, default=DEFAULT_STRIDE, help='predict every N frames')
+    parser.add_argument('--threshold', type=float, default=CONFIDENCE_THRESHOLD)
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=8000)
+    args = parser.parse_args()
+
+    engine = InferenceEngine.from_path(args.model, stride=args.stride, threshold=args.threshold)
+    # Warm up so the first client does not pay for graph tracing
+    engine.predict_windows(np.zeros((1, engine.window, FRAME_FEATURES), dtype=np.float32))
+    serve(engine, args.host, args.port)
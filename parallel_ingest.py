@@ -0,0 +1,137 @@
+"""
+V-Sign AI - Parallel Ingestion
+Parse freshly collected dataset files in a process pool and build the cache
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from dataset_cache import load_cached_dataset, parse_sequence_file
+
+# Faster JSON parser when installed (pip install orjson), stdlib otherwise
+try:
+    import orjson
+    json_loads = orjson.loads
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    json_loads = json.loads
+    JSON_BACKEND = 'json'
+
+MIN_FILES_PER_WORKER = 4  # below this the pool costs more than it saves
+
+
+def _ingest_one(path, sequence_length):
+    start = time.perf_counter()
+    sequences, person_id, rejected, sha1 = parse_sequence_file(path, sequence_length, loads=json_loads)
+    elapsed = time.perf_counter() - start
+    stats = {
+        'path': path,
+        'bytes': os.path.getsize(path),
+        'sequences': int(len(sequences)),
+        'rejected': int(rejected),
+        'seconds': elapsed,
+    }
+    return path, sequences, person_id, rejected, sha1, stats
+
+
+def parallel_parse_files(paths, sequence_length=30, workers=None, report=None):
+    """
+    Parse `paths` across a process pool.
+
+    Yields (path, sequences, person_id, rejected, sha1) like the serial
+    parser in dataset_cache, with sequences already shaped
+    (n, sequence_length, 126) float32, or as a list of (frames, 126)
+    arrays when sequence_length is None. Per-file stats are appended to
+    `report['files']` when a report dict is given.
+    """
+    workers = workers or os.cpu_count() or 1
+    workers = min(workers, max(1, len(paths) // MIN_FILES_PER_WORKER))
+    ingest = partial(_ingest_one, sequence_length=sequence_length)
+
+    if workers == 1:
+        results = map(ingest, paths)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        chunksize = max(1, len(paths) // (workers * 8))
+        results = pool.map(ingest, paths, chunksize=chunksize)
+    if report is not None:
+        report['workers'] = workers
+
+    try:
+        for path, sequences, person_id, rejected, sha1, stats in results:
+            if report is not None:
+                report.setdefault('files', []).append(stats)
+            yield path, sequences, person_id, rejected, sha1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def summarize_report(report, wall_seconds):
+    """Add totals to an ingestion report and print a short summary."""
+    files = report.get('files', [])
+    total_bytes = sum(f['bytes'] for f in files)
+    for f in files:
+        f['mb_per_s'] = f['bytes'] / (1024 * 1024) / f['seconds'] if f['seconds'] else None
+
+    report.update({
+        'json_backend': JSON_BACKEND,
+        'num_files': len(files),
+        'total_mb': total_bytes / (1024 * 1024),
+        'total_sequences': sum(f['sequences'] for f in files),
+        'rejected_sequences': sum(f['rejected'] for f in files),
+        'wall_seconds': wall_seconds,
+        'files_per_s': len(files) / wall_seconds if wall_seconds else None,
+        'mb_per_s': total_bytes / (1024 * 1024) / wall_seconds if wall_seconds else None,
+    })
+
+    print(f"\nParsed {report['num_files']} files ({report['total_mb']:.1f} MB) "
+          f"with {report.get('workers', 1)} workers [{JSON_BACKEND}] in {wall_seconds:.2f}s")
+    if files:
+        print(f"  Throughput: {report['files_per_s']:.1f} files/s, {report['mb_per_s']:.1f} MB/s")
+    print(f"  Sequences:  {report['total_sequences']} kept, {report['rejected_sequences']} rejected")
+    for f in files:
+        if f['rejected']:
+            print(f"  ! {f['path']}: {f['rejected']} sequences rejected")
+    return report
+
+
+def ingest_dataset(data_dir, gestures, sequence_length=30, workers=None,
+                   rebuild=False, report_path=None):
+    """
+    Build or refresh the dataset cache, parsing changed files in parallel.
+    Returns the CachedDataset from dataset_cache.
+    """
+    report = {}
+    start = time.perf_counter()
+    dataset = load_cached_dataset(
+        data_dir, gestures, sequence_length, rebuild=rebuild,
+        parse_files=partial(parallel_parse_files, workers=workers, report=report),
+    )
+    summarize_report(report, time.perf_counter() - start)
+
+    if report_path:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"✓ Ingestion report saved to '{report_path}'")
+    return dataset
+
+
+if __name__ == '__main__':
+    from dataset_manifest import get_labels
+    from train_model import SEQUENCE_LENGTH
+
+    parser = argparse.ArgumentParser(description='Parse dataset files in parallel into the dataset cache')
+    parser.add_argument('data_dir', nargs='?', default='dataset')
+    parser.add_argument('--workers', type=int, default=None, help='default: all CPU cores')
+    parser.add_argument('--rebuild', action='store_true', help='ignore the existing cache')
+    parser.add_argument('--report', default='ingest_report.json')
+    args = parser.parse_args()
+
+    ingest_dataset(args.data_dir, get_labels(args.data_dir), SEQUENCE_LENGTH, workers=args.workers,
+                   rebuild=args.rebuild, report_path=args.report)
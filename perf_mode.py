@@ -0,0 +1,208 @@
+"""
+V-Sign AI - CPU Performance Mode
+Thread pools, bfloat16 mixed precision and a memory-budgeted batch size
+with learning-rate scaling for CPU-only training boxes
+"""
+
+import math
+import os
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+# ===== CONFIGURATION =====
+BASE_BATCH_SIZE = 32          # the batch size the default learning rate was tuned for
+BASE_LEARNING_RATE = 1e-3     # Adam default, as used by create_model()
+MAX_BATCH_SIZE = 1024
+DEFAULT_MEMORY_BUDGET_MB = 2048
+CALIBRATION_STEPS = 10
+BF16_CPU_FLAGS = {'avx512_bf16', 'amx_bf16'}
+PRECISIONS = ['auto', 'float32', 'bfloat16']
+
+
+def cpu_flags():
+    """CPU feature flags from /proc/cpuinfo (empty set where unavailable)."""
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    return set(line.split(':', 1)[1].split())
+    except OSError:
+        pass
+    return set()
+
+
+def supports_bfloat16():
+    """True if the CPU has native bfloat16 instructions (AVX512-BF16 / AMX)."""
+    return bool(cpu_flags() & BF16_CPU_FLAGS)
+
+
+def configure_threads(intra_op=None, inter_op=None):
+    """
+    Size TF's thread pools: intra-op (inside one op, e.g. a matmul) defaults
+    to all cores, inter-op (independent ops in parallel) to 2.
+    Must run before TensorFlow executes its first op.
+    """
+    intra_op = intra_op or os.cpu_count() or 1
+    inter_op = inter_op or min(2, intra_op)
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(intra_op)
+        tf.config.threading.set_inter_op_parallelism_threads(inter_op)
+    except RuntimeError:
+        print("⚠️  TensorFlow already initialised, thread pools left unchanged")
+    return {
+        'intra_op_threads': tf.config.threading.get_intra_op_parallelism_threads(),
+        'inter_op_threads': tf.config.threading.get_inter_op_parallelism_threads(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+# ===== BATCH SIZE =====
+def estimate_sample_bytes(model):
+    """
+    Rough training memory per sample: every layer output plus the per-step
+    gate activations recurrent layers keep for backprop, x3 for gradients
+    and temporaries.
+    """
+    timesteps = model.input_shape[1]
+    values = int(np.prod(model.input_shape[1:]))
+    for layer in model.layers:
+        if isinstance(layer, keras.layers.InputLayer):
+            continue
+        values += int(np.prod(layer.output_shape[1:]))
+        if isinstance(layer, keras.layers.RNN):
+            gates = {'LSTMCell': 4, 'GRUCell': 3}.get(type(layer.cell).__name__, 1)
+            values += timesteps * layer.cell.units * (gates + 2)
+    return values * 4 * 3
+
+
+def pick_batch_size(model, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB, num_samples=None,
+                    max_batch_size=MAX_BATCH_SIZE, min_steps_per_epoch=None):
+    """
+    Largest power-of-two batch whose activations fit in the budget next to
+    the weights, gradients and Adam slots, and no larger than the training
+    set. min_steps_per_epoch (opt-in) also caps it so an epoch keeps at
+    least that many updates.
+    """
+    fixed = model.count_params() * 4 * 4
+    fits = (memory_budget_mb * 1024 * 1024 - fixed) // estimate_sample_bytes(model)
+    cap = min(max_batch_size, fits)
+    if num_samples:
+        cap = min(cap, num_samples)
+        if min_steps_per_epoch:
+            cap = min(cap, num_samples // min_steps_per_epoch)
+    batch_size = 1
+    while batch_size * 2 <= cap:
+        batch_size *= 2
+    return batch_size
+
+
+def scaled_learning_rate(batch_size, base_lr=BASE_LEARNING_RATE, base_batch_size=BASE_BATCH_SIZE):
+    """Square-root scaling, the usual rule for Adam (linear scaling overshoots)."""
+    return base_lr * math.sqrt(batch_size / base_batch_size)
+
+
+# ===== PRECISION =====
+def set_precision(precision):
+    keras.mixed_precision.set_global_policy('mixed_bfloat16' if precision == 'bfloat16' else 'float32')
+
+
+def measure_train_throughput(build_model, batch_size, precision, steps=CALIBRATION_STEPS):
+    """Training samples/s of a fresh model on random data (first step excluded)."""
+    set_precision(precision)
+    try:
+        model = build_model()
+        rng = np.random.default_rng(0)
+        X = rng.random((batch_size * (steps + 1),) + model.input_shape[1:], dtype=np.float32)
+        y = rng.integers(0, model.output_shape[-1], len(X))
+        model.train_on_batch(X[:batch_size], y[:batch_size])  # trace
+        start = time.perf_counter()
+        for i in range(1, steps + 1):
+            model.train_on_batch(X[i * batch_size:(i + 1) * batch_size], y[i * batch_size:(i + 1) * batch_size])
+        return batch_size * steps / (time.perf_counter() - start)
+    finally:
+        set_precision('float32')
+        keras.backend.clear_session()
+
+
+def to_float32(model):
+    """
+    Clone a mixed-precision model with float32 layers (same weights), so the
+    saved .h5 loads and converts (TF.js, TFLite) like a normally trained one.
+    """
+    if model.dtype_policy.name == 'float32':
+        return model
+
+    def clone_layer(layer):
+        config = layer.get_config()
+        config['dtype'] = 'float32'
+        return layer.__class__.from_config(config)
+
+    clone = keras.models.clone_model(model, clone_function=clone_layer)
+    clone.set_weights(model.get_weights())
+    clone.compile(optimizer='adam', loss='sparse_categorical_crossentropy', metrics=['accuracy'])
+    return clone
+
+
+def select_training_config(build_model, num_samples=None, memory_budget_mb=DEFAULT_MEMORY_BUDGET_MB,
+                           precision='auto', min_steps_per_epoch=None):
+    """
+    Pick batch size, learning rate and precision, then set the global Keras
+    precision policy. `build_model()` must return a compiled model.
+
+    precision='auto' uses bfloat16 only on CPUs with native bf16 support and
+    only if a short calibration shows it is faster than float32 at the
+    chosen batch size (bf16 LSTM steps can be slower on small batches).
+
+    The default configuration (float32, batch 32) is calibrated too and
+    kept whenever the budgeted configuration is not faster, so performance
+    mode never trains slower than the default.
+
+    Returns a report with the calibration throughputs and the speedup over
+    the default configuration.
+    """
+    probe = build_model()
+    sample_bytes = estimate_sample_bytes(probe)
+    batch_size = pick_batch_size(probe, memory_budget_mb, num_samples, min_steps_per_epoch=min_steps_per_epoch)
+    del probe
+    keras.backend.clear_session()
+
+    candidates = ['float32']
+    if precision == 'bfloat16' or (precision == 'auto' and supports_bfloat16()):
+        candidates.append('bfloat16')
+    if precision == 'bfloat16':
+        candidates.remove('float32')
+
+    print(f"\nCalibrating training throughput ({CALIBRATION_STEPS} steps per configuration)...")
+    baseline = measure_train_throughput(build_model, BASE_BATCH_SIZE, 'float32')
+    print(f"  baseline  float32  batch {BASE_BATCH_SIZE:>4}: {baseline:8.0f} samples/s")
+    throughput = {}
+    for candidate in candidates:
+        throughput[candidate] = measure_train_throughput(build_model, batch_size, candidate)
+        print(f"  candidate {candidate:<8} batch {batch_size:>4}: {throughput[candidate]:8.0f} samples/s")
+
+    chosen = max(throughput, key=throughput.get)
+    kept_baseline = 'float32' in candidates and throughput[chosen] <= baseline
+    if kept_baseline:
+        print(f"  batch {batch_size} is not faster than the baseline, keeping float32 batch {BASE_BATCH_SIZE}")
+        chosen, batch_size = 'float32', BASE_BATCH_SIZE
+    learning_rate = scaled_learning_rate(batch_size)
+    set_precision(chosen)
+    report = {
+        'precision': chosen,
+        'bfloat16_supported': supports_bfloat16(),
+        'batch_size': batch_size,
+        'learning_rate': learning_rate,
+        'memory_budget_mb': memory_budget_mb,
+        'min_steps_per_epoch': min_steps_per_epoch,
+        'estimated_mb_per_batch': round(sample_bytes * batch_size / 1024 / 1024, 1),
+        'baseline_samples_per_s': round(baseline, 1),
+        'calibration_samples_per_s': {k: round(v, 1) for k, v in throughput.items()},
+        'kept_baseline': kept_baseline,
+        'speedup_vs_baseline': 1.0 if kept_baseline else round(throughput[chosen] / baseline, 3),
+    }
+    print(f"✓ Performance mode: {chosen}, batch {batch_size}, lr {learning_rate:.2e}, "
+          f"{report['speedup_vs_baseline']:.2f}x vs baseline")
+    return report
@@ -0,0 +1,396 @@
+"""
+V-Sign AI - Pipeline Runner
+Run the train / convert / evaluate stages only when their inputs changed.
+Each stage's key hashes the dataset contents, the gesture list, its
+hyperparameters, the code of its script and every local module it imports,
+package versions and the artifacts of the stages it reads. Outputs are kept
+in a content-addressed cache, so going back to an earlier configuration
+restores its artifacts instead of retraining
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from importlib import metadata
+
+from dataset_manifest import load_manifest, manifest_path
+
+# ===== CONFIGURATION =====
+ROOT = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = '.pipeline_cache'
+KEY_VERSION = 1
+DEFAULT_STAGES = ['train', 'convert']   # evaluate trains K extra models, run it on request
+
+# inputs: artifacts of earlier stages the stage reads; the first output must be produced;
+# shared: directories the script adds to across runs (linked into its run directory)
+STAGES = {
+    'train': {
+        'script': 'train_model.py',
+        'data': True,
+        'inputs': [],
+        'outputs': ['best_model.h5', 'vsign_model_final.h5', 'training_info.json',
+                    'training_history.png', 'confusion_matrix.png'],
+        'shared': ['logs'],
+        'packages': ['tensorflow', 'numpy', 'scikit-learn'],
+    },
+    'convert': {
+        'script': 'convert_to_tfjs.py',
+        'data': False,
+        'inputs': ['best_model.h5', 'training_info.json'],
+        'outputs': ['tfjs_model'],
+        'packages': ['tensorflow', 'tensorflowjs'],
+    },
+    'evaluate': {
+        'script': 'cross_validate.py',
+        'data': True,
+        'inputs': [],
+        'outputs': ['cv_report.json'],
+        'packages': ['tensorflow', 'numpy', 'scikit-learn'],
+    },
+}
+
+
+# ===== HASHING =====
+def sha1_json(obj):
+    return hashlib.sha1(json.dumps(obj, sort_keys=True, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+
+class FileHasher:
+    """sha1 of file contents, memoised on (size, mtime) so unchanged files are not read again."""
+
+    def __init__(self, path):
+        self.path = path
+        self.memo = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                self.memo = json.load(f)
+
+    def hash(self, path):
+        path = os.path.abspath(path)
+        st = os.stat(path)
+        cached = self.memo.get(path)
+        if cached and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        sha1 = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha1.update(chunk)
+        self.memo[path] = [st.st_size, st.st_mtime_ns, sha1.hexdigest()]
+        return sha1.hexdigest()
+
+    def save(self):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(self.memo, f)
+
+
+def list_files(path):
+    """The file itself, or every file under a directory (sorted, hidden folders such as .cache skipped)."""
+    if os.path.isfile(path):
+        return [path]
+    found = []
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.'))
+        found.extend(os.path.join(root, name) for name in sorted(files))
+    return found
+
+
+def code_files(script):
+    """`script` and every module of this repo it imports, directly or not (lazy imports included)."""
+    seen, todo = set(), [script]
+    while todo:
+        name = todo.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        with open(os.path.join(ROOT, name), 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read(), name)
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                modules = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                modules = [node.module]
+            else:
+                continue
+            for module in modules:
+                path = module.split('.')[0] + '.py'
+                if os.path.exists(os.path.join(ROOT, path)):
+                    todo.append(path)
+    return sorted(seen)
+
+
+def package_versions(packages):
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+# ===== STAGES =====
+def stage_params(name, args):
+    """Command-line options of a stage; they are part of its key."""
+    if name == 'train':
+        params = {'--epochs': args.epochs, '--batch-size': args.batch_size,
+                  '--architecture': args.architecture, '--units': list(args.units),
+                  '--features': args.features, '--augment': args.augment,
+                  '--variable-length': args.variable_length, '--resample': args.resample,
+                  '--no-cache': args.no_cache, '--perf': args.perf}
+        if args.perf:
+            params.update({'--memory-budget-mb': args.memory_budget_mb, '--precision': args.precision,
+                           '--min-steps-per-epoch': args.min_steps_per_epoch})
+    elif name == 'evaluate':
+        params = {'--folds': args.folds, '--epochs': args.epochs, '--batch-size': args.batch_size,
+                  '--architecture': args.architecture, '--units': list(args.units),
+                  '--features': args.features, '--augment': args.augment, '--resample': args.resample}
+    else:
+        params = {}  # convert_to_tfjs.py takes no options
+    return params
+
+
+def stage_command(name, params, data_dir, workers=None):
+    """The stage's command line; `workers` only changes how fast the dataset is parsed, not the key."""
+    command = [sys.executable, os.path.join(ROOT, STAGES[name]['script'])]
+    if STAGES[name]['data']:
+        command += ['--data-dir', os.path.abspath(data_dir)]  # the stage runs in its own directory
+        if name == 'train' and workers:
+            command += ['--workers', str(workers)]
+    for option, value in params.items():
+        if value is True:
+            command.append(option)
+        elif isinstance(value, list):
+            command += [option] + [str(v) for v in value]
+        elif value is not False and value is not None:
+            command += [option, str(value)]
+    return command
+
+
+def stage_key(name, params, data_dir, hasher):
+    """(key, components): the key changes whenever any component does."""
+    stage = STAGES[name]
+    components = {
+        'code': sha1_json({f: hasher.hash(os.path.join(ROOT, f)) for f in code_files(stage['script'])}),
+        'params': sha1_json(params),
+        'packages': sha1_json(package_versions(stage['packages'])),
+    }
+    if stage['data']:
+        # The manifest's file table is bookkeeping rewritten on ingestion, only its labels count
+        skip = os.path.abspath(manifest_path(data_dir))
+        components['data'] = sha1_json({os.path.relpath(p, data_dir): hasher.hash(p)
+                                        for p in list_files(data_dir) if os.path.abspath(p) != skip})
+        components['gestures'] = sha1_json(load_manifest(data_dir)['labels'])
+    for path in stage['inputs']:
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"'{path}' is missing, run the stage that produces it first")
+        components[path] = sha1_json({p: hasher.hash(p) for p in list_files(path)})
+    return sha1_json({'version': KEY_VERSION, 'stage': name, **components}), components
+
+
+# ===== ARTIFACT CACHE =====
+def _entry_path(name, key):
+    return os.path.join(CACHE_DIR, 'stages', name, key + '.json')
+
+
+def _object_path(digest):
+    return os.path.join(CACHE_DIR, 'objects', digest[:2], digest)
+
+
+def snapshot(outputs, hasher):
+    """{file: sha1} of the stage's outputs currently on disk."""
+    return {p.replace(os.sep, '/'): hasher.hash(p)
+            for output in outputs if os.path.exists(output) for p in list_files(output)}
+
+
+def remove_outputs(outputs):
+    for output in outputs:
+        if os.path.isdir(output):
+            shutil.rmtree(output)
+        elif os.path.exists(output):
+            os.remove(output)
+
+
+def prepare_run_dir(name):
+    """
+    Empty directory the stage script runs in, holding copies of its inputs.
+    Its outputs are written there and only moved into place once it succeeded,
+    so a failed run leaves the previous (possibly committed) artifacts alone.
+    """
+    stage = STAGES[name]
+    run_dir = os.path.join(CACHE_DIR, 'run', name)
+    if os.path.exists(run_dir):
+        shutil.rmtree(run_dir)
+    os.makedirs(run_dir)
+    for path in stage['inputs']:
+        if os.path.isdir(path):
+            shutil.copytree(path, os.path.join(run_dir, path))
+        else:
+            shutil.copy2(path, os.path.join(run_dir, path))
+    for path in stage.get('shared', []):
+        os.makedirs(path, exist_ok=True)
+        os.symlink(os.path.abspath(path), os.path.join(run_dir, path))
+    return run_dir
+
+
+def install_outputs(run_dir, outputs):
+    """Replace the outputs on disk by the ones a successful run wrote to `run_dir`."""
+    for output in outputs:
+        remove_outputs([output])
+        produced = os.path.join(run_dir, output)
+        if os.path.exists(produced):
+            if os.path.dirname(output):
+                os.makedirs(os.path.dirname(output), exist_ok=True)
+            shutil.move(produced, output)
+    shutil.rmtree(run_dir)
+
+
+def store(name, key, outputs, hasher, seconds):
+    files = snapshot(outputs, hasher)
+    for digest in set(files.values()):
+        path = _object_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            shutil.copy2(_first(files, digest), path)
+    entry = {'files': files, 'seconds': seconds,
+             'created': datetime.now(timezone.utc).isoformat(timespec='seconds')}
+    os.makedirs(os.path.dirname(_entry_path(name, key)), exist_ok=True)
+    with open(_entry_path(name, key), 'w', encoding='utf-8') as f:
+        json.dump(entry, f, indent=2)
+    return entry
+
+
+def _first(files, digest):
+    return next(path for path, d in files.items() if d == digest)
+
+
+def load_entry(name, key):
+    """The cached outputs of a key, or None when any of its objects is gone."""
+    path = _entry_path(name, key)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        entry = json.load(f)
+    if not all(os.path.exists(_object_path(d)) for d in entry['files'].values()):
+        return None
+    return entry
+
+
+def restore(entry, outputs):
+    remove_outputs(outputs)
+    for path, digest in entry['files'].items():
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        shutil.copy2(_object_path(digest), path)
+
+
+# ===== RUNNER =====
+def run_pipeline(stages=DEFAULT_STAGES, args=None, force=(), dry_run=False):
+    """
+    Bring every stage's outputs up to date, in order. Per stage:
+      up to date  - outputs on disk already match the cached ones for its key
+      restored    - the key was run before, its outputs are copied back
+      run         - the script runs and its outputs are added to the cache
+    A stage named in `force` always runs. Returns {stage: action}.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    hasher = FileHasher(os.path.join(CACHE_DIR, 'file_hashes.json'))
+    state_path = os.path.join(CACHE_DIR, 'state.json')
+    state = {}
+    if os.path.exists(state_path):
+        with open(state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+
+    actions = {}
+    try:
+        for name in stages:
+            stage = STAGES[name]
+            params = stage_params(name, args)
+            key, components = stage_key(name, params, args.data_dir, hasher)
+            entry = None if name in force else load_entry(name, key)
+
+            if entry and snapshot(stage['outputs'], hasher) == entry['files']:
+                actions[name] = 'up to date'
+                print(f"✓ {name}: up to date ({key[:12]})")
+            elif entry:
+                actions[name] = 'restored'
+                print(f"↺ {name}: restored from cache ({key[:12]}, saves ~{entry['seconds']:.0f}s)")
+                if not dry_run:
+                    restore(entry, stage['outputs'])
+            else:
+                previous = state.get(name, {}).get('components')
+                changed = ('forced' if name in force else 'first run' if previous is None else
+                           ', '.join(c for c in components if previous.get(c) != components[c]) or 'cache missing')
+                actions[name] = 'run'
+                print(f"▶ {name}: running {stage['script']} ({changed})")
+                if dry_run:
+                    # Later keys depend on outputs that do not exist yet
+                    print("  (dry run: later stages are not checked)")
+                    break
+                run_dir = prepare_run_dir(name)
+                start = time.perf_counter()
+                returncode = subprocess.run(stage_command(name, params, args.data_dir, args.workers),
+                                            cwd=run_dir).returncode
+                seconds = time.perf_counter() - start
+                produced = os.path.exists(os.path.join(run_dir, stage['outputs'][0]))
+                if returncode or not produced:
+                    print(f"\nERROR: Stage '{name}' failed ({stage['script']} exit code {returncode}, "
+                          f"'{stage['outputs'][0]}' {'written' if produced else 'missing'}); "
+                          f"existing outputs left unchanged, partial run in '{run_dir}'")
+                    raise SystemExit(1)
+                install_outputs(run_dir, stage['outputs'])
+                store(name, key, stage['outputs'], hasher, seconds)
+                print(f"✓ {name}: done in {seconds:.1f}s, outputs cached ({key[:12]})")
+
+            if not dry_run:
+                state[name] = {'key': key, 'components': components}
+    finally:
+        hasher.save()
+        if not dry_run:
+            with open(state_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2)
+    return actions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run train / convert / evaluate, reusing cached outputs')
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=DEFAULT_STAGES)
+    parser.add_argument('--force', nargs='+', choices=list(STAGES), default=[], help='run these stages even if cached')
+    parser.add_argument('--dry-run', action='store_true', help='only show what would run')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--epochs', type=int, default=100)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--architecture', default='lstm_relu')
+    parser.add_argument('--units', type=int, nargs=2, default=[128, 64])
+    parser.add_argument('--features', action='store_true')
+    parser.add_argument('--augment', action='store_true')
+    parser.add_argument('--variable-length', action='store_true')
+    parser.add_argument('--resample', action='store_true')
+    parser.add_argument('--no-cache', action='store_true')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--perf', action='store_true')
+    parser.add_argument('--memory-budget-mb', type=int, default=2048)
+    parser.add_argument('--precision', choices=['auto', 'float32', 'bfloat16'], default='auto')
+    parser.add_argument('--min-steps-per-epoch', type=int)
+    parser.add_argument('--folds', type=int, default=5, help='cross-validation folds of the evaluate stage')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(" " * 15 + "V-SIGN AI - PIPELINE RUNNER")
+    print("=" * 60)
+
+    if not os.path.isdir(args.data_dir):
+        print(f"\nERROR: Thư mục '{args.data_dir}' không tồn tại!")
+        print("Vui lòng chạy generate_sample_data.py hoặc thu thập dữ liệu trước.")
+        raise SystemExit(1)
+
+    # Stages run in pipeline order whatever order they were given in
+    stages = [name for name in STAGES if name in args.stages]
+    actions = run_pipeline(stages, args, set(args.force), args.dry_run)
+    print("\n" + ", ".join(f"{name}: {action}" for name, action in actions.items()))
@@ -0,0 +1,83 @@
+"""
+V-Sign AI - Landmark Preprocessing
+Translation/scale-invariant features computed inside the model, so training,
+evaluation, TFLite/TF.js export and every inference path share one
+implementation (the web app mirrors it in react-app/src/landmarkFeatures.js)
+"""
+
+import tensorflow as tf
+from tensorflow import keras
+
+# ===== CONFIGURATION =====
+NUM_HANDS = 2
+HAND_LANDMARKS = 21
+COORDINATES = 3
+INPUT_FEATURES = NUM_HANDS * HAND_LANDMARKS * COORDINATES  # 126 raw values per frame
+# Per frame: 2 x 20 wrist-relative landmarks scaled by hand size, 2 wrist
+# positions, 2 wrist velocities (in hand sizes per frame), 2 hand-present flags
+NUM_FEATURES = NUM_HANDS * ((HAND_LANDMARKS - 1) * COORDINATES + 2 * COORDINATES + 1)  # 134
+MIN_HAND_SIZE = 1e-6
+
+
+def landmark_features(frames, previous=None):
+    """
+    frames: (B, T, 126) raw MediaPipe coordinates, an absent hand is all zeros.
+    previous: (B, 126) frame preceding frames[:, 0] (default: none, i.e. zeros).
+    Returns (B, T, NUM_FEATURES). Features of an absent hand are zero, and a
+    wrist velocity is only non-zero when the hand is present in both frames.
+    """
+    batch_time = tf.shape(frames)[:2]
+    hands = tf.reshape(frames, tf.concat([batch_time, [NUM_HANDS, HAND_LANDMARKS, COORDINATES]], 0))
+    present = tf.cast(tf.reduce_max(tf.abs(hands), axis=[-2, -1]) > 0, frames.dtype)  # (B, T, 2)
+
+    wrist = hands[:, :, :, 0]                                   # (B, T, 2, 3)
+    relative = hands[:, :, :, 1:] - wrist[:, :, :, tf.newaxis]  # (B, T, 2, 20, 3)
+    size = tf.reduce_mean(tf.sqrt(tf.reduce_sum(tf.square(relative), axis=-1)), axis=-1)
+    size = tf.maximum(size, MIN_HAND_SIZE)                      # (B, T, 2)
+    shape = relative / size[..., tf.newaxis, tf.newaxis]
+
+    if previous is None:
+        previous = tf.zeros_like(frames[:, 0])
+    previous_hands = tf.reshape(tf.concat([previous[:, tf.newaxis], frames[:, :-1]], axis=1),
+                                tf.shape(hands))
+    previous_present = tf.cast(tf.reduce_max(tf.abs(previous_hands), axis=[-2, -1]) > 0, frames.dtype)
+    velocity = ((wrist - previous_hands[:, :, :, 0]) / size[..., tf.newaxis]
+                * (present * previous_present)[..., tf.newaxis])
+
+    def flat(t, width):
+        return tf.reshape(t, tf.concat([batch_time, [width]], 0))
+    return tf.concat([flat(shape, NUM_HANDS * (HAND_LANDMARKS - 1) * COORDINATES),
+                      flat(wrist, NUM_HANDS * COORDINATES),
+                      flat(velocity, NUM_HANDS * COORDINATES), present], axis=-1)
+
+
+@keras.saving.register_keras_serializable(package='vsign')
+class LandmarkFeatures(keras.layers.Layer):
+    """
+    First layer of the model: raw (T, 126) landmarks -> (T, NUM_FEATURES).
+    A rank-2 input is a single frame (B, 126), with the frame before it
+    passed as `previous` (used by the stateful step model).
+    No weights; importing this module registers it for keras.models.load_model.
+    A mask from a preceding Masking layer (variable-length models) is passed on.
+    Always computes in float32, also under a mixed_bfloat16 policy: the
+    wrist-relative differences are small and lose their precision in bf16
+    (the following layers still cast to the policy's compute dtype).
+    """
+
+    def __init__(self, **kwargs):
+        kwargs['dtype'] = 'float32'
+        super().__init__(**kwargs)
+        self.supports_masking = True
+
+    def call(self, inputs, previous=None):
+        if inputs.shape.rank == 2:
+            return landmark_features(inputs[:, tf.newaxis], previous)[:, 0]
+        return landmark_features(inputs, previous)
+
+    def compute_output_shape(self, input_shape):
+        return tf.TensorShape(input_shape)[:-1].concatenate([NUM_FEATURES])
+
+
+def find_feature_layer(model):
+    """The model's LandmarkFeatures layer, or None for raw-input models."""
+    return next((layer for layer in model.layers if isinstance(layer, LandmarkFeatures)), None)
@@ -4,6 +4,7 @@ import * as HandsModule from '@mediapipe/hands';
 import * as CameraModule from '@mediapipe/camera_utils';
 import * as DrawingModule from '@mediapipe/drawing_utils';
 import * as tf from '@tensorflow/tfjs';
+import './landmarkFeatures'; // registers the model's preprocessing layer for loadLayersModel
 
 // Import components
 import LoadingScreen from './components/LoadingScreen';
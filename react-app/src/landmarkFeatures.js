@@ -0,0 +1,58 @@
+import * as tf from '@tensorflow/tfjs';
+
+// TensorFlow.js version of the model's first layer (preprocessing.py,
+// LandmarkFeatures). Both implementations must compute the same features.
+const NUM_HANDS = 2;
+const HAND_LANDMARKS = 21;
+const COORDINATES = 3;
+const MIN_HAND_SIZE = 1e-6;
+export const NUM_FEATURES = NUM_HANDS * ((HAND_LANDMARKS - 1) * COORDINATES + 2 * COORDINATES + 1); // 134
+
+const handPresent = (hands) => hands.abs().max([3, 4]).greater(0).toFloat(); // (B, T, 2)
+
+// frames: (B, T, 126) raw landmarks, an absent hand is all zeros
+export function landmarkFeatures(frames) {
+  return tf.tidy(() => {
+    const [batch, time] = frames.shape;
+    const hands = frames.reshape([batch, time, NUM_HANDS, HAND_LANDMARKS, COORDINATES]);
+    const present = handPresent(hands);
+
+    // Wrist-relative landmarks scaled by the mean wrist distance (hand size)
+    const wrist = hands.slice([0, 0, 0, 0, 0], [-1, -1, -1, 1, -1]);
+    const relative = hands.slice([0, 0, 0, 1, 0], [-1, -1, -1, -1, -1]).sub(wrist);
+    const size = relative.square().sum(-1).sqrt().mean(-1).maximum(MIN_HAND_SIZE);
+    const shape = relative.div(size.expandDims(-1).expandDims(-1));
+
+    // Wrist velocity in hand sizes per frame, only when the hand is in both frames
+    const previousHands = tf.concat([
+      tf.zerosLike(hands.slice([0, 0, 0, 0, 0], [-1, 1, -1, -1, -1])),
+      hands.slice([0, 0, 0, 0, 0], [-1, time - 1, -1, -1, -1]),
+    ], 1);
+    const wristPosition = wrist.squeeze([3]);
+    const previousWrist = previousHands.slice([0, 0, 0, 0, 0], [-1, -1, -1, 1, -1]).squeeze([3]);
+    const velocity = wristPosition.sub(previousWrist).div(size.expandDims(-1))
+      .mul(present.mul(handPresent(previousHands)).expandDims(-1));
+
+    return tf.concat([
+      shape.reshape([batch, time, -1]),
+      wristPosition.reshape([batch, time, -1]),
+      velocity.reshape([batch, time, -1]),
+      present,
+    ], -1);
+  });
+}
+
+class LandmarkFeatures extends tf.layers.Layer {
+  // Name Keras writes for the registered layer (package 'vsign')
+  static className = 'vsign>LandmarkFeatures';
+
+  computeOutputShape(inputShape) {
+    return [...inputShape.slice(0, -1), NUM_FEATURES];
+  }
+
+  call(inputs) {
+    return landmarkFeatures(Array.isArray(inputs) ? inputs[0] : inputs);
+  }
+}
+
+tf.serialization.registerClass(LandmarkFeatures);
@@ -0,0 +1,22 @@
+"""
+V-Sign AI - Resource Usage
+Process memory measurements shared by the benchmark and training scripts
+"""
+
+import platform
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if platform.system() == 'Darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil  # Windows
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
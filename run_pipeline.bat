@@ -56,28 +56,17 @@ if not exist "dataset" (
 )
 echo.
 
-REM ===== STEP 3: Train Model =====
-echo [STEP] 3/6: Training LSTM model...
+REM ===== STEP 3-4: Train Model and Convert to TensorFlow.js =====
+echo [STEP] 3/6 - 4/6: Training LSTM model and converting to TensorFlow.js...
 
-if not exist "best_model.h5" (
-    python train_model.py
-    echo   ^> Model trained successfully
-) else (
-    echo   [WARNING] Model already exists. Skipping training.
-    echo   To retrain, delete 'best_model.h5' and run again.
-)
-echo.
-
-REM ===== STEP 4: Convert to TensorFlow.js =====
-echo [STEP] 4/6: Converting model to TensorFlow.js...
-
-if not exist "tfjs_model" (
-    python convert_to_tfjs.py
-    echo   ^> Model converted to TensorFlow.js
-) else (
-    echo   [WARNING] TensorFlow.js model already exists.
-    echo   To reconvert, delete 'tfjs_model' folder and run again.
+REM pipeline.py retrains / reconverts only when the dataset, hyperparameters,
+REM gestures or code changed, and restores earlier results from its cache
+python pipeline.py %*
+if errorlevel 1 (
+    echo [ERROR] Pipeline failed.
+    exit /b 1
 )
+echo   ^> Model and TensorFlow.js files up to date
 echo.
 
 REM ===== STEP 5: Setup React App =====
@@ -92,13 +81,10 @@ if not exist "node_modules" (
     echo   ^> Node dependencies already installed
 )
 
-REM Copy model to public folder
-if not exist "public\tfjs_model" (
-    xcopy /E /I ..\tfjs_model public\tfjs_model
-    echo   ^> Model copied to public folder
-) else (
-    echo   ^> Model already in public folder
-)
+REM Copy model to public folder (always, it may have been retrained)
+if exist "public\tfjs_model" rmdir /S /Q public\tfjs_model
+xcopy /E /I ..\tfjs_model public\tfjs_model
+echo   ^> Model copied to public folder
 echo.
 
 REM ===== STEP 6: Build Application =====
@@ -79,29 +79,13 @@ fi
 
 echo ""
 
-# ===== STEP 3: Train Model =====
-print_step "3/6: Training LSTM model..."
+# ===== STEP 3-4: Train Model and Convert to TensorFlow.js =====
+print_step "3/6 - 4/6: Training LSTM model and converting to TensorFlow.js..."
 
-if [ ! -f "best_model.h5" ]; then
-    python train_model.py
-    echo "✓ Model trained successfully"
-else
-    print_warning "Model already exists. Skipping training."
-    echo "  To retrain, delete 'best_model.h5' and run again."
-fi
-
-echo ""
-
-# ===== STEP 4: Convert to TensorFlow.js =====
-print_step "4/6: Converting model to TensorFlow.js..."
-
-if [ ! -d "tfjs_model" ]; then
-    python convert_to_tfjs.py
-    echo "✓ Model converted to TensorFlow.js"
-else
-    print_warning "TensorFlow.js model already exists."
-    echo "  To reconvert, delete 'tfjs_model' folder and run again."
-fi
+# pipeline.py retrains / reconverts only when the dataset, hyperparameters,
+# gestures or code changed, and restores earlier results from its cache
+python pipeline.py "$@"
+echo "✓ Model and TensorFlow.js files up to date"
 
 echo ""
 
@@ -117,13 +101,10 @@ else
     echo "✓ Node dependencies already installed"
 fi
 
-# Copy model to public folder
-if [ ! -d "public/tfjs_model" ]; then
-    cp -r ../tfjs_model public/
-    echo "✓ Model copied to public folder"
-else
-    echo "✓ Model already in public folder"
-fi
+# Copy model to public folder (always, it may have been retrained)
+rm -rf public/tfjs_model
+cp -r ../tfjs_model public/
+echo "✓ Model copied to public folder"
 
 echo ""
 
@@ -0,0 +1,181 @@
+"""
+V-Sign AI - Binary Sequence Format (.vsq)
+Compact, versioned, memory-mappable replacement for the collector's JSON exports
+
+Layout (little-endian):
+    0   4s   magic b'VSQ\\0'
+    4   u2   format version
+    6   u1   frame dtype (1 = float16, 2 = float32)
+    7   u1   reserved
+    8   u4   header length in bytes
+    12  ...  UTF-8 JSON header: gesture, person_id, num_sequences,
+             num_landmarks, frame_counts[], duration_ms[]
+    --- padded to a 64-byte boundary ---
+    frames      (total_frames, 42, 3) of the frame dtype
+
+Version 1 files also carried a (total_frames, 2) uint8 hand mask after the
+frames. Nothing read it: a missing hand is an all-zero slot, which is what
+augmentation and the cache test for, so version 2 drops it. Version 1 files
+still read fine, the trailing mask is ignored.
+"""
+
+import argparse
+import json
+import os
+import struct
+from typing import NamedTuple
+
+import numpy as np
+
+# ===== CONFIGURATION =====
+MAGIC = b'VSQ\x00'
+FORMAT_VERSION = 2
+EXTENSION = '.vsq'
+NUM_LANDMARKS = 42
+COORDINATES = 3
+ALIGNMENT = 64
+
+DTYPE_CODES = {1: np.float16, 2: np.float32}
+DTYPE_NAMES = {'float16': 1, 'float32': 2}
+_PREAMBLE = struct.Struct('<4sHBBI')
+
+
+class SequenceFile(NamedTuple):
+    header: dict
+    frames: np.ndarray   # (total_frames, 42, 3), memory-mapped when read with mmap=True
+    offsets: np.ndarray  # (num_sequences + 1,) frame offsets
+
+    def sequence(self, i):
+        """Sequence i as float32 (frames, 126), the layout load_dataset uses."""
+        frames = self.frames[self.offsets[i]:self.offsets[i + 1]]
+        return np.asarray(frames, dtype=np.float32).reshape(len(frames), NUM_LANDMARKS * COORDINATES)
+
+
+def write_sequences(path, sequences, gesture, person_id, duration_ms=None, dtype='float16'):
+    """
+    Write sequences (each (frames, 126) or (frames, 42, 3)) to one .vsq file.
+    float16 keeps ~3 significant digits, ample for normalised image coordinates.
+    """
+    code = DTYPE_NAMES[dtype]
+    arrays = [np.asarray(s, dtype=np.float32).reshape(-1, NUM_LANDMARKS, COORDINATES) for s in sequences]
+    frame_counts = [len(a) for a in arrays]
+    frames = (np.concatenate(arrays) if arrays else
+              np.zeros((0, NUM_LANDMARKS, COORDINATES), dtype=np.float32)).astype(DTYPE_CODES[code])
+
+    header = json.dumps({
+        'gesture': gesture,
+        'person_id': person_id,
+        'num_sequences': len(arrays),
+        'num_landmarks': NUM_LANDMARKS,
+        'frame_counts': frame_counts,
+        'duration_ms': list(duration_ms) if duration_ms is not None else [None] * len(arrays),
+    }, ensure_ascii=False).encode('utf-8')
+
+    data_offset = _align(_PREAMBLE.size + len(header))
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, code, 0, len(header)))
+        f.write(header)
+        f.write(b'\0' * (data_offset - _PREAMBLE.size - len(header)))
+        f.write(frames.tobytes())
+
+
+def read_sequences(path, mmap=True):
+    """Open a .vsq file; frames are memory-mapped unless mmap=False."""
+    with open(path, 'rb') as f:
+        magic, version, code, _, header_len = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a V-Sign sequence file")
+        if version > FORMAT_VERSION:
+            raise ValueError(f"{path}: format version {version} is newer than supported ({FORMAT_VERSION})")
+        header = json.loads(f.read(header_len).decode('utf-8'))
+        if not mmap:
+            f.seek(_align(_PREAMBLE.size + header_len))
+            raw = f.read()
+
+    dtype = np.dtype(DTYPE_CODES[code])
+    counts = np.asarray(header['frame_counts'], dtype=np.int64)
+    total = int(counts.sum())
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+    frames_offset = _align(_PREAMBLE.size + header_len)
+    frames_shape = (total, NUM_LANDMARKS, COORDINATES)
+    frames_bytes = total * NUM_LANDMARKS * COORDINATES * dtype.itemsize
+
+    if total == 0:
+        frames = np.zeros(frames_shape, dtype=dtype)
+    elif mmap:
+        frames = np.memmap(path, dtype=dtype, mode='r', offset=frames_offset, shape=frames_shape)
+    else:
+        frames = np.frombuffer(raw[:frames_bytes], dtype=dtype).reshape(frames_shape)
+    return SequenceFile(header, frames, offsets)
+
+
+def parse_binary_file(path):
+    """
+    Every sequence of a .vsq file as a list of (frames, 126) float32 arrays,
+    plus the person_id; dataset_cache.parse_sequence_file applies the length policy.
+    """
+    seq_file = read_sequences(path)
+    sequences = [seq_file.sequence(i) for i in range(len(seq_file.offsets) - 1)]
+    return sequences, str(seq_file.header.get('person_id', ''))
+
+
+def _align(n):
+    return (n + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+# ===== JSON CONVERSION =====
+def json_to_sequences(data):
+    """All sequences of a collector JSON export as (frames, 126) float32 arrays."""
+    from dataset_cache import sequence_to_array  # dataset_cache imports this module
+    return [sequence_to_array(sequence) for sequence in data.get('sequences', [])]
+
+
+def convert_json_file(json_path, vsq_path=None, dtype='float16'):
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    vsq_path = vsq_path or os.path.splitext(json_path)[0] + EXTENSION
+    durations = [s.get('duration_ms') for s in data.get('sequences', [])]
+    write_sequences(vsq_path, json_to_sequences(data), data.get('gesture', ''),
+                    str(data.get('person_id', '')), durations, dtype)
+    return vsq_path
+
+
+def convert_json_folder(data_dir='dataset', output_dir=None, dtype='float16', remove_json=False):
+    """
+    Convert every dataset/<gesture>/*.json to .vsq, next to the JSON file or
+    mirrored under `output_dir`. load_dataset prefers a .vsq over a JSON
+    file with the same name, so converting in place is safe.
+    """
+    output_dir = output_dir or data_dir
+    json_bytes = vsq_bytes = converted = 0
+    for gesture in sorted(os.listdir(data_dir)):
+        gesture_path = os.path.join(data_dir, gesture)
+        if not os.path.isdir(gesture_path) or gesture.startswith('.'):
+            continue
+        os.makedirs(os.path.join(output_dir, gesture), exist_ok=True)
+        for filename in sorted(os.listdir(gesture_path)):
+            if not filename.endswith('.json'):
+                continue
+            json_path = os.path.join(gesture_path, filename)
+            vsq_path = os.path.join(output_dir, gesture, os.path.splitext(filename)[0] + EXTENSION)
+            convert_json_file(json_path, vsq_path, dtype)
+            json_bytes += os.path.getsize(json_path)
+            vsq_bytes += os.path.getsize(vsq_path)
+            converted += 1
+            if remove_json:
+                os.remove(json_path)
+
+    print(f"✓ Converted {converted} files: {json_bytes / 1024 / 1024:.1f} MB JSON -> "
+          f"{vsq_bytes / 1024 / 1024:.1f} MB {EXTENSION} ({dtype})")
+    return converted
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert dataset JSON files to the binary .vsq format')
+    parser.add_argument('data_dir', nargs='?', default='dataset')
+    parser.add_argument('--output-dir', help='default: write next to the JSON files')
+    parser.add_argument('--dtype', choices=list(DTYPE_NAMES), default='float16')
+    parser.add_argument('--remove-json', action='store_true', help='delete JSON files after converting')
+    args = parser.parse_args()
+
+    convert_json_folder(args.data_dir, args.output_dir, args.dtype, args.remove_json)
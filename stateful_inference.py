@@ -0,0 +1,234 @@
+"""
+V-Sign AI - Incremental (Stateful) Inference
+Export a single-step variant of the trained model that carries LSTM state
+per stream, so each new frame costs one recurrent step instead of 30
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from inference_engine import SEQUENCE_LENGTH, load_keras_model, load_labels
+from preprocessing import LandmarkFeatures
+
+VERIFY_TOLERANCE = 1e-4
+
+
+# ===== STEP MODEL =====
+def _cell_for(layer):
+    """Recurrent cell with the same configuration as `layer`."""
+    if isinstance(layer, keras.layers.LSTM):
+        cell = keras.layers.LSTMCell(
+            layer.units, activation=layer.activation,
+            recurrent_activation=layer.recurrent_activation, use_bias=layer.use_bias,
+            unit_forget_bias=layer.cell.unit_forget_bias)
+    elif isinstance(layer, keras.layers.GRU):
+        cell = keras.layers.GRUCell(
+            layer.units, activation=layer.activation,
+            recurrent_activation=layer.recurrent_activation, use_bias=layer.use_bias,
+            reset_after=layer.reset_after)
+    else:
+        raise ValueError(f"Layer '{layer.name}' ({type(layer).__name__}) has no single-step form")
+    return cell
+
+
+def build_step_model(model):
+    """
+    Build a model computing one time step of `model`.
+
+    Inputs:  [frame (B, 126), *states]   states = the previous raw frame for
+             LandmarkFeatures, h, c per LSTM layer (h per GRU)
+    Outputs: [probabilities (B, classes), *new_states]
+
+    Recurrent layers become cells loaded with the trained weights; layers
+    that act per time step (LandmarkFeatures, Batch/LayerNormalization, Dense)
+    are applied to the single frame, Dropout is dropped.
+    If the model masks frames (variable-length and stream models), a masked
+    frame (all zeros, no hands) leaves every recurrent state unchanged and
+    repeats the previous recurrent output, as the Masking layer does offline.
+    """
+    features = model.input_shape[-1]
+    frame = keras.Input(shape=(features,), name='frame')
+    inputs, outputs_states = [frame], []
+
+    masking = next((layer for layer in model.layers if isinstance(layer, keras.layers.Masking)), None)
+    keep = None
+    if masking is not None:
+        keep = tf.cast(tf.reduce_any(tf.not_equal(frame, masking.mask_value), axis=-1, keepdims=True), frame.dtype)
+
+    x = frame
+    for layer in model.layers:
+        if isinstance(layer, keras.layers.InputLayer):
+            continue
+        if isinstance(layer, LandmarkFeatures):
+            # Wrist velocity needs the frame before: carry it as a state
+            previous = keras.Input(shape=(features,), name=f'{layer.name}_previous')
+            x = LandmarkFeatures.from_config(layer.get_config())(frame, previous=previous)
+            inputs.append(previous)
+            outputs_states.append(frame)
+        elif isinstance(layer, (keras.layers.LSTM, keras.layers.GRU)):
+            cell = _cell_for(layer)
+            state_names = ['h', 'c'] if isinstance(layer, keras.layers.LSTM) else ['h']
+            states = [keras.Input(shape=(layer.units,), name=f'{layer.name}_{n}') for n in state_names]
+            cell.build(x.shape)
+            cell.set_weights(layer.get_weights())
+            x, new_states = cell(x, states)
+            if not isinstance(new_states, (list, tuple)):
+                new_states = [new_states]
+            if keep is not None:
+                new_states = [keep * new + (1.0 - keep) * old for new, old in zip(new_states, states)]
+                x = keep * x + (1.0 - keep) * states[0]  # output = h, carried over a masked frame
+            inputs.extend(states)
+            outputs_states.extend(new_states)
+        elif isinstance(layer, (keras.layers.BatchNormalization, keras.layers.LayerNormalization)):
+            # Axis was resolved for (B, T, F) inputs; rebuild it for (B, F)
+            config = layer.get_config()
+            config.update(axis=-1, name=f'{layer.name}_step')
+            step_norm = type(layer).from_config(config)
+            step_norm.build(x.shape)
+            step_norm.set_weights(layer.get_weights())
+            x = step_norm(x, training=False)
+        elif isinstance(layer, (keras.layers.Dropout, keras.layers.Masking)):
+            continue  # identity at inference; masked frames are handled through `keep`
+        elif isinstance(layer, (keras.layers.Dense, keras.layers.Activation)):
+            x = layer(x)
+        else:
+            raise ValueError(f"Layer '{layer.name}' ({type(layer).__name__}) has no single-step form")
+
+    return keras.Model(inputs, [x] + outputs_states, name=f'{model.name}_step')
+
+
+def zero_states(step_model, batch=1):
+    return [np.zeros((batch,) + tuple(t.shape[1:]), dtype=np.float32) for t in step_model.inputs[1:]]
+
+
+# ===== RECOGNIZER =====
+class IncrementalRecognizer:
+    """
+    Carries recurrent state per stream and updates it one frame at a time.
+
+    Starting from a reset, the output after 30 frames equals the windowed
+    model on those frames. Past that the state keeps summarising the whole
+    stream rather than exactly the last 30 frames; set `reset_every` to
+    restart the state periodically (reset_every=30 reproduces the windowed
+    model on consecutive, non-overlapping windows).
+    """
+
+    def __init__(self, step_model, labels, reset_every=None, min_frames=SEQUENCE_LENGTH):
+        self.step_model = step_model
+        self.labels = labels
+        self.reset_every = reset_every
+        self.min_frames = min_frames
+        self.streams = {}
+        self._step = tf.function(lambda inputs: step_model(inputs, training=False))
+
+    def reset(self, stream_id):
+        self.streams.pop(stream_id, None)
+
+    def step_many(self, stream_ids, frames):
+        """
+        Advance several streams by one frame in a single batched call.
+        frames: (len(stream_ids), 126). Returns probabilities per stream, or
+        None for streams that have seen fewer than `min_frames` frames.
+        """
+        entries = []
+        for stream_id in stream_ids:
+            entry = self.streams.get(stream_id)
+            if entry is None or (self.reset_every and entry['count'] >= self.reset_every):
+                entry = self.streams[stream_id] = {'states': zero_states(self.step_model), 'count': 0}
+            entries.append(entry)
+
+        num_states = len(entries[0]['states'])
+        states = [np.concatenate([e['states'][i] for e in entries]) for i in range(num_states)]
+        outputs = self._step([np.asarray(frames, dtype=np.float32)] + states)
+        probs, new_states = outputs[0].numpy(), [s.numpy() for s in outputs[1:]]
+
+        results = []
+        for row, entry in enumerate(entries):
+            entry['states'] = [s[row:row + 1] for s in new_states]
+            entry['count'] += 1
+            results.append(probs[row] if entry['count'] >= self.min_frames else None)
+        return results
+
+    def step(self, stream_id, frame):
+        return self.step_many([stream_id], np.asarray(frame)[np.newaxis])[0]
+
+
+# ===== VERIFICATION =====
+def run_step_model(step_model, X):
+    """Feed (B, T, 126) through the step model frame by frame, return final probabilities."""
+    states = zero_states(step_model, len(X))
+    step = tf.function(lambda inputs: step_model(inputs, training=False))
+    for t in range(X.shape[1]):
+        outputs = step([X[:, t]] + states)
+        states = list(outputs[1:])
+    return outputs[0].numpy()
+
+
+def verify(model, step_model, X, tolerance=VERIFY_TOLERANCE):
+    """
+    Check that the step model reproduces the windowed model on X.
+    Returns the maximum absolute difference in output probabilities.
+    """
+    expected = model.predict(X, verbose=0)
+    actual = run_step_model(step_model, X)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    agree = float(np.mean(np.argmax(expected, axis=1) == np.argmax(actual, axis=1)))
+    status = 'OK' if max_diff <= tolerance else 'MISMATCH'
+    print(f"Step model vs windowed model on {len(X)} windows: "
+          f"max |diff| = {max_diff:.2e}, argmax agreement = {agree:.2%} [{status}]")
+    return max_diff
+
+
+def benchmark_per_frame(model, step_model, frames=300):
+    """Per-frame latency: re-running the 30-frame window vs one incremental step."""
+    features = model.input_shape[-1]
+    window = np.random.rand(1, SEQUENCE_LENGTH, features).astype(np.float32)
+    windowed = tf.function(lambda x: model(x, training=False))
+    recognizer = IncrementalRecognizer(step_model, labels=[])
+
+    windowed(window)
+    recognizer.step('warmup', window[0, 0])
+
+    start = time.perf_counter()
+    for _ in range(frames):
+        windowed(window)
+    windowed_ms = (time.perf_counter() - start) / frames * 1000
+
+    start = time.perf_counter()
+    for i in range(frames):
+        recognizer.step('bench', window[0, i % SEQUENCE_LENGTH])
+    step_ms = (time.perf_counter() - start) / frames * 1000
+
+    print(f"Per-frame latency: windowed {windowed_ms:.2f} ms, incremental {step_ms:.2f} ms "
+          f"({windowed_ms / step_ms:.1f}x)")
+    return windowed_ms, step_ms
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Export and verify the single-step (stateful) model')
+    parser.add_argument('--model', default='vsign_model_final.h5')
+    parser.add_argument('--output', default='vsign_model_step.h5')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--verify', action='store_true',
+                        help='compare against the windowed model on dataset sequences and exit non-zero on mismatch')
+    args = parser.parse_args()
+
+    model = load_keras_model(args.model)
+    step_model = build_step_model(model)
+    step_model.save(args.output)
+    print(f"✓ Step model saved to '{args.output}' (labels: {', '.join(load_labels())})")
+
+    if args.verify:
+        from train_model import load_dataset
+        X, _ = load_dataset(args.data_dir)
+        if len(X) == 0:
+            X = np.random.rand(64, SEQUENCE_LENGTH, model.input_shape[-1]).astype(np.float32)
+        X = np.asarray(X[:256], dtype=np.float32)
+        max_diff = verify(model, step_model, X)
+        benchmark_per_frame(model, step_model)
+        sys.exit(0 if max_diff <= VERIFY_TOLERANCE else 1)
@@ -0,0 +1,576 @@
+"""
+V-Sign AI - Continuous Stream Recognition
+Transcribe a long landmark recording into timestamped gesture spans in a
+single pass: a framewise model (the classifier's recurrent stack with an
+output per frame and an extra 'no sign' class) runs once over the whole
+stream, and a span decoder segments its per-frame probabilities.
+Also benchmarks this against the sliding-window classifier.
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+from tensorflow.keras.layers import LSTM, Dense, Dropout, LayerNormalization, Masking
+
+from dataset_cache import FRAME_FEATURES, resample_sequence, sequence_to_array
+from inference_engine import SEQUENCE_LENGTH, load_keras_model, load_labels
+from preprocessing import LandmarkFeatures
+from sequence_format import EXTENSION as BINARY_EXTENSION, parse_binary_file
+
+# ===== CONFIGURATION =====
+FPS = 30                      # collector / video_to_dataset frame rate
+SIGNS_PER_STREAM = (4, 12)    # training streams chain this many dataset signs
+GAP_FRAMES = (4, 24)          # transition frames between two signs, labelled 'no sign'
+SMOOTHING_FRAMES = 5          # causal moving average of the per-frame probabilities
+MIN_SPAN_FRAMES = 8           # shorter runs are dropped as flicker
+CONFIDENCE_THRESHOLD = 0.7    # mean probability of an accepted span (same as the web app)
+SPAN_IOU = 0.5                # overlap for a predicted span to count as a detection
+CHUNK_FRAMES = 600            # long streams run as a batch of chunks of this many frames...
+CONTEXT_FRAMES = 90           # ...each preceded by this many frames of the one before (3 s)
+UNITS = (64, 32)
+EPOCHS = 60
+BATCH_SIZE = 16
+SEED = 42
+MODEL_PATH = 'vsign_stream_model.h5'
+INFO_PATH = 'stream_info.json'
+
+
+# ===== TRAINING STREAMS =====
+def transition(frame_from, frame_to, frames):
+    """`frames` frames of the hands moving from one sign's last frame to the next sign's first."""
+    return resample_sequence(np.stack([frame_from, frame_to]), frames + 2)[1:-1]
+
+
+def synthesize_stream(dataset, indices, rng, num_signs, blank):
+    """
+    Chain `num_signs` random signs from `indices` of a variable-length
+    CachedDataset with interpolated transitions between them.
+    Returns (frames (T, 126), frame labels (T,) with `blank` between signs,
+    spans [(start, end, label)]).
+    """
+    parts, labels, spans, cursor = [], [], [], 0
+    for k, i in enumerate(rng.choice(indices, num_signs)):
+        sign = np.asarray(dataset.sequence(i), dtype=np.float32)
+        if k:
+            gap = transition(parts[-1][-1], sign[0], int(rng.integers(*GAP_FRAMES)))
+            parts.append(gap)
+            labels.append(np.full(len(gap), blank))
+            cursor += len(gap)
+        parts.append(sign)
+        labels.append(np.full(len(sign), dataset.y[i]))
+        spans.append((cursor, cursor + len(sign), int(dataset.y[i])))
+        cursor += len(sign)
+    return np.concatenate(parts), np.concatenate(labels).astype(np.int64), spans
+
+
+def make_stream_dataset(dataset, indices, num_streams, blank, batch_size=BATCH_SIZE, seed=SEED,
+                        replay=False, signs_per_stream=SIGNS_PER_STREAM):
+    """
+    tf.data of (frames, frame labels, frame weights) batches of synthesized
+    streams, zero-padded to the longest stream of the batch; padded frames
+    get weight 0. New streams are drawn every epoch (training), or with
+    replay=True the same ones every time (validation).
+    """
+    rng = np.random.default_rng(seed)
+
+    def generate():
+        stream_rng = np.random.default_rng(seed) if replay else rng
+        for _ in range(0, num_streams, batch_size):
+            streams = [synthesize_stream(dataset, indices, stream_rng,
+                                         int(stream_rng.integers(signs_per_stream[0], signs_per_stream[1] + 1)),
+                                         blank)
+                       for _ in range(batch_size)]
+            steps = max(len(frames) for frames, _, _ in streams)
+            x = np.zeros((batch_size, steps, FRAME_FEATURES), dtype=np.float32)
+            y = np.zeros((batch_size, steps), dtype=np.int64)
+            w = np.zeros((batch_size, steps), dtype=np.float32)
+            for row, (frames, labels, _) in enumerate(streams):
+                x[row, :len(frames)], y[row, :len(frames)], w[row, :len(frames)] = frames, labels, 1.0
+            yield x, y, w
+
+    signature = (
+        tf.TensorSpec(shape=(None, None, FRAME_FEATURES), dtype=tf.float32),
+        tf.TensorSpec(shape=(None, None), dtype=tf.int64),
+        tf.TensorSpec(shape=(None, None), dtype=tf.float32),
+    )
+    return tf.data.Dataset.from_generator(generate, output_signature=signature).prefetch(tf.data.AUTOTUNE)
+
+
+# ===== MODEL =====
+def create_stream_model(num_classes, units=UNITS, dropout=0.3, learning_rate=1e-3, features=True):
+    """
+    The 'lstm' classifier with a prediction for every frame: (None, 126)
+    streams of any length in, (None, num_classes + 1) out, the last class
+    meaning 'no sign'. Unidirectional, so build_step_model turns it into
+    a live per-frame recognizer. LayerNormalization instead of
+    BatchNormalization: batch statistics of whole streams did not carry
+    over to inference.
+    """
+    layers = [keras.Input(shape=(None, FRAME_FEATURES)), Masking(mask_value=0.0)]
+    if features:
+        layers.append(LandmarkFeatures())
+    layers += [
+        LSTM(units[0], return_sequences=True),
+        LayerNormalization(),
+        Dropout(dropout),
+
+        LSTM(units[1], return_sequences=True),
+        LayerNormalization(),
+        Dropout(dropout),
+
+        Dense(64, activation='relu'),
+        Dropout(0.2),
+        Dense(num_classes + 1, activation='softmax', dtype='float32'),
+    ]
+    model = keras.Sequential(layers)
+    model.compile(optimizer=keras.optimizers.Adam(learning_rate=learning_rate),
+                  loss='sparse_categorical_crossentropy', weighted_metrics=['accuracy'])
+    return model
+
+
+def compile_stream_forward(model):
+    """One traced graph for streams of every length."""
+    spec = tf.TensorSpec((None, None, FRAME_FEATURES), tf.float32)
+    return tf.function(lambda x: model(x, training=False), input_signature=[spec])
+
+
+# ===== DECODING =====
+def _span(labels, label, start, end, confidence, fps):
+    return {
+        'gesture': labels[label] if label < len(labels) else str(label),
+        'label': int(label),
+        'start_frame': int(start),
+        'end_frame': int(end),  # exclusive
+        'start_s': round(start / fps, 3),
+        'end_s': round(end / fps, 3),
+        'confidence': round(float(confidence), 4),
+    }
+
+
+def smooth_probabilities(probs, frames=SMOOTHING_FRAMES):
+    """Causal moving average over the last `frames` frames, (T, C) -> (T, C)."""
+    cumulative = np.cumsum(np.concatenate([np.zeros((1, probs.shape[1])), probs]), axis=0)
+    t = np.arange(1, len(probs) + 1)
+    start = np.maximum(t - frames, 0)
+    return (cumulative[t] - cumulative[start]) / (t - start)[:, None]
+
+
+def decode_spans(probs, labels, smoothing=SMOOTHING_FRAMES, min_frames=MIN_SPAN_FRAMES,
+                 threshold=CONFIDENCE_THRESHOLD, fps=FPS):
+    """
+    Segment (T, num_classes + 1) per-frame probabilities of a whole stream
+    (last column = no sign): smooth, label every frame by argmax, and keep
+    runs of one gesture lasting `min_frames` frames with a mean probability
+    of at least `threshold`. Same result as feeding SpanDecoder frame by frame.
+    """
+    blank = probs.shape[1] - 1
+    smoothed = smooth_probabilities(np.asarray(probs, dtype=np.float64), smoothing)
+    frame_labels = np.argmax(smoothed, axis=1)
+    boundaries = np.flatnonzero(np.diff(frame_labels)) + 1
+    spans = []
+    for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(frame_labels)]):
+        label = frame_labels[start]
+        if label == blank or end - start < min_frames:
+            continue
+        confidence = smoothed[start:end, label].mean()
+        if confidence >= threshold:
+            spans.append(_span(labels, label, start, end, confidence, fps))
+    return spans
+
+
+class SpanDecoder:
+    """
+    decode_spans for a live stream: push one frame's probabilities at a
+    time, a span is returned once the frame after it has arrived.
+    """
+
+    def __init__(self, labels, smoothing=SMOOTHING_FRAMES, min_frames=MIN_SPAN_FRAMES,
+                 threshold=CONFIDENCE_THRESHOLD, fps=FPS):
+        self.labels = labels
+        self.min_frames = min_frames
+        self.threshold = threshold
+        self.fps = fps
+        self.window = deque(maxlen=smoothing)
+        self.blank = None
+        self.frame = 0
+        self.run_label, self.run_start, self.run_confidence = None, 0, 0.0
+
+    def _close(self):
+        label, length = self.run_label, self.frame - self.run_start
+        if label is None or label == self.blank or length < self.min_frames:
+            return None
+        confidence = self.run_confidence / length
+        if confidence < self.threshold:
+            return None
+        return _span(self.labels, label, self.run_start, self.frame, confidence, self.fps)
+
+    def push(self, probs):
+        self.blank = len(probs) - 1
+        self.window.append(np.asarray(probs, dtype=np.float64))
+        smoothed = np.mean(self.window, axis=0)
+        label = int(np.argmax(smoothed))
+        span = None
+        if label != self.run_label:
+            span = self._close()
+            self.run_label, self.run_start, self.run_confidence = label, self.frame, 0.0
+        self.run_confidence += smoothed[label]
+        self.frame += 1
+        return span
+
+    def flush(self):
+        """End of stream: the span still open, if it qualifies."""
+        span = self._close()
+        self.run_label = None
+        return span
+
+
+class StreamTranscriber:
+    """
+    Live transcription: the stream model's single-step form advances each
+    stream by one frame (constant work per frame, see stateful_inference.py)
+    and a SpanDecoder per stream emits gesture spans as they end.
+    """
+
+    def __init__(self, model, labels, **decoder_options):
+        from stateful_inference import IncrementalRecognizer, build_step_model
+        self.recognizer = IncrementalRecognizer(build_step_model(model), labels, min_frames=1)
+        self.labels = labels
+        self.decoder_options = decoder_options
+        self.decoders = {}
+
+    def push(self, stream_id, frame):
+        """Add one 126-value frame; returns a finished span dict or None."""
+        decoder = self.decoders.get(stream_id)
+        if decoder is None:
+            decoder = self.decoders[stream_id] = SpanDecoder(self.labels, **self.decoder_options)
+        return decoder.push(self.recognizer.step(stream_id, frame))
+
+    def end(self, stream_id):
+        decoder = self.decoders.pop(stream_id, None)
+        self.recognizer.reset(stream_id)
+        return decoder.flush() if decoder else None
+
+
+def stream_probabilities(forward, frames, chunk=CHUNK_FRAMES, context=CONTEXT_FRAMES):
+    """
+    Per-frame probabilities of a whole (T, 126) stream in one forward call.
+    A stream longer than `chunk` frames is cut into chunks that start
+    `context` frames early and run side by side as one batch: the recurrent
+    loop then takes chunk + context steps instead of T, and every chunk's
+    state starts on a stream length the model was trained on.
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    if len(frames) <= chunk + context:
+        return forward(frames[np.newaxis])[0].numpy()
+    starts = np.arange(0, len(frames), chunk)
+    batch = np.zeros((len(starts), chunk + context, FRAME_FEATURES), dtype=np.float32)
+    for row, start in enumerate(starts):
+        piece = frames[max(0, start - context):start + chunk]
+        batch[row, :len(piece)] = piece
+    probs = forward(batch).numpy()
+    # Chunk 0 has no context in front of it
+    return np.concatenate([probs[row, (context if start else 0):][:min(chunk, len(frames) - start)]
+                           for row, start in enumerate(starts)])
+
+
+def transcribe(forward, frames, labels, **decoder_options):
+    """Spans of a whole (T, 126) stream from one (chunk-batched) pass of the stream model."""
+    return decode_spans(stream_probabilities(forward, frames), labels, **decoder_options)
+
+
+# ===== SLIDING-WINDOW BASELINE =====
+def sliding_window_spans(classifier_forward, frames, labels, stride=1, window=SEQUENCE_LENGTH,
+                         batch_size=256, threshold=CONFIDENCE_THRESHOLD, **decoder_options):
+    """
+    Spans from the windowed classifier, as the inference engine sees a
+    recording: every `stride`-th window of `window` frames is classified;
+    its prediction (or 'no sign' below `threshold`) holds for the frames
+    around the window centre until the next window. Returns (spans, windows run).
+    """
+    frames = np.asarray(frames, dtype=np.float32)
+    if len(frames) < window:
+        return [], 0  # not a single full window
+    ends = np.arange(window - 1, len(frames), stride)
+    views = np.lib.stride_tricks.sliding_window_view(frames, window, axis=0)  # (T - window + 1, 126, window)
+    window_probs = np.concatenate([
+        classifier_forward(np.ascontiguousarray(views[ends[i:i + batch_size] - window + 1].transpose(0, 2, 1))).numpy()
+        for i in range(0, len(ends), batch_size)
+    ]) if len(ends) else np.zeros((0, len(labels)), dtype=np.float32)
+
+    accepted = window_probs.max(axis=1, keepdims=True) >= threshold
+    window_probs = np.concatenate([window_probs * accepted, 1.0 - accepted], axis=1)
+    # Frame t takes the latest window whose centre is at or before t
+    centres = ends - window // 2
+    which = np.searchsorted(centres, np.arange(len(frames)), side='right') - 1
+    probs = np.zeros((len(frames), len(labels) + 1), dtype=np.float32)
+    probs[:, -1] = 1.0
+    covered = which >= 0
+    probs[covered] = window_probs[which[covered]]
+    return decode_spans(probs, labels, threshold=threshold, **decoder_options), len(ends)
+
+
+# ===== EVALUATION =====
+def match_spans(predicted, truth, iou=SPAN_IOU):
+    """
+    Greedy one-to-one matching of predicted spans to ground-truth
+    (start, end, label) spans with the same label and IoU >= `iou`.
+    Returns precision, recall and F1.
+    """
+    unmatched = list(truth)
+    hits = 0
+    for span in predicted:
+        for k, (start, end, label) in enumerate(unmatched):
+            if label != span['label']:
+                continue
+            inter = min(end, span['end_frame']) - max(start, span['start_frame'])
+            union = max(end, span['end_frame']) - min(start, span['start_frame'])
+            if inter > 0 and inter / union >= iou:
+                hits += 1
+                del unmatched[k]
+                break
+    precision = hits / len(predicted) if predicted else 0.0
+    recall = hits / len(truth) if truth else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {'precision': precision, 'recall': recall, 'f1': f1}
+
+
+# ===== TRAINING =====
+def _load_splits(data_dir):
+    from dataset_manifest import get_labels
+    from train_model import load_variable_length_dataset, split_dataset, use_labels
+
+    labels = get_labels(data_dir)
+    use_labels(labels)
+    dataset = load_variable_length_dataset(data_dir)
+    if len(dataset.y) == 0:
+        return labels, dataset, None
+    # Same stratified split as train_model.py, so test signs were never trained on
+    idx_train, idx_val, idx_test, _, _, _ = split_dataset(np.arange(len(dataset.y)), dataset.y)
+    return labels, dataset, {'train': idx_train, 'val': idx_val, 'test': idx_test}
+
+
+def evaluation_streams(dataset, indices, num_streams, signs_per_stream, blank, seed=SEED):
+    rng = np.random.default_rng(seed)
+    return [synthesize_stream(dataset, indices, rng, signs_per_stream, blank) for _ in range(num_streams)]
+
+
+def train_stream_model(data_dir='dataset', epochs=EPOCHS, units=UNITS, batch_size=BATCH_SIZE,
+                       features=True, model_path=MODEL_PATH, info_path=INFO_PATH):
+    """
+    Train the framewise stream model on streams chained from the dataset's
+    training split, evaluate span F1 on streams of test-split signs and
+    save the model plus stream_info.json (labels and decoder settings).
+    """
+    print("=" * 60)
+    print(" " * 10 + "V-SIGN AI - STREAM MODEL TRAINING")
+    print("=" * 60)
+
+    labels, dataset, splits = _load_splits(data_dir)
+    if splits is None:
+        print("\nERROR: No data found! Run generate_sample_data.py or collect data first.")
+        return None
+
+    # About every training sign once per epoch
+    mean_signs = sum(SIGNS_PER_STREAM) / 2
+    train_streams = max(batch_size, int(len(splits['train']) / mean_signs) // batch_size * batch_size)
+    val_streams = max(batch_size, int(len(splits['val']) / mean_signs) // batch_size * batch_size)
+    train_ds = make_stream_dataset(dataset, splits['train'], train_streams, len(labels), batch_size)
+    val_ds = make_stream_dataset(dataset, splits['val'], val_streams, len(labels), batch_size, replay=True)
+    print(f"\n{train_streams} training streams per epoch from {len(splits['train'])} signs, "
+          f"{val_streams} validation streams")
+
+    keras.utils.set_random_seed(SEED)
+    model = create_stream_model(len(labels), units, features=features)
+    start = time.perf_counter()
+    history = model.fit(
+        train_ds, validation_data=val_ds, epochs=epochs, verbose=2,
+        callbacks=[keras.callbacks.EarlyStopping(monitor='val_loss', patience=8, restore_best_weights=True),
+                   keras.callbacks.ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=4)]
+    )
+    seconds = time.perf_counter() - start
+    model.save(model_path)
+    print(f"\n✓ Stream model saved as '{model_path}'")
+
+    forward = compile_stream_forward(model)
+    streams = evaluation_streams(dataset, splits['test'], 10, 20, len(labels))
+    scores = [match_spans(transcribe(forward, frames, labels), spans) for frames, _, spans in streams]
+    span_f1 = float(np.mean([s['f1'] for s in scores]))
+    print(f"Span F1 on {len(streams)} test streams: {span_f1:.4f}")
+
+    info = {
+        'gestures': labels,
+        'blank_index': len(labels),
+        'units': list(units),
+        'input_features': 'landmark_features' if features else 'raw',
+        'epochs': len(history.history['loss']),
+        'train_seconds': round(seconds, 1),
+        'val_frame_accuracy': float(max(history.history['val_accuracy'])),
+        'test_span_f1': span_f1,
+        'decoder': {'smoothing_frames': SMOOTHING_FRAMES, 'min_span_frames': MIN_SPAN_FRAMES,
+                    'confidence_threshold': CONFIDENCE_THRESHOLD, 'fps': FPS},
+    }
+    with open(info_path, 'w', encoding='utf-8') as f:
+        json.dump(info, f, indent=2, ensure_ascii=False)
+    print(f"✓ Stream info saved as '{info_path}'")
+    return model, info
+
+
+# ===== BENCHMARK =====
+def _chunked_frames(length, chunk=CHUNK_FRAMES, context=CONTEXT_FRAMES):
+    """Frames stream_probabilities runs through the model for a stream of `length` frames."""
+    if length <= chunk + context:
+        return length
+    return length + context * (-(-length // chunk) - 1)
+
+
+def benchmark_streams(stream_model, classifier, data_dir='dataset', num_streams=3, signs_per_stream=100,
+                      strides=(1, 5)):
+    """
+    Transcribe long streams of test-split signs with the stream model (one
+    pass) and with the sliding-window classifier at each stride, and
+    compare wall time, forward passes and span precision/recall/F1.
+    """
+    labels, dataset, splits = _load_splits(data_dir)
+    streams = evaluation_streams(dataset, splits['test'], num_streams, signs_per_stream, len(labels))
+    total_frames = sum(len(frames) for frames, _, _ in streams)
+    print(f"\n{num_streams} streams of {signs_per_stream} signs, {total_frames} frames "
+          f"({total_frames / FPS / 60:.1f} min at {FPS} fps)")
+
+    stream_forward = compile_stream_forward(stream_model)
+    classifier_forward = tf.function(lambda x: classifier(x, training=False),
+                                     input_signature=[tf.TensorSpec((None,) + classifier.input_shape[1:],
+                                                                    tf.float32)])
+    # Trace both graphs before timing
+    transcribe(stream_forward, streams[0][0][:SEQUENCE_LENGTH * 2], labels)
+    sliding_window_spans(classifier_forward, streams[0][0][:SEQUENCE_LENGTH * 2], labels)
+
+    methods = {'stream_one_pass': lambda frames: (transcribe(stream_forward, frames, labels), 1)}
+    for stride in strides:
+        methods[f'sliding_window_stride{stride}'] = (
+            lambda frames, stride=stride: sliding_window_spans(classifier_forward, frames, labels, stride))
+
+    report = {
+        'streams': num_streams,
+        'signs_per_stream': signs_per_stream,
+        'frames': total_frames,
+        'recording_seconds': total_frames / FPS,
+        'methods': {},
+    }
+    for name, run in methods.items():
+        start = time.perf_counter()
+        results = [run(frames) for frames, _, _ in streams]
+        seconds = time.perf_counter() - start
+        scores = [match_spans(spans, truth) for (spans, _), (_, _, truth) in zip(results, streams)]
+        passes = sum(n for _, n in results)
+        report['methods'][name] = {
+            'wall_seconds': seconds,
+            'forward_passes': passes,
+            'frames_processed': (sum(_chunked_frames(len(frames)) for frames, _, _ in streams)
+                                 if name == 'stream_one_pass' else passes * SEQUENCE_LENGTH),
+            'frames_per_s': total_frames / seconds,
+            'seconds_per_10_min': seconds / (total_frames / FPS) * 600,
+            **{k: float(np.mean([s[k] for s in scores])) for k in ('precision', 'recall', 'f1')},
+        }
+    one_pass = report['methods']['stream_one_pass']['wall_seconds']
+    for name, entry in report['methods'].items():
+        entry['speedup_of_one_pass'] = entry['wall_seconds'] / one_pass
+    return report
+
+
+def print_benchmark(report):
+    print(f"\n{'method':<24} {'passes':>7} {'frames':>9} {'wall s':>8} {'s/10min':>8} "
+          f"{'prec':>6} {'recall':>6} {'F1':>6} {'x':>6}")
+    for name, m in report['methods'].items():
+        print(f"{name:<24} {m['forward_passes']:>7} {m['frames_processed']:>9} {m['wall_seconds']:>8.2f} "
+              f"{m['seconds_per_10_min']:>8.2f} {m['precision']:>6.3f} {m['recall']:>6.3f} {m['f1']:>6.3f} "
+              f"{m['speedup_of_one_pass']:>6.1f}")
+
+
+# ===== INPUT =====
+def read_streams(path):
+    """
+    Landmark streams of a recording file: one per sequence of a .vsq or
+    collector .json file, or a single (T, 126) .npy array.
+    """
+    if path.endswith('.npy'):
+        return [np.load(path).reshape(-1, FRAME_FEATURES)]
+    if path.endswith(BINARY_EXTENSION):
+        return parse_binary_file(path)[0]
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return [sequence_to_array(sequence) for sequence in data.get('sequences', [])]
+
+
+def _timestamp(seconds):
+    return f"{int(seconds // 60):02d}:{seconds % 60:05.2f}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Continuous sign recognition over long landmark streams')
+    parser.add_argument('--train', action='store_true', help='train the framewise stream model')
+    parser.add_argument('--transcribe', metavar='FILE', help='.vsq, collector .json or (T, 126) .npy recording')
+    parser.add_argument('--benchmark', action='store_true', help='compare with the sliding-window classifier')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--model', default=MODEL_PATH)
+    parser.add_argument('--info', help=f"labels of --model (default: {INFO_PATH} next to it)")
+    parser.add_argument('--window-model', default='vsign_model_final.h5', help='classifier for --benchmark')
+    parser.add_argument('--epochs', type=int, default=EPOCHS)
+    parser.add_argument('--units', type=int, nargs=2, default=list(UNITS))
+    parser.add_argument('--streams', type=int, default=3, help='benchmark streams')
+    parser.add_argument('--signs', type=int, default=100, help='signs per benchmark stream')
+    parser.add_argument('--output', help='JSON file for the spans / benchmark report')
+    args = parser.parse_args()
+    info_path = args.info or os.path.join(os.path.dirname(args.model), INFO_PATH)
+
+    if args.train:
+        train_stream_model(args.data_dir, args.epochs, tuple(args.units), model_path=args.model,
+                           info_path=info_path)
+
+    if args.transcribe or args.benchmark:
+        if not os.path.exists(args.model):
+            print(f"\nERROR: File '{args.model}' không tồn tại!")
+            print("Vui lòng chạy stream_recognition.py --train trước.")
+            raise SystemExit(1)
+        if not os.path.exists(info_path):
+            print(f"\nERROR: File '{info_path}' không tồn tại!")
+            print("Vui lòng chạy stream_recognition.py --train trước hoặc chỉ định --info.")
+            raise SystemExit(1)
+        model = load_keras_model(args.model)
+        with open(info_path, 'r', encoding='utf-8') as f:
+            labels = json.load(f)['gestures']
+
+    if args.transcribe:
+        forward = compile_stream_forward(model)
+        results = []
+        for number, frames in enumerate(read_streams(args.transcribe)):
+            spans = transcribe(forward, frames, labels)
+            results.append({'stream': number, 'frames': len(frames), 'spans': spans})
+            print(f"\nStream {number}: {len(frames)} frames, {len(spans)} gestures")
+            for span in spans:
+                print(f"  {_timestamp(span['start_s'])}-{_timestamp(span['end_s'])}  "
+                      f"{span['gesture']} ({span['confidence']:.2f})")
+        output = results
+    elif args.benchmark:
+        print("=" * 60)
+        print(" " * 10 + "V-SIGN AI - STREAM RECOGNITION BENCHMARK")
+        print("=" * 60)
+        if load_labels(os.path.join(os.path.dirname(args.window_model), 'training_info.json')) != labels:
+            print("\nERROR: --window-model was trained on other labels than the stream model!")
+            raise SystemExit(1)
+        report = benchmark_streams(model, load_keras_model(args.window_model), args.data_dir,
+                                   args.streams, args.signs)
+        print_benchmark(report)
+        output = report
+    else:
+        output = None
+
+    if args.output and output is not None:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Saved to '{args.output}'")
@@ -0,0 +1,63 @@
+"""
+The single-step model must reproduce the windowed model it was built from.
+"""
+
+import numpy as np
+import pytest
+from tensorflow import keras
+
+from stateful_inference import VERIFY_TOLERANCE, IncrementalRecognizer, build_step_model, run_step_model
+from train_model import SEQUENCE_LENGTH, create_model
+
+NUM_CLASSES = 5
+
+
+def _windows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.random((n, SEQUENCE_LENGTH, 126), dtype=np.float32)
+    X[::2, :, 63:] = 0          # second hand missing
+    X[1::4, 10:14, :63] = 0     # first hand lost for a few frames
+    return X
+
+
+def _trained_model(architecture, features):
+    keras.utils.set_random_seed(0)
+    model = create_model(architecture=architecture, units=(16, 8), num_classes=NUM_CLASSES,
+                         features=features)
+    X = _windows(64, seed=1)
+    model.fit(X, np.arange(len(X)) % NUM_CLASSES, epochs=1, batch_size=16, verbose=0)  # non-trivial BN stats
+    return model
+
+
+@pytest.mark.parametrize('architecture,features', [('lstm_relu', True), ('lstm', False), ('gru', True)])
+def test_step_model_matches_windowed_model(architecture, features):
+    model = _trained_model(architecture, features)
+    step_model = build_step_model(model)
+    X = _windows(8)
+
+    expected = model.predict(X, verbose=0)
+    actual = run_step_model(step_model, X)
+    assert np.max(np.abs(expected - actual)) <= VERIFY_TOLERANCE
+
+
+def test_recognizer_matches_windowed_model_after_one_window():
+    model = _trained_model('lstm_relu', True)
+    recognizer = IncrementalRecognizer(build_step_model(model), labels=list(range(NUM_CLASSES)))
+    window = _windows(1)[0]
+
+    outputs = [recognizer.step('a', frame) for frame in window]
+    assert all(p is None for p in outputs[:-1])
+    expected = model.predict(window[np.newaxis], verbose=0)[0]
+    assert np.max(np.abs(outputs[-1] - expected)) <= VERIFY_TOLERANCE
+
+
+def test_step_model_skips_masked_frames_like_the_masking_layer():
+    keras.utils.set_random_seed(0)
+    model = create_model(units=(16, 8), num_classes=NUM_CLASSES, features=True, variable_length=True)
+    X = _windows(4)
+    X[:, 5:12] = 0              # no hands at all: masked offline
+    X[2, -3:] = 0
+
+    expected = model.predict(X, verbose=0)
+    actual = run_step_model(build_step_model(model), X)
+    assert np.max(np.abs(expected - actual)) <= VERIFY_TOLERANCE
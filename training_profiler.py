@@ -0,0 +1,157 @@
+"""
+V-Sign AI - Training Profiler
+Keras callback recording per-epoch wall time, throughput, input wait vs.
+compute time and memory high-water mark, with an optional TF profiler trace
+"""
+
+import time
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from resource_usage import peak_rss_mb
+
+
+class TrainingProfiler(keras.callbacks.Callback):
+    """
+    Per epoch it records:
+        wall_s       epoch wall time (including validation)
+        train_s      data_wait_s + step_s + host_s
+        data_wait_s  training steps blocked on the input pipeline, waiting
+                     for a batch that was not ready yet (None unless the
+                     training data went through wrap())
+        step_s       the rest of the training steps (forward/backward)
+        host_s       between steps on the host: Keras loop and callbacks
+        samples_per_s
+        peak_rss_mb  process memory high-water mark so far
+
+    Steps are timed from on_train_batch_begin to on_train_batch_end; the
+    model's train function is left as it is. To tell input stalls apart
+    from compute, pass the training dataset through wrap(): it stamps the
+    moment each batch becomes available, and a step that began before its
+    batch was ready waited for the difference.
+
+    profile_steps=(start, stop) captures a TF profiler trace of those
+    global training steps into `log_dir` (view in TensorBoard > Profile).
+    """
+
+    def __init__(self, batch_size, num_samples=None, profile_steps=None, log_dir='logs/profile'):
+        super().__init__()
+        self.batch_size = batch_size
+        self.num_samples = num_samples  # only used when batches are not counted by wrap()
+        self.profile_steps = profile_steps
+        self.log_dir = log_dir
+        self.epochs = []
+        self._global_step = 0
+        self._profiling = False
+        self._wrapped = False
+        self._ready = []  # (time the batch was available, batch size), in training order
+
+    # ----- timed input -----
+    def wrap(self, dataset):
+        """
+        The batched tf.data `dataset` with every batch's ready time recorded.
+        Use it as the training data of a single fit() run; every batch must
+        be consumed (no steps_per_epoch shorter than the dataset).
+        """
+        self._wrapped = True
+        ready = self._ready
+
+        def timed():
+            for batch in dataset:
+                ready.append((time.perf_counter(), int(tf.shape(tf.nest.flatten(batch)[0])[0])))
+                yield batch
+
+        return tf.data.Dataset.from_generator(timed, output_signature=dataset.element_spec)
+
+    # ----- per step / epoch timing -----
+    def on_epoch_begin(self, epoch, logs=None):
+        now = time.perf_counter()
+        self._epoch_start = self._last_end = now
+        self._batch_s = self._host_s = self._wait_s = 0.0
+        self._steps = self._samples = 0
+
+    def on_train_batch_begin(self, batch, logs=None):
+        if self.profile_steps and self._global_step == self.profile_steps[0]:
+            tf.profiler.experimental.start(self.log_dir)
+            self._profiling = True
+        now = time.perf_counter()
+        self._host_s += now - self._last_end
+        self._batch_start = now
+
+    def on_train_batch_end(self, batch, logs=None):
+        now = time.perf_counter()
+        self._batch_s += now - self._batch_start
+        if self._wrapped and self._global_step < len(self._ready):
+            ready, size = self._ready[self._global_step]
+            self._wait_s += min(max(0.0, ready - self._batch_start), now - self._batch_start)
+            self._samples += size
+        self._last_end = now
+        self._steps += 1
+        self._global_step += 1
+        if self._profiling and self._global_step >= self.profile_steps[1]:
+            self._stop_profiler()
+
+    def on_train_end(self, logs=None):
+        if self._profiling:
+            self._stop_profiler()
+
+    def on_epoch_end(self, epoch, logs=None):
+        wall = time.perf_counter() - self._epoch_start
+        train = self._batch_s + self._host_s
+        if self._wrapped:
+            samples = self._samples
+        else:
+            samples = self._steps * self.batch_size
+            if self.num_samples:
+                samples = min(samples, self.num_samples)
+        self.epochs.append({
+            'epoch': epoch + 1,
+            'wall_s': round(wall, 4),
+            'train_s': round(train, 4),
+            'data_wait_s': round(self._wait_s, 4) if self._wrapped else None,
+            'step_s': round(self._batch_s - self._wait_s, 4),
+            'host_s': round(self._host_s, 4),
+            'steps': self._steps,
+            'samples': samples,
+            'samples_per_s': round(samples / train, 1) if train else None,
+            'peak_rss_mb': peak_rss_mb(),
+        })
+
+    def _stop_profiler(self):
+        tf.profiler.experimental.stop()
+        self._profiling = False
+        print(f"\n✓ Profiler trace saved to '{self.log_dir}'")
+
+    def summary(self):
+        """Compact summary for training_info.json."""
+        if not self.epochs:
+            return {}
+        # First epoch includes graph tracing, keep it out of the steady-state numbers
+        steady = self.epochs[1:] or self.epochs
+        train = sum(e['train_s'] for e in steady)
+        waits = [e['data_wait_s'] for e in steady if e['data_wait_s'] is not None]
+        return {
+            'epochs': len(self.epochs),
+            'total_wall_s': round(sum(e['wall_s'] for e in self.epochs), 2),
+            'first_epoch_wall_s': self.epochs[0]['wall_s'],
+            'mean_epoch_wall_s': round(float(np.mean([e['wall_s'] for e in steady])), 4),
+            'samples_per_s': round(float(np.mean([e['samples_per_s'] or 0 for e in steady])), 1),
+            'mean_step_ms': round(1000 * sum(e['step_s'] for e in steady) / max(1, sum(e['steps'] for e in steady)), 3),
+            'data_wait_fraction': round(sum(waits) / train, 4) if train and len(waits) == len(steady) else None,
+            'host_fraction': round(sum(e['host_s'] for e in steady) / train, 4) if train else None,
+            'peak_rss_mb': max((e['peak_rss_mb'] or 0) for e in self.epochs) or None,
+            'per_epoch_wall_s': [e['wall_s'] for e in self.epochs],
+        }
+
+    def print_summary(self):
+        s = self.summary()
+        if not s:
+            return
+        wait = f"{s['data_wait_fraction'] * 100:.1f}%" if s['data_wait_fraction'] is not None else '-'
+        host = f"{s['host_fraction'] * 100:.1f}%" if s['host_fraction'] is not None else '-'
+        print(f"\nTraining profile: {s['epochs']} epochs in {s['total_wall_s']:.1f}s "
+              f"(first epoch {s['first_epoch_wall_s']:.1f}s)")
+        print(f"  {s['samples_per_s']:.0f} samples/s, {s['mean_step_ms']:.2f} ms/step, "
+              f"data wait {wait}, host {host}, peak RSS {s['peak_rss_mb'] or 0:.0f} MB")
@@ -0,0 +1,285 @@
+"""
+V-Sign AI - Video to Dataset
+Extract hand landmarks from recorded videos with MediaPipe Hands in a pool of
+worker processes and write 30-frame sequences straight into the dataset
+(.vsq files that load_dataset reads like collector exports)
+"""
+
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+import numpy as np
+
+from dataset_manifest import add_label, get_labels, label_folder
+from sequence_format import EXTENSION, write_sequences
+
+# ===== CONFIGURATION =====
+SEQUENCE_LENGTH = 30
+FRAME_FEATURES = 126        # 2 hands * 21 landmarks * 3
+TARGET_FPS = 30             # the collector records 30 frames per second
+MAX_GAP_FRAMES = 3          # frames without hands bridged inside a sequence
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.webm')
+# Same MediaPipe settings as the web app and data_collector.html
+HANDS_OPTIONS = dict(max_num_hands=2, model_complexity=1,
+                     min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+
+# ===== TASKS =====
+def _person_from_name(path):
+    """'person3_clinic_0412.mp4' -> 'person3' (the collector's file naming)."""
+    return os.path.splitext(os.path.basename(path))[0].split('_')[0]
+
+
+def find_clips(input_dir):
+    """
+    One task per video in <input_dir>/<gesture>/, the whole clip labelled
+    with its folder's gesture.
+    """
+    tasks = []
+    for gesture in sorted(os.listdir(input_dir)):
+        folder = os.path.join(input_dir, gesture)
+        if not os.path.isdir(folder):
+            continue
+        for name in sorted(os.listdir(folder)):
+            if name.lower().endswith(VIDEO_EXTENSIONS):
+                path = os.path.join(folder, name)
+                tasks.append({'video': path, 'gesture': gesture, 'person_id': _person_from_name(path),
+                              'start_s': None, 'end_s': None})
+    return tasks
+
+
+def read_annotations(csv_path, video_dir='.'):
+    """
+    One task per labelled span of a long recording. CSV columns:
+    video, start_s, end_s, gesture[, person_id] (video relative to video_dir).
+    """
+    tasks = []
+    with open(csv_path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.DictReader(f):
+            path = os.path.join(video_dir, row['video'])
+            tasks.append({'video': path, 'gesture': row['gesture'],
+                          'person_id': row.get('person_id') or _person_from_name(path),
+                          'start_s': float(row['start_s']), 'end_s': float(row['end_s'])})
+    return tasks
+
+
+def output_path(task, data_dir):
+    stem = os.path.splitext(os.path.basename(task['video']))[0]
+    if task['start_s'] is not None:
+        stem += f"_{int(task['start_s'] * 1000):09d}"
+    return os.path.join(data_dir, label_folder(task['gesture']), stem + EXTENSION)
+
+
+# ===== SEGMENTATION =====
+def segment_sequences(vectors, sequence_length=SEQUENCE_LENGTH, stride=SEQUENCE_LENGTH,
+                      max_gap=MAX_GAP_FRAMES):
+    """
+    Cut per-frame landmark vectors (None = no hand detected) into
+    (n, sequence_length, 126) windows. Like the collector, frames without
+    hands are left out; a gap longer than `max_gap` frames ends the run.
+    """
+    runs, run, gap = [], [], 0
+    for vector in vectors:
+        if vector is None:
+            gap += 1
+            if gap > max_gap and run:
+                runs.append(run)
+                run = []
+            continue
+        gap = 0
+        run.append(vector)
+    if run:
+        runs.append(run)
+
+    windows = [np.stack(run[start:start + sequence_length])
+               for run in runs for start in range(0, len(run) - sequence_length + 1, stride)]
+    if not windows:
+        return np.zeros((0, sequence_length, FRAME_FEATURES), dtype=np.float32)
+    return np.stack(windows).astype(np.float32)
+
+
+# ===== WORKER =====
+def _init_worker():
+    import cv2
+    cv2.setNumThreads(1)  # one decoder thread per process, the pool provides the parallelism
+
+
+def _hands_to_vector(multi_hand_landmarks):
+    """First two detected hands in MediaPipe order (as the web app does), missing hand = zeros."""
+    vector = np.zeros(FRAME_FEATURES, dtype=np.float32)
+    for slot, hand in enumerate(multi_hand_landmarks[:2]):
+        vector[slot * 63:(slot + 1) * 63] = [v for lm in hand.landmark for v in (lm.x, lm.y, lm.z)]
+    return vector
+
+
+def extract_landmarks(video, start_s=None, end_s=None, target_fps=TARGET_FPS):
+    """
+    Decode `video` (optionally only [start_s, end_s)) keeping about
+    `target_fps` frames per second and run MediaPipe Hands in tracking mode
+    on them. Skipped frames are only grabbed, not decoded to images.
+    Returns (vectors, stats); vectors holds None for frames without hands.
+    """
+    import cv2
+    import mediapipe as mp
+
+    capture = cv2.VideoCapture(video)
+    if not capture.isOpened():
+        raise IOError(f"Cannot open video '{video}'")
+    fps = capture.get(cv2.CAP_PROP_FPS) or target_fps
+    step = max(1, round(fps / target_fps))
+    if start_s:
+        capture.set(cv2.CAP_PROP_POS_MSEC, start_s * 1000)
+    last_frame = int(end_s * fps) if end_s is not None else None
+
+    vectors, grabbed, detect_seconds = [], 0, 0.0
+    frame_index = int((start_s or 0) * fps)
+    with mp.solutions.hands.Hands(static_image_mode=False, **HANDS_OPTIONS) as hands:
+        while last_frame is None or frame_index < last_frame:
+            if not capture.grab():
+                break
+            grabbed += 1
+            frame_index += 1
+            if (grabbed - 1) % step:
+                continue
+            ok, image = capture.retrieve()
+            if not ok:
+                break
+            start = time.perf_counter()
+            results = hands.process(cv2.cvtColor(image, cv2.COLOR_BGR2RGB))
+            detect_seconds += time.perf_counter() - start
+            vectors.append(_hands_to_vector(results.multi_hand_landmarks)
+                           if results.multi_hand_landmarks else None)
+    capture.release()
+
+    stats = {
+        'source_fps': fps,
+        'frame_step': step,
+        'frames_decoded': grabbed,
+        'frames_processed': len(vectors),
+        'frames_with_hands': sum(v is not None for v in vectors),
+        'detect_seconds': detect_seconds,
+    }
+    return vectors, stats
+
+
+def process_task(task, data_dir, target_fps=TARGET_FPS, stride=SEQUENCE_LENGTH):
+    """Extract, segment and write one task's .vsq file (in the worker, so arrays never cross processes)."""
+    start = time.perf_counter()
+    vectors, stats = extract_landmarks(task['video'], task['start_s'], task['end_s'], target_fps)
+    sequences = segment_sequences(vectors, stride=stride)
+
+    path = output_path(task, data_dir)
+    if len(sequences):
+        effective_fps = stats['source_fps'] / stats['frame_step']
+        write_sequences(path, sequences, task['gesture'], task['person_id'],
+                        [round(SEQUENCE_LENGTH / effective_fps * 1000)] * len(sequences))
+    stats.update(video=task['video'], gesture=task['gesture'], output=path if len(sequences) else None,
+                 sequences=int(len(sequences)), seconds=time.perf_counter() - start)
+    return stats
+
+
+# ===== PIPELINE =====
+def _is_done(task, data_dir):
+    path = output_path(task, data_dir)
+    return os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(task['video'])
+
+
+def video_to_dataset(tasks, data_dir='dataset', workers=None, target_fps=TARGET_FPS,
+                     stride=SEQUENCE_LENGTH, overwrite=False):
+    """
+    Run every task in a spawn-context process pool. Tasks whose .vsq is
+    newer than the video are skipped unless `overwrite`. Gestures missing
+    from the manifest are appended to it. Returns the report dict.
+    """
+    labels = get_labels(data_dir)
+    for gesture in sorted({t['gesture'] for t in tasks} - set(labels)):
+        labels = add_label(gesture, data_dir)
+        print(f"+ New label '{gesture}' added to the manifest (class {len(labels) - 1})")
+    for gesture in {t['gesture'] for t in tasks}:
+        os.makedirs(os.path.join(data_dir, label_folder(gesture)), exist_ok=True)
+
+    todo = tasks if overwrite else [t for t in tasks if not _is_done(t, data_dir)]
+    print(f"\n{len(tasks)} videos/segments, {len(tasks) - len(todo)} already extracted, {len(todo)} to process")
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo) or 1))
+
+    results, failed = [], []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn'),
+                             initializer=_init_worker) as pool:
+        futures = {pool.submit(process_task, task, data_dir, target_fps, stride): task for task in todo}
+        for done, future in enumerate(as_completed(futures), 1):
+            task = futures[future]
+            try:
+                stats = future.result()
+            except Exception as e:  # a broken video must not stop hours of extraction
+                failed.append({'video': task['video'], 'error': str(e)})
+                print(f"  ✗ [{done}/{len(todo)}] {task['video']}: {e}")
+                continue
+            results.append(stats)
+            print(f"  ✓ [{done}/{len(todo)}] {task['video']}: {stats['sequences']} sequences, "
+                  f"{stats['frames_processed'] / stats['seconds']:.1f} frames/s")
+    wall = time.perf_counter() - start
+
+    decoded = sum(r['frames_decoded'] for r in results)
+    processed = sum(r['frames_processed'] for r in results)
+    report = {
+        'workers': workers,
+        'target_fps': target_fps,
+        'wall_seconds': wall,
+        'videos': len(results),
+        'failed': failed,
+        'frames_decoded': decoded,
+        'frames_processed': processed,
+        'decoded_frames_per_s': decoded / wall if wall else None,
+        'processed_frames_per_s': processed / wall if wall else None,
+        'sequences': sum(r['sequences'] for r in results),
+        'files': results,
+    }
+    print(f"\nProcessed {processed} of {decoded} decoded frames in {wall:.1f}s with {workers} workers")
+    if wall:
+        print(f"  Throughput: {report['processed_frames_per_s']:.1f} frames/s through MediaPipe, "
+              f"{report['decoded_frames_per_s']:.1f} frames/s decoded")
+    print(f"  Sequences written: {report['sequences']}" + (f", {len(failed)} videos failed" if failed else ""))
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Extract landmark sequences from videos into the dataset')
+    parser.add_argument('input', help='folder with one sub-folder of clips per gesture, '
+                                      'or a CSV of labelled segments (video,start_s,end_s,gesture[,person_id])')
+    parser.add_argument('--video-dir', default='.', help='base folder of the CSV video paths')
+    parser.add_argument('--data-dir', default='dataset')
+    parser.add_argument('--workers', type=int, help='default: all CPU cores')
+    parser.add_argument('--fps', type=float, default=TARGET_FPS, help='frames per second kept from each video')
+    parser.add_argument('--stride', type=int, default=SEQUENCE_LENGTH,
+                        help='frames between consecutive sequences (< 30 overlaps them)')
+    parser.add_argument('--overwrite', action='store_true', help='re-extract videos that were already processed')
+    parser.add_argument('--report', default='video_report.json')
+    parser.add_argument('--build-cache', action='store_true', help='refresh the dataset cache afterwards')
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(" " * 15 + "V-SIGN AI - VIDEO TO DATASET")
+    print("=" * 60)
+
+    missing = [name for name in ('cv2', 'mediapipe') if importlib.util.find_spec(name) is None]
+    if missing:
+        print(f"\nERROR: No module named {', '.join(missing)}. Cài đặt: pip install mediapipe opencv-python")
+        raise SystemExit(1)
+
+    tasks = (read_annotations(args.input, args.video_dir) if args.input.lower().endswith('.csv')
+             else find_clips(args.input))
+    report = video_to_dataset(tasks, args.data_dir, args.workers, args.fps, args.stride, args.overwrite)
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"✓ Report saved to '{args.report}'")
+
+    if args.build_cache:
+        from parallel_ingest import ingest_dataset
+        ingest_dataset(args.data_dir, get_labels(args.data_dir), SEQUENCE_LENGTH, workers=args.workers)